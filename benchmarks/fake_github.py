@@ -0,0 +1,367 @@
+# fake_github.py
+# 벤치마크용 가짜 깃허브 API 서버 (메모리 저장소)
+# 이 프로젝트가 쓰는 엔드포인트만 흉내 낸다 :
+#   git/trees (조회/생성), git/blobs, git/commits (조회/생성), git/ref(s), contents GET/PUT/DELETE, compare
+# 요청마다 지연 시간, 요청 한도 헤더(X-RateLimit-*), 무작위 실패(5xx)를 넣을 수 있고,
+# 엔드포인트별 요청 수와 주고받은 바이트를 센다. 파일 내용은 저장하지 않고 크기만 기억한다.
+
+import base64
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RECYCLE_BIN_PREFIX = "_recycle_bin/"
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # 클라이언트가 연결을 먼저 끊는 것(프로세스 종료 등)은 정상 상황이므로 출력하지 않는다
+        pass
+
+
+class FakeRepository:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.blobs = {}   # {blob sha: 크기}
+        self.trees = {}   # {tree sha: {이름: (mode, type, sha)}}
+        self.commits = {} # {commit sha: {"tree", "parents", "message"}}
+        self.refs = {}    # {브랜치: commit sha}
+        self.commit_count = 0
+
+    def put_blob(self, data):
+        sha = hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+        self.blobs[sha] = len(data)
+        return sha
+
+    def put_tree(self, entries):
+        sha = hashlib.sha1(json.dumps(sorted(entries.items())).encode()).hexdigest()
+        self.trees[sha] = entries
+        return sha
+
+    def put_commit(self, tree, parents, message):
+        self.commit_count += 1
+        sha = hashlib.sha1(json.dumps([tree, parents, message, self.commit_count]).encode()).hexdigest()
+        self.commits[sha] = {"tree": tree, "parents": parents, "message": message}
+        return sha
+
+    def resolve_tree(self, ref):
+        # 브랜치 이름, 커밋 sha, 트리 sha 중 무엇이든 트리 sha로 (없으면 None)
+        if ref in self.refs:
+            return self.commits[self.refs[ref]]["tree"]
+        if ref in self.commits:
+            return self.commits[ref]["tree"]
+        return ref if ref in self.trees else None
+
+    def flatten(self, tree_sha, prefix=""):
+        # {경로: (mode, type, sha)} (폴더 항목 포함)
+        result = {}
+        stack = [(tree_sha, prefix)]
+        while stack:
+            sha, base = stack.pop()
+            for name, entry in self.trees[sha].items():
+                result[base + name] = entry
+                if entry[1] == "tree":
+                    stack.append((entry[2], base + name + "/"))
+        return result
+
+    def apply_edits(self, tree_sha, edits):
+        # base_tree 위에 {경로: 항목 또는 None(삭제)}를 반영한 새 트리 sha (바뀐 폴더만 새로 만든다)
+        entries = dict(self.trees[tree_sha]) if tree_sha else {}
+        children = defaultdict(dict)
+        for path, entry in edits.items():
+            name, _, rest = path.partition("/")
+            if rest:
+                children[name][rest] = entry
+            elif entry is None:
+                if name not in entries:
+                    raise KeyError(path)
+                del entries[name]
+            else:
+                entries[name] = entry
+        for name, child_edits in children.items():
+            child = entries.get(name)
+            child_sha = self.apply_edits(child[2] if child and child[1] == "tree" else None, child_edits)
+            if child_sha is None:
+                entries.pop(name, None)
+            else:
+                entries[name] = ("040000", "tree", child_sha)
+        return self.put_tree(entries) if entries else None
+
+    def ancestors(self, commit_sha):
+        seen, stack = set(), [commit_sha]
+        while stack:
+            sha = stack.pop()
+            if sha not in seen:
+                seen.add(sha)
+                stack.extend(self.commits[sha]["parents"])
+        return seen
+
+    def file_digest(self, branch):
+        # 휴지통을 뺀 (경로, blob sha) 목록의 해시 : 로컬 폴더와 같은 상태인지 빠르게 비교하는 용도
+        if branch not in self.refs:
+            return hashlib.sha1(b"").hexdigest(), 0
+        files = sorted((path, entry[2]) for path, entry in self.flatten(self.resolve_tree(branch)).items()
+                       if entry[1] == "blob" and not path.startswith(RECYCLE_BIN_PREFIX))
+        return hashlib.sha1("\n".join(f"{path} {sha}" for path, sha in files).encode()).hexdigest(), len(files)
+
+
+class FakeGitHub:
+    def __init__(self, latency=0.0, fail_rate=0.0, rate_limit=5000, rate_window=3600.0, seed=0, tree_limit=100000):
+        self.latency = latency         # 요청마다 더할 지연 시간(초)
+        self.fail_rate = fail_rate     # 이 확률로 502를 돌려준다
+        self.rate_limit = rate_limit   # 창(rate_window)마다 허용할 요청 수
+        self.rate_window = rate_window
+        self.tree_limit = tree_limit   # 재귀 트리 응답에 담을 최대 항목 수 (넘으면 truncated: true)
+        self.random = random.Random(seed)
+        self.repo = FakeRepository()
+        self.stats_lock = threading.Lock()
+        self.stats = defaultdict(lambda: {"requests": 0, "bytes_in": 0, "bytes_out": 0, "failures": 0})
+        self.window_started = time.time()
+        self.remaining = rate_limit
+        self.server = None
+
+    # ---- 서버 시작/종료 ----
+    def start(self, host="127.0.0.1", port=0):
+        fake = self
+
+        class Handler(FakeGitHubHandler):
+            github = fake
+        self.server = QuietHTTPServer((host, port), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self.server.server_address[1]}"
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    # ---- 통계/요청 한도 ----
+    def record(self, endpoint, bytes_in, bytes_out, failed=False):
+        with self.stats_lock:
+            counters = self.stats[endpoint]
+            counters["requests"] += 1
+            counters["bytes_in"] += bytes_in
+            counters["bytes_out"] += bytes_out
+            counters["failures"] += int(failed)
+
+    def snapshot(self):
+        with self.stats_lock:
+            stats = {endpoint: dict(counters) for endpoint, counters in self.stats.items()}
+        total = {key: sum(counters[key] for counters in stats.values())
+                 for key in ("requests", "bytes_in", "bytes_out", "failures")}
+        return {"endpoints": stats, "total": total, "commits": self.repo.commit_count}
+
+    def take_rate_limit(self):
+        # (남은 요청 수, 초기화 시각) : 창이 지나면 다시 채운다. 0 미만이면 한도 초과
+        with self.stats_lock:
+            now = time.time()
+            if now - self.window_started >= self.rate_window:
+                self.window_started, self.remaining = now, self.rate_limit
+            self.remaining -= 1
+            return self.remaining, int(self.window_started + self.rate_window)
+
+    def should_fail(self):
+        with self.stats_lock:
+            return self.fail_rate and self.random.random() < self.fail_rate
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # keep-alive에서 헤더와 본문을 따로 쓰므로 Nagle을 끄지 않으면 요청마다 지연 ACK만큼(약 40ms) 멈춘다
+    disable_nagle_algorithm = True
+    github = None # FakeGitHub.start()에서 채운 하위 클래스가 지정
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.handle_api("GET")
+
+    def do_POST(self):
+        self.handle_api("POST")
+
+    def do_PUT(self):
+        self.handle_api("PUT")
+
+    def do_PATCH(self):
+        self.handle_api("PATCH")
+
+    def do_DELETE(self):
+        self.handle_api("DELETE")
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        self.bytes_in = len(raw)
+        return json.loads(raw) if raw else {}
+
+    def send_json(self, status, body=None, headers=None):
+        data = b"" if body is None else json.dumps(body).encode()
+        headers = dict(headers or {})
+        if self.command == "GET" and status == 200:
+            etag = '"%s"' % hashlib.sha1(data).hexdigest()
+            headers["ETag"] = etag
+            if self.headers.get("If-None-Match") == etag:
+                status, data = 304, b"" # 깃허브처럼 304는 요청 한도에서 빼지 않는다
+                with self.github.stats_lock:
+                    self.github.remaining += 1
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-RateLimit-Limit", str(self.github.rate_limit))
+        self.send_header("X-RateLimit-Remaining", str(max(self.rate_remaining, 0)))
+        self.send_header("X-RateLimit-Reset", str(self.rate_reset))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        self.github.record(self.endpoint, self.bytes_in, len(data), failed=status >= 500 or status in (403, 429))
+
+    def handle_api(self, method):
+        github = self.github
+        path, _, query = self.path.partition("?")
+        self.bytes_in = 0
+        if path.startswith("/_"):
+            return self.handle_control(path)
+        match = re.match(r"^/repos/[^/]+/[^/]+/(.*)$", path)
+        rest = match.group(1) if match else ""
+        parts = rest.split("/")
+        self.endpoint = f"{method} {'/'.join(parts[:2]) if parts[0] == 'git' else parts[0]}"
+        body = self.read_body() if method != "GET" else {}
+        if github.latency:
+            time.sleep(github.latency)
+        self.rate_remaining, self.rate_reset = github.take_rate_limit()
+        if self.rate_remaining < 0:
+            return self.send_json(403, {"message": "API rate limit exceeded"})
+        if github.should_fail():
+            return self.send_json(502, {"message": "Injected failure"})
+        if not match:
+            return self.send_json(404, {"message": "Not Found"})
+        with github.repo.lock:
+            return self.route(method, rest, query, body)
+
+    def handle_control(self, path):
+        # 벤치마크 하네스용 : /_stats (요청 통계), /_digest (브랜치 파일 목록 해시)
+        self.endpoint, self.rate_remaining, self.rate_reset = "control", 0, 0
+        if path == "/_stats":
+            return self.send_json(200, self.github.snapshot())
+        if path == "/_digest":
+            with self.github.repo.lock:
+                digest, count = self.github.repo.file_digest("main")
+            return self.send_json(200, {"digest": digest, "files": count})
+        return self.send_json(404, {"message": "Not Found"})
+
+    def route(self, method, rest, query, body):
+        repo = self.github.repo
+        if rest.startswith("git/trees/") and method == "GET":
+            ref, _, directory = rest[len("git/trees/"):].partition(":")
+            if not repo.refs:
+                return self.send_json(409, {"message": "Git Repository is empty."})
+            tree_sha = repo.resolve_tree(ref)
+            if tree_sha is None:
+                return self.send_json(404, {"message": "Not Found"})
+            if directory:
+                entry = repo.flatten(tree_sha).get(directory)
+                if entry is None or entry[1] != "tree":
+                    return self.send_json(404, {"message": "Not Found"})
+                tree_sha = entry[2]
+            items = repo.flatten(tree_sha) if "recursive" in query else repo.trees[tree_sha]
+            tree = [{"path": p, "mode": e[0], "type": e[1], "sha": e[2]} for p, e in sorted(items.items())]
+            truncated = "recursive" in query and len(tree) > self.github.tree_limit
+            if truncated:
+                tree = tree[:self.github.tree_limit]
+            return self.send_json(200, {"sha": tree_sha, "tree": tree, "truncated": truncated})
+        if rest.startswith("git/ref/heads/") and method == "GET":
+            branch = rest[len("git/ref/heads/"):]
+            if not repo.refs:
+                return self.send_json(409, {"message": "Git Repository is empty."})
+            if branch not in repo.refs:
+                return self.send_json(404, {"message": "Not Found"})
+            return self.send_json(200, {"ref": f"refs/heads/{branch}", "object": {"sha": repo.refs[branch], "type": "commit"}})
+        if rest.startswith("git/commits/") and method == "GET":
+            commit = repo.commits.get(rest[len("git/commits/"):])
+            if commit is None:
+                return self.send_json(404, {"message": "Not Found"})
+            return self.send_json(200, {"sha": rest[len("git/commits/"):], "tree": {"sha": commit["tree"]},
+                                        "parents": [{"sha": parent} for parent in commit["parents"]]})
+        if rest == "git/blobs" and method == "POST":
+            if not repo.refs:
+                return self.send_json(409, {"message": "Git Repository is empty."})
+            content = body["content"]
+            data = base64.b64decode(content) if body.get("encoding") == "base64" else content.encode()
+            return self.send_json(201, {"sha": repo.put_blob(data)})
+        if rest == "git/trees" and method == "POST":
+            edits = {entry["path"]: None if entry.get("sha") is None else (entry["mode"], entry["type"], entry["sha"])
+                     for entry in body["tree"]}
+            try:
+                tree_sha = repo.apply_edits(body.get("base_tree"), edits)
+            except KeyError as e:
+                return self.send_json(422, {"message": f"path {e} not found"})
+            return self.send_json(201, {"sha": tree_sha or repo.put_tree({})})
+        if rest == "git/commits" and method == "POST":
+            return self.send_json(201, {"sha": repo.put_commit(body["tree"], body.get("parents", []), body["message"])})
+        if rest.startswith("git/refs/heads/") and method == "PATCH":
+            branch = rest[len("git/refs/heads/"):]
+            old = repo.refs.get(branch)
+            if old and old not in repo.ancestors(body["sha"]) and not body.get("force"):
+                return self.send_json(422, {"message": "Update is not a fast forward"})
+            repo.refs[branch] = body["sha"]
+            return self.send_json(200, {"object": {"sha": body["sha"]}})
+        if rest.startswith("compare/") and method == "GET":
+            return self.compare(repo, rest[len("compare/"):])
+        if rest.startswith("contents/"):
+            return self.contents(repo, method, rest[len("contents/"):], body)
+        return self.send_json(404, {"message": "Not Found"})
+
+    def compare(self, repo, spec):
+        base, _, head = spec.partition("...")
+        if base not in repo.commits or head not in repo.commits:
+            return self.send_json(404, {"message": "Not Found"})
+        if base not in repo.ancestors(head):
+            return self.send_json(200, {"status": "diverged", "files": []})
+        old = {p: e[2] for p, e in repo.flatten(repo.commits[base]["tree"]).items() if e[1] == "blob"}
+        new = {p: e[2] for p, e in repo.flatten(repo.commits[head]["tree"]).items() if e[1] == "blob"}
+        files = []
+        for path in sorted(old.keys() | new.keys()):
+            if path not in new:
+                files.append({"filename": path, "status": "removed", "sha": old[path]})
+            elif path not in old:
+                files.append({"filename": path, "status": "added", "sha": new[path]})
+            elif old[path] != new[path]:
+                files.append({"filename": path, "status": "modified", "sha": new[path]})
+        # 실제 API처럼 파일 목록은 300개까지만 담는다
+        return self.send_json(200, {"status": "ahead" if base != head else "identical", "files": files[:300]})
+
+    def contents(self, repo, method, path, body):
+        branch = body.get("branch", "main")
+        files = repo.flatten(repo.resolve_tree(branch)) if branch in repo.refs else {}
+        entry = files.get(path)
+        if method == "GET":
+            if entry is None:
+                return self.send_json(404, {"message": "Not Found"})
+            if entry[1] == "tree":
+                return self.send_json(200, [])
+            return self.send_json(200, {"path": path, "sha": entry[2], "size": repo.blobs.get(entry[2], 0), "content": ""})
+        if entry is not None and body.get("sha") != entry[2]:
+            return self.send_json(409 if body.get("sha") else 422, {"message": "sha does not match"})
+        if method == "PUT":
+            blob_sha = repo.put_blob(base64.b64decode(body["content"]))
+            edits = {path: ("100644", "blob", blob_sha)}
+        elif method == "DELETE" and entry is not None:
+            blob_sha, edits = None, {path: None}
+        else:
+            return self.send_json(404, {"message": "Not Found"})
+        parent = repo.refs.get(branch)
+        tree_sha = repo.apply_edits(repo.resolve_tree(branch) if parent else None, edits) or repo.put_tree({})
+        commit_sha = repo.put_commit(tree_sha, [parent] if parent else [], body["message"])
+        repo.refs[branch] = commit_sha
+        content = {"path": path, "sha": blob_sha} if blob_sha else None
+        return self.send_json(201 if entry is None else 200,
+                              {"content": content, "commit": {"sha": commit_sha, "parents": [{"sha": parent}] if parent else []}})
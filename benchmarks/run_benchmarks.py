@@ -0,0 +1,315 @@
+# run_benchmarks.py
+# 가짜 깃허브 서버(fake_github.py)를 띄워 놓고 합성 폴더로 동기화 성능을 잰다. (실제 깃허브/요청 한도를 쓰지 않음)
+#
+#   python benchmarks/run_benchmarks.py                      # 1,000 / 10,000개 파일
+#   python benchmarks/run_benchmarks.py --sizes 1000 100000 --latency 0.05 --fail-rate 0.01
+#
+# 규모마다 별도 프로세스에서 (1) 빈 저장소로 초기 동기화 (2) 변경 없이 다시 동기화 (3) 감시 중 파일 수정/추가/삭제/이동
+# (4) 꺼져 있는 동안 저널에 쌓인 작업 반영을 실행하고, 단계마다 원격이 로컬과 같아졌는지 확인하며 걸린 시간, 요청 수, 주고받은 바이트, 최대 메모리(RSS, 잴 수 있을 때)를 benchmarks/results/에 JSON으로 저장한다.
+# 직전 결과 파일이 있으면 단계별 시간 변화를 함께 보여준다.
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import queue
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCHMARK_DIR)
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+sys.path.insert(0, BENCHMARK_DIR)
+
+from fake_github import FakeGitHub
+
+try:
+    import resource # 유닉스 전용 (Windows에서는 psutil이 있으면 그것으로 최대 메모리를 잰다)
+except ImportError:
+    resource = None
+
+# 합성 파일 크기 분포 (바이트, 비율) : 작은 소스 파일이 대부분이고 가끔 큰 파일이 섞인 폴더
+SIZE_PROFILES = {
+    "small": [(200, 1.0)],
+    "mixed": [(256, 0.70), (4 * 1024, 0.25), (64 * 1024, 0.05)],
+}
+FILES_PER_DIR = 100
+WATCH_TIMEOUT = 300.0 # 감시 단계에서 원격이 로컬과 같아질 때까지 기다리는 최대 시간(초)
+
+
+# ---- 합성 폴더 ----
+def synthetic_path(index):
+    # 폴더 하나에 FILES_PER_DIR개씩, 2단계 폴더 구조 (d0003/s07/f000371.txt)
+    return f"d{index // (FILES_PER_DIR * 10):04d}/s{index // FILES_PER_DIR % 10:02d}/f{index:07d}.txt"
+
+def write_file(folder, repo_path, size, rng):
+    local_path = os.path.join(folder, repo_path.replace("/", os.sep))
+    os.makedirs(os.path.dirname(local_path), exist_ok=True)
+    with open(local_path, "wb") as f:
+        f.write(rng.randbytes(size))
+
+def generate_folder(folder, count, profile, seed):
+    rng = random.Random(seed)
+    sizes, weights = zip(*SIZE_PROFILES[profile])
+    total = 0
+    for index in range(count):
+        size = rng.choices(sizes, weights)[0]
+        write_file(folder, synthetic_path(index), size, rng)
+        total += size
+    return total
+
+def local_digest(uploader, folder):
+    # fake_github의 /_digest와 같은 방식으로 로컬 폴더의 (경로, blob sha) 해시를 계산
+    files = []
+    for root, _, names in os.walk(folder):
+        for name in names:
+            local_path = os.path.join(root, name)
+            repo_path = os.path.relpath(local_path, folder).replace(os.sep, "/")
+            files.append((repo_path, uploader.compute_git_blob_sha(local_path)))
+    files.sort()
+    return hashlib.sha1("\n".join(f"{path} {sha}" for path, sha in files).encode()).hexdigest()
+
+
+# ---- 규모 하나를 실행하는 자식 프로세스 ----
+def fetch_json(url):
+    with urllib.request.urlopen(url) as response:
+        return json.load(response)
+
+def stats_delta(before, after):
+    return {key: after["total"][key] - before["total"].get(key, 0) for key in after["total"]}
+
+def drain_log(uploader, settings, log_queue, stop_event, errors):
+    # 감시 중 여러 파일 일괄 작업은 확인 창 없이 바로 업로드하고, 오류 로그만 모아 둔다
+    while True:
+        message = log_queue.get()
+        if message is None:
+            return
+        if isinstance(message, tuple):
+            if message[0] == "folder_detected":
+                uploader.submit_commit_work(settings, uploader.upload_files_batch, settings, message[2], log_queue,
+                                            stop_event, message[3])
+            continue
+        if "❌" in str(message):
+            errors.append(str(message).strip())
+
+def run_phase(name, url, fn):
+    before = fetch_json(f"{url}/_stats")
+    started = time.perf_counter()
+    ok = fn()
+    wall = time.perf_counter() - started
+    after = fetch_json(f"{url}/_stats")
+    delta = stats_delta(before, after)
+    print(f"   {name}: {wall:.2f}초, 요청 {delta['requests']}회", file=sys.stderr, flush=True)
+    return {"ok": bool(ok), "wall_seconds": round(wall, 3), "requests": delta["requests"],
+            "bytes_sent": delta["bytes_in"], "bytes_received": delta["bytes_out"], "failures": delta["failures"]}
+
+def run_child(params):
+    sys.path.insert(0, PROJECT_DIR)
+    import github_auto_uploader as uploader
+
+    workdir = tempfile.mkdtemp(prefix="uploader-bench-")
+    folder = os.path.join(workdir, "folder")
+    os.makedirs(folder)
+    # 인덱스/캐시/저널/지표 파일을 임시 폴더에 두어 실제 설정과 섞이지 않게 한다
+    uploader._sync_index = uploader.SyncIndex(os.path.join(workdir, "sync_index.db"))
+    uploader._response_cache = uploader.ResponseCache(os.path.join(workdir, "api_cache.db"))
+    uploader._journal = uploader.OperationJournal(os.path.join(workdir, "pending_ops.journal"))
+    uploader.METRICS_JSON_FILE = os.path.join(workdir, "metrics.json")
+    uploader.METRICS_PROM_FILE = os.path.join(workdir, "metrics.prom")
+    settings = {"token": "benchmark", "username": "bench", "repo": "repo", "branch": "main", "folder": folder,
+                "api_url": params["url"], "upload_workers": params["upload_workers"],
+                "hash_workers": params["hash_workers"]}
+    log_queue, stop_event, errors = queue.Queue(), threading.Event(), []
+    threading.Thread(target=drain_log, args=(uploader, settings, log_queue, stop_event, errors), daemon=True).start()
+    result = {"files": params["files"]}
+    try:
+        started = time.perf_counter()
+        result["bytes_on_disk"] = generate_folder(folder, params["files"], params["profile"], params["seed"])
+        result["generate_seconds"] = round(time.perf_counter() - started, 3)
+        url = params["url"]
+
+        def initial():
+            return uploader.initial_sync(settings, log_queue, stop_event) is not None
+        result["initial_sync"] = run_phase("초기 동기화", url, initial)
+        result["resync"] = run_phase("변경 없이 다시 동기화", url, initial)
+        result["watch"] = run_phase("감시 중 변경 반영", url,
+                                    lambda: run_watch(uploader, settings, log_queue, stop_event, params))
+        result["replay"] = run_phase("저널 반영", url, lambda: run_replay(uploader, settings, log_queue, params))
+    finally:
+        stop_event.set()
+        log_queue.put(None)
+        shutil.rmtree(workdir, ignore_errors=True)
+    result["errors"] = errors[:20]
+    result["error_count"] = len(errors)
+    peak = peak_rss_mb()
+    result["peak_rss_mb"] = None if peak is None else round(peak, 1)
+    return result
+
+def run_watch(uploader, settings, log_queue, stop_event, params):
+    # 감시를 시작하고 파일의 1%(최소 10개)를 수정/추가, 절반만큼 삭제/이동한 뒤 원격이 로컬과 같아질 때까지 잰다
+    folder, url = settings["folder"], params["url"]
+    watch_stop = threading.Event()
+    ignore_rules = uploader.IgnoreRules.from_settings(settings)
+    watcher = threading.Thread(target=uploader.start_monitoring, args=(settings, log_queue, watch_stop, ignore_rules))
+    watcher.start()
+    time.sleep(1.0) # 감시 등록(inotify 등)이 끝날 때까지
+    rng = random.Random(params["seed"] + 1)
+    count = params["files"]
+    changes = max(10, count // 100)
+    picked = rng.sample(range(count), min(count, changes * 2))
+    for index in picked[:changes // 2]:
+        write_file(folder, synthetic_path(index), 300, rng) # 수정
+    for index in range(count, count + changes // 2):
+        write_file(folder, synthetic_path(index), 300, rng) # 추가
+    for index in picked[changes // 2:changes]:
+        os.remove(os.path.join(folder, synthetic_path(index).replace("/", os.sep))) # 삭제
+    for index in picked[changes:changes + changes // 2]:
+        source = os.path.join(folder, synthetic_path(index).replace("/", os.sep))
+        os.replace(source, source + ".moved") # 이동(이름 변경)
+    expected = local_digest(uploader, folder)
+    deadline = time.monotonic() + WATCH_TIMEOUT
+    converged = False
+    while time.monotonic() < deadline and not stop_event.is_set():
+        if fetch_json(f"{url}/_digest")["digest"] == expected:
+            converged = True
+            break
+        time.sleep(0.2)
+    watch_stop.set()
+    watcher.join()
+    return converged
+
+def run_replay(uploader, settings, log_queue, params):
+    # 꺼져 있는 동안 a를 b로 옮기고 같은 경로에 새 a를 만든 경우 (작업이 저널의 서로 다른 묶음에 기록됨)
+    # 반영 뒤 원격에 a와 b가 모두 남아 있어야 한다 (이동의 원래 경로 a를 트리에서 빼면 새 a가 사라진다)
+    folder, url = settings["folder"], params["url"]
+    journal, scope = uploader.get_journal(), uploader.sync_scope(settings)
+    rng = random.Random(params["seed"] + 2)
+    moved = 0
+    for index in range(params["files"]):
+        old_path = synthetic_path(index)
+        source = os.path.join(folder, old_path.replace("/", os.sep))
+        if not os.path.exists(source):
+            continue # 감시 단계에서 지우거나 옮긴 파일
+        new_path = old_path + ".renamed"
+        os.replace(source, source + ".renamed")
+        write_file(folder, old_path, 300, rng)
+        journal.release(journal.record(scope, [("move", old_path, new_path)]))
+        journal.release(journal.record(scope, [("upload", old_path)]))
+        moved += 1
+        if moved >= 10:
+            break
+    if not uploader.replay_journal(settings, log_queue):
+        return False
+    return fetch_json(f"{url}/_digest")["digest"] == local_digest(uploader, folder)
+
+def peak_rss_mb():
+    # 잴 수 없으면 None (보고서에서 최대 메모리를 비워 둔다)
+    if resource is not None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024 # macOS는 바이트, 리눅스는 KB
+    try:
+        import psutil
+    except ImportError:
+        return None
+    memory = psutil.Process().memory_info()
+    return getattr(memory, "peak_wset", memory.rss) / (1024 * 1024) # Windows는 최대 작업 집합
+
+
+# ---- 부모 프로세스 : 규모별로 서버를 띄우고 자식 프로세스를 실행 ----
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def latest_result(exclude=None):
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+    names = sorted(name for name in os.listdir(RESULTS_DIR) if name.endswith(".json") and name != exclude)
+    if not names:
+        return None
+    with open(os.path.join(RESULTS_DIR, names[-1]), encoding="utf-8") as f:
+        return json.load(f)
+
+def print_report(report, previous):
+    previous_runs = {run["files"]: run for run in (previous or {}).get("runs", [])}
+    print(f"\n{'파일 수':>8} {'단계':<10} {'시간(초)':>9} {'요청':>8} {'보냄(MB)':>9} {'받음(MB)':>9} {'이전 대비':>9}")
+    for run in report["runs"]:
+        for phase in ("initial_sync", "resync", "watch", "replay"):
+            result = run.get(phase)
+            if not result:
+                continue
+            change = ""
+            old = previous_runs.get(run["files"], {}).get(phase)
+            if old and old["wall_seconds"]:
+                change = f"{(result['wall_seconds'] / old['wall_seconds'] - 1) * 100:+.0f}%"
+            print(f"{run['files']:>8} {phase:<10} {result['wall_seconds']:>9.2f} {result['requests']:>8} "
+                  f"{result['bytes_sent'] / 1e6:>9.2f} {result['bytes_received'] / 1e6:>9.2f} {change:>9}"
+                  + ("" if result["ok"] else "  (실패)"))
+        peak = run.get("peak_rss_mb")
+        peak_text = "-" if peak is None else f"{peak:.1f}MB"
+        print(f"{'':>8} 최대 메모리 {peak_text}, 오류 로그 {run.get('error_count', 0)}개")
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 깃허브 서버로 동기화 성능을 잽니다.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="합성 폴더의 파일 수")
+    parser.add_argument("--profile", choices=sorted(SIZE_PROFILES), default="mixed", help="파일 크기 분포")
+    parser.add_argument("--latency", type=float, default=0.02, help="요청마다 더할 서버 지연 시간(초)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="서버가 502로 실패할 확률")
+    parser.add_argument("--rate-limit", type=int, default=1000000, help="창마다 허용할 요청 수")
+    parser.add_argument("--rate-window", type=float, default=3600.0, help="요청 한도 창 길이(초)")
+    parser.add_argument("--tree-limit", type=int, default=100000, help="재귀 트리 응답의 최대 항목 수 (넘으면 잘림)")
+    parser.add_argument("--upload-workers", type=int, default=4)
+    parser.add_argument("--hash-workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/<시각>_<git 리비전>.json)")
+    parser.add_argument("--child", help=argparse.SUPPRESS) # 내부용 : 규모 하나를 실행하는 자식 프로세스
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(json.loads(args.child))))
+        return 0
+
+    revision = git_revision()
+    report = {"revision": revision, "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "python": platform.python_version(), "platform": platform.platform(),
+              "params": {key: value for key, value in vars(args).items() if key not in ("child", "output")},
+              "runs": []}
+    for count in args.sizes:
+        print(f"▶ 파일 {count}개", file=sys.stderr, flush=True)
+        server = FakeGitHub(latency=args.latency, fail_rate=args.fail_rate, rate_limit=args.rate_limit,
+                            rate_window=args.rate_window, seed=args.seed, tree_limit=args.tree_limit)
+        url = server.start()
+        params = {"url": url, "files": count, "profile": args.profile, "seed": args.seed,
+                  "upload_workers": args.upload_workers, "hash_workers": args.hash_workers}
+        try:
+            child = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", json.dumps(params)],
+                                   stdout=subprocess.PIPE, text=True)
+        finally:
+            server.stop()
+        if child.returncode != 0:
+            report["runs"].append({"files": count, "error": f"자식 프로세스 종료 코드 {child.returncode}"})
+            continue
+        run = json.loads(child.stdout.strip().splitlines()[-1])
+        run["server"] = server.snapshot()
+        report["runs"].append(run)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{revision}.json")
+    previous = latest_result(exclude=os.path.basename(output))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print_report(report, previous)
+    print(f"\n결과 저장: {output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
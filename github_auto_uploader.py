@@ -1,4 +1,6 @@
 # Github Auto Uploader!
+import time
+_process_started = time.perf_counter() # 시작에 걸린 시간 측정용 (CLI 로그에 표시)
 
 # ---- 없는 패키지 설치 ----
 import subprocess
@@ -11,31 +13,41 @@ def install_if_missing(package_name, import_name=None):
         try:
             subprocess.check_call([sys.executable, "-m", "pip", "install", package_name])
         except Exception as e:
-            import tkinter.messagebox as msg
-            msg.showerror("패키지 설치 오류", f"'{package_name}' 설치에 실패했습니다.\n{e}")
+            try:
+                import tkinter.messagebox as msg
+                msg.showerror("패키지 설치 오류", f"'{package_name}' 설치에 실패했습니다.\n{e}")
+            except Exception: # 디스플레이 없는 서버(CLI)에서는 터미널에 알린다
+                print(f"패키지 설치 오류: '{package_name}' 설치에 실패했습니다. ({e})", file=sys.stderr)
             sys.exit(1)
-install_if_missing("ttkbootstrap")
-install_if_missing("watchdog")
-install_if_missing("requests")
-install_if_missing("keyring")
 
 # ---- 필요한 모듈 import ----
-import ttkbootstrap as ttk
-from ttkbootstrap.dialogs import dialogs
-import tkinter as tk
-from tkinter import filedialog, scrolledtext
+# 동기화 엔진에 필요한 모듈만 바로 불러온다. GUI(tkinter/ttkbootstrap), keyring, problem_finder는
+# 실제로 쓸 때 불러오므로 디스플레이 없는 서버에서도 CLI로 실행할 수 있고 시작이 빠르다.
+# (없는 패키지 자동 설치도 GUI로 실행할 때만 한다 : load_gui_modules)
+# requests, watchdog이 없으면 설치하지 않고 어떤 패키지가 필요한지 알린 뒤 끝낸다
+try:
+    import requests
+    from watchdog.observers import Observer
+    from watchdog.events import (FileCreatedEvent, FileDeletedEvent, FileModifiedEvent, FileMovedEvent,
+                                 FileSystemEventHandler)
+except ImportError as e:
+    sys.exit(f"오류: 필요한 패키지 '{e.name}'가 설치되어 있지 않습니다. 'pip install requests watchdog'으로 설치해주세요.")
 import threading
-import time
-import requests
 import base64
+import codecs
+import errno
+import hashlib
+import heapq
 import os
+import posixpath
+import re
 import json
 import queue
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+import random
+import sqlite3
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 import webbrowser
-import keyring # keyring을 사용해 OS 보안 저장소에 토큰을 저장
-import problem_finder # 백준 문제 불러오기(problem_finder) 모듈 import
 
 
 # 1. 개인 설정 관리(github 토큰, 사용자명, repo, etc...)
@@ -67,166 +79,2370 @@ def load_settings():
     except (json.JSONDecodeError, FileNotFoundError):
         return default_settings
 
+# 1-(0) 토큰 불러오기 : 환경 변수가 있으면 그것을, 없으면 keyring(OS 보안 저장소)에 저장된 토큰을 쓴다
+KEYRING_SERVICE = "github_auto_uploader"
+TOKEN_ENV_VARS = ("GITHUB_AUTO_UPLOADER_TOKEN", "GITHUB_TOKEN")
+
+def load_token(settings):
+    for name in TOKEN_ENV_VARS:
+        if os.environ.get(name):
+            return os.environ[name]
+    try:
+        import keyring # 서버 등 keyring이 없는 환경에서는 환경 변수로만 토큰을 받는다
+        from keyring.errors import KeyringError
+    except ImportError:
+        return None
+    try:
+        return keyring.get_password(KEYRING_SERVICE, settings.get("username", ""))
+    except KeyringError: # 설치는 됐지만 쓸 수 있는 보안 저장소가 없음 (NoKeyringError 등)
+        return None
+
+# 1-(0.2) 동기화 프로필 : config.json의 "profiles" 목록으로 폴더 여러 개를 각각 다른 저장소/브랜치에 동기화
+#   {"username": "me", "profiles": [{"name": "boj", "folder": "C:/boj", "repo": "boj"},
+#                                   {"name": "lab", "folder": "D:/lab", "repo": "lab", "branch": "dev"}]}
+# 프로필에 없는 값(username, branch, ignore, upload_workers 등)은 최상위 설정을 쓴다. 목록이 없으면 최상위 설정이 곧 프로필 하나다.
+def load_profiles(settings):
+    profiles, names = [], set()
+    for number, profile in enumerate(settings.get("profiles") or [{}], start=1):
+        merged = {key: value for key, value in settings.items() if key != "profiles"}
+        merged.update(profile)
+        name = merged.pop("name", None) or merged.get("repo") or f"profile{number}"
+        if name in names:
+            name = f"{name}-{number}" # 이름이 겹치면 순번을 붙여 구분
+        names.add(name)
+        merged["profile"] = name
+        profiles.append(merged)
+    return profiles
+
+# 1-(0.1) 로그 이벤트
+# 로그 큐에는 문자열 대신 LogEvent를 넣을 수 있다 : 화면에 보일 문장과 함께 수준, 파일 경로, 단계, 걸린 시간을 담아
+# 화면에서는 파일별 진행 줄을 요약으로 합치고, 로그 파일에는 모든 줄을 그대로 남긴다. (문자열은 info 수준으로 취급)
+
+INFO, WARNING, ERROR = "info", "warning", "error"
+
+class LogEvent:
+    __slots__ = ("message", "level", "path", "phase", "duration", "created")
+
+    def __init__(self, message, level=INFO, path=None, phase=None, duration=None):
+        self.message = message
+        self.level = level
+        self.path = path         # 처리 중인 repo 경로 (파일별 진행 줄)
+        self.phase = phase       # "upload", "recycle", "rename", "read", "commit" 등
+        self.duration = duration # 걸린 시간(초)
+        self.created = time.time()
+
+    def __str__(self):
+        return self.message
+
+# 1-(1) 동기화 상태 인덱스 (config.json 옆의 SQLite 파일)
+# 파일별 (크기, 수정 시각, inode, 마지막으로 동기화된 blob sha)와 마지막 동기화 때 본 브랜치 head를 저장해
+# 다음 실행 때 stat이 그대로인 파일은 다시 해시하지 않고, head가 그대로면 원격 트리 조회를 건너뛴다.
+# 원격 트리({경로: sha})는 로컬 파일 행과 따로 저장한다 : 로컬에서 읽지 못했거나, 무시 규칙에 걸리거나,
+# 업로드에 실패한 경로도 깃허브에는 있으므로 원격 목록을 로컬 행으로 대신하면 그 경로들이 빠진다.
+
+SYNC_INDEX_FILE = os.path.join(application_path, "sync_index.db")
+
+def sync_scope(settings):
+    # 같은 폴더라도 저장소/브랜치가 다르면 따로 기록
+    return f"{settings['username']}/{settings['repo']}@{settings.get('branch', 'main')}:{os.path.abspath(settings['folder'])}"
+
+def stat_key(st):
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+class SyncIndex:
+    def __init__(self, path=SYNC_INDEX_FILE):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS files (
+                    scope TEXT NOT NULL, repo_path TEXT NOT NULL,
+                    size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, inode INTEGER NOT NULL,
+                    sha TEXT NOT NULL,
+                    PRIMARY KEY (scope, repo_path));
+                CREATE TABLE IF NOT EXISTS heads (scope TEXT PRIMARY KEY, commit_sha TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS remote_files (
+                    scope TEXT NOT NULL, repo_path TEXT NOT NULL, sha TEXT NOT NULL,
+                    PRIMARY KEY (scope, repo_path));
+                CREATE TABLE IF NOT EXISTS remote_heads (scope TEXT PRIMARY KEY, commit_sha TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS remote_modes (
+                    scope TEXT NOT NULL, repo_path TEXT NOT NULL, mode TEXT NOT NULL,
+                    PRIMARY KEY (scope, repo_path));
+                CREATE TABLE IF NOT EXISTS rejected (
+                    scope TEXT NOT NULL, repo_path TEXT NOT NULL,
+                    size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, inode INTEGER NOT NULL,
+                    PRIMARY KEY (scope, repo_path));
+            """)
+
+    def load(self, scope):
+        # {repo_path: ((size, mtime_ns, inode), sha)}
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT repo_path, size, mtime_ns, inode, sha FROM files WHERE scope = ?", (scope,)).fetchall()
+        return {path: ((size, mtime_ns, inode), sha) for path, size, mtime_ns, inode, sha in rows}
+
+    def get_head(self, scope):
+        with self.lock:
+            row = self.conn.execute("SELECT commit_sha FROM heads WHERE scope = ?", (scope,)).fetchone()
+        return row[0] if row else None
+
+    def load_remote(self, scope):
+        # head 시점의 원격 트리 {repo_path: sha}. 저장된 적이 없거나 head와 어긋났으면 None (트리를 다시 받아야 함)
+        with self.lock:
+            heads = self.conn.execute(
+                "SELECT h.commit_sha FROM heads h JOIN remote_heads r ON r.scope = h.scope AND r.commit_sha = h.commit_sha "
+                "WHERE h.scope = ?", (scope,)).fetchone()
+            if heads is None:
+                return None
+            rows = self.conn.execute("SELECT repo_path, sha FROM remote_files WHERE scope = ?", (scope,)).fetchall()
+        return dict(rows)
+
+    def load_remote_modes(self, scope):
+        # 원격 트리에서 일반 파일(100644)이 아닌 경로의 mode {repo_path: mode}
+        with self.lock:
+            rows = self.conn.execute("SELECT repo_path, mode FROM remote_modes WHERE scope = ?", (scope,)).fetchall()
+        return dict(rows)
+
+    def replace_snapshot(self, scope, files, head_commit, remote_files, remote_modes=None):
+        # 초기 동기화가 끝난 뒤 전체 상태를 통째로 교체
+        # files = {repo_path: ((size, mtime_ns, inode), sha)}, remote_files = head_commit 시점의 {repo_path: sha}
+        # remote_modes = 그중 일반 파일이 아닌 경로의 {repo_path: mode}
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM remote_modes WHERE scope = ?", (scope,))
+            self.conn.executemany("INSERT INTO remote_modes VALUES (?, ?, ?)",
+                                  [(scope, path, mode) for path, mode in (remote_modes or {}).items()])
+            self.conn.execute("DELETE FROM files WHERE scope = ?", (scope,))
+            self.conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                                  [(scope, path, *key, sha) for path, (key, sha) in files.items()])
+            self.conn.execute("DELETE FROM remote_files WHERE scope = ?", (scope,))
+            self.conn.executemany("INSERT INTO remote_files VALUES (?, ?, ?)",
+                                  [(scope, path, sha) for path, sha in remote_files.items()])
+            self.conn.execute("INSERT OR REPLACE INTO heads VALUES (?, ?)", (scope, head_commit))
+            self.conn.execute("INSERT OR REPLACE INTO remote_heads VALUES (?, ?)", (scope, head_commit))
+
+    def apply_commit(self, scope, updated, removed, base_commit, new_commit, modes=None):
+        # 커밋 하나만큼의 변경을 반영. 인덱스가 base_commit 기준일 때만 head를 new_commit으로 옮긴다
+        # (그 사이 다른 곳에서 커밋됐다면 head를 그대로 두어 다음 실행 때 전체 트리를 다시 확인)
+        # modes : updated 중 일반 파일이 아닌 경로의 {repo_path: mode}
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM remote_modes WHERE scope = ? AND repo_path = ?",
+                                  [(scope, path) for path in [*updated, *removed]])
+            self.conn.executemany("INSERT INTO remote_modes VALUES (?, ?, ?)",
+                                  [(scope, path, mode) for path, mode in (modes or {}).items()])
+            self.conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                                  [(scope, path, *key, sha) for path, (key, sha) in updated.items()])
+            self.conn.executemany("DELETE FROM files WHERE scope = ? AND repo_path = ?",
+                                  [(scope, path) for path in removed])
+            self.conn.executemany("INSERT OR REPLACE INTO remote_files VALUES (?, ?, ?)",
+                                  [(scope, path, sha) for path, (_, sha) in updated.items()])
+            self.conn.executemany("DELETE FROM remote_files WHERE scope = ? AND repo_path = ?",
+                                  [(scope, path) for path in removed])
+            self.conn.executemany("DELETE FROM rejected WHERE scope = ? AND repo_path = ?",
+                                  [(scope, path) for path in [*updated, *removed]])
+            for table in ("heads", "remote_heads"):
+                self.conn.execute(f"UPDATE {table} SET commit_sha = ? WHERE scope = ? AND commit_sha = ?",
+                                  (new_commit, scope, base_commit))
+
+    def update_stats(self, scope, files):
+        # 커밋 없이 stat만 바뀐 파일(내용이 원격과 같은 파일)의 행을 갱신 : files = {repo_path: ((size, mtime_ns, inode), sha)}
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                                  [(scope, path, *key, sha) for path, (key, sha) in files.items()])
+
+    def load_rejected(self, scope):
+        # 크기 한도를 넘어 올리지 않은 파일과 그때의 stat {repo_path: (size, mtime_ns, inode)}
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT repo_path, size, mtime_ns, inode FROM rejected WHERE scope = ?", (scope,)).fetchall()
+        return {path: (size, mtime_ns, inode) for path, size, mtime_ns, inode in rows}
+
+    def record_rejected(self, scope, repo_path, key):
+        # stat이 바뀔 때까지 같은 파일을 다시 올리려 하지 않도록 기록
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO rejected VALUES (?, ?, ?, ?, ?)", (scope, repo_path, *key))
+
+    def forget_rejected(self, scope, paths):
+        # 지워졌거나 다른 이름으로 옮겨진 경로의 기록을 지운다
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM rejected WHERE scope = ? AND repo_path = ?",
+                                  [(scope, path) for path in paths])
+
+_sync_index = None
+_sync_index_lock = threading.Lock()
+
+def get_sync_index():
+    # 모든 스레드가 같은 인덱스(연결 1개)를 공유
+    global _sync_index
+    with _sync_index_lock:
+        if _sync_index is None:
+            _sync_index = SyncIndex()
+        return _sync_index
+
 
 # 2. Github API 로직
 
-api_session = requests.Session()
-def get_github_repo_file_list(settings, log_queue):
+GITHUB_API_URL = "https://api.github.com"
+RECYCLE_BIN_DIR = "_recycle_bin"
+REGULAR_FILE_MODE = "100644" # 트리 항목의 기본 mode (실행 파일 100755, 심볼릭 링크 120000은 원격 트리의 값을 유지)
+SYMLINK_MODE = "120000"
+
+# 2-(0) 요청 한도(rate limit) 관리
+# 모든 응답의 X-RateLimit-Remaining / X-RateLimit-Reset / Retry-After를 읽어
+# 한도에 가까워지면 모든 작업 스레드가 함께 속도를 늦춰 403/429를 맞기 전에 조절한다.
+
+RATE_LIMIT_RESERVE = 20 # 남은 요청이 이만큼 이하가 되면 리셋 시각까지 요청을 고르게 나눠 보낸다
+RATE_LIMIT_RETRIES = 3  # 그래도 403/429를 받으면 기다렸다가 다시 보내는 횟수
+
+class RateLimiter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.remaining = None  # 남은 요청 수 (아직 응답을 못 받았으면 None)
+        self.reset_at = 0.0    # 한도가 초기화되는 시각 (epoch 초)
+        self.blocked_until = 0.0 # Retry-After 등으로 모든 요청을 멈춰야 하는 시각
+
+    def wait(self):
+        # 요청을 보내기 전에 호출 : 필요한 만큼 기다린 뒤 요청 하나를 미리 차감
+        with self.lock:
+            now = time.time()
+            delay = self.blocked_until - now
+            if self.remaining is not None:
+                if self.remaining <= RATE_LIMIT_RESERVE and self.reset_at > now:
+                    delay = max(delay, (self.reset_at - now) / max(self.remaining, 1))
+                self.remaining = max(self.remaining - 1, 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def update(self, response):
+        headers = response.headers
+        with self.lock:
+            if "X-RateLimit-Remaining" in headers:
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+                self.reset_at = float(headers.get("X-RateLimit-Reset", 0))
+            retry_after = headers.get("Retry-After")
+            if retry_after:
+                try:
+                    retry_after = float(retry_after)
+                except ValueError: # 깃허브는 초 단위로 주지만 날짜 형식이면 1분 대기
+                    retry_after = 60.0
+                self.blocked_until = max(self.blocked_until, time.time() + retry_after)
+            elif is_rate_limited(response):
+                self.blocked_until = max(self.blocked_until, self.reset_at)
+
+def is_rate_limited(response):
+    if response.status_code == 429:
+        return True
+    return response.status_code == 403 and (
+        "Retry-After" in response.headers or response.headers.get("X-RateLimit-Remaining") == "0")
+
+# 2-(0.1) 조건부 요청(ETag / If-None-Match) 응답 캐시 (config.json 옆의 SQLite 파일)
+# GET 응답을 ETag/Last-Modified와 함께 저장해 두고 다음 요청에 If-None-Match/If-Modified-Since를 붙인다.
+# 304 Not Modified는 본문이 없고 요청 한도에서도 차감되지 않으므로 큰 트리 JSON을 다시 받지 않아도 된다.
+
+API_CACHE_FILE = os.path.join(application_path, "api_cache.db")
+API_CACHE_MAX_BYTES = 64 * 1024 * 1024 # 넘으면 가장 오래 쓰지 않은 응답부터 지운다 (LRU)
+
+class ResponseCache:
+    def __init__(self, path=API_CACHE_FILE, max_bytes=API_CACHE_MAX_BYTES):
+        self.lock = threading.Lock()
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,
+                    headers TEXT NOT NULL, body BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)""")
+            self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(url, headers, params):
+        # 토큰마다 볼 수 있는 내용이 다르므로 토큰의 해시도 키에 넣는다 (토큰 자체는 저장하지 않음)
+        token = hashlib.sha1((headers or {}).get("Authorization", "").encode("utf-8")).hexdigest()
+        query = json.dumps(sorted((params or {}).items()))
+        return f"{token} {url} {query}"
+
+    def validators(self, key):
+        # 저장된 응답이 있으면 조건부 요청에 붙일 헤더를 돌려준다
+        with self.lock:
+            row = self.conn.execute("SELECT etag, last_modified FROM responses WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return {}
+        etag, last_modified = row
+        return {"If-None-Match": etag} if etag else {"If-Modified-Since": last_modified}
+
+    def load(self, key, url):
+        # 304를 받았을 때 저장해 둔 응답을 200 응답처럼 만들어 돌려준다
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT headers, body FROM responses WHERE key = ?", (key,)).fetchone()
+            if not row:
+                return None
+            self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        response = requests.models.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = requests.structures.CaseInsensitiveDict(json.loads(row[0]))
+        response.encoding = "utf-8"
+        response._content = row[1]
+        return response
+
+    def store(self, key, response):
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        body = response.content
+        if not (etag or last_modified) or len(body) > self.max_bytes // 4:
+            return
+        headers = json.dumps({name: value for name, value in response.headers.items()
+                              if name.lower() in ("content-type", "etag", "last-modified")})
+        with self.lock, self.conn:
+            old = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                              (key, etag, last_modified, headers, body, len(body), time.time()))
+            self.total_bytes += len(body) - (old[0] if old else 0)
+            while self.total_bytes > self.max_bytes:
+                victim = self.conn.execute(
+                    "SELECT key, size FROM responses ORDER BY last_used LIMIT 1").fetchone()
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (victim[0],))
+                self.total_bytes -= victim[1]
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache():
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
+
+# 2-(0.2) HTTP 전송 계층
+# 모든 깃허브 호출이 거치는 한 곳 : 작업 스레드 수에 맞춘 연결 풀(keep-alive), 요청별 timeout,
+# 다시 보내도 안전한 요청의 재시도(지수 백오프 + 지터), 엔드포인트별 요청 수/바이트/지연 시간 집계.
+
+HTTP_TIMEOUT = (10, 60)   # (연결, 응답 대기) 초 : 패킷이 사라져도 작업 스레드가 영원히 멈추지 않게
+HTTP_RETRIES = 4          # 네트워크 오류/5xx 재시도 횟수
+HTTP_BACKOFF_BASE = 0.5   # 첫 재시도 대기(초), 이후 2배씩 늘어나고 0~그 값 사이에서 무작위로 고른다
+HTTP_BACKOFF_MAX = 30.0
+RETRY_STATUS_CODES = {500, 502, 503, 504}
+# 같은 내용이면 같은 객체(sha)가 만들어져 다시 보내도 안전한 POST
+IDEMPOTENT_POST_PATHS = ("git/blobs", "git/trees", "git/commits")
+
+def endpoint_name(method, path):
+    # "git/trees/main?recursive=1" → "GET git/trees", "contents/a/b.py" → "PUT contents"
+    parts = path.split("?")[0].split("/")
+    return f"{method} {'/'.join(parts[:2]) if parts[0] == 'git' else parts[0]}"
+
+class TransportStats:
+    FIELDS = ("requests", "errors", "retries", "bytes_sent", "bytes_received", "seconds", "cache_hits", "cache_misses")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+
+    def record(self, endpoint, **values):
+        with self.lock:
+            counters = self.endpoints[endpoint]
+            for key, value in values.items():
+                counters[key] += value
+
+    def snapshot(self):
+        with self.lock:
+            return {endpoint: dict(counters) for endpoint, counters in self.endpoints.items()}
+
+    def summary_lines(self, since=None):
+        # since(이전 snapshot) 이후에 늘어난 만큼만 한 줄씩 요약
+        since = since or {}
+        lines = []
+        for endpoint, counters in sorted(self.snapshot().items()):
+            before = since.get(endpoint, {})
+            delta = {key: counters[key] - before.get(key, 0) for key in self.FIELDS}
+            if not delta["requests"]:
+                continue
+            lines.append(f"   {endpoint}: {delta['requests']}회 (재시도 {delta['retries']}, 오류 {delta['errors']}), "
+                         f"평균 {delta['seconds'] / delta['requests'] * 1000:.0f}ms, "
+                         f"보냄 {delta['bytes_sent'] / 1024:.1f}KB / 받음 {delta['bytes_received'] / 1024:.1f}KB"
+                         + (f", 캐시 적중 {delta['cache_hits']}/{delta['cache_hits'] + delta['cache_misses']}"
+                            if delta["cache_hits"] + delta["cache_misses"] else ""))
+        return lines
+
+class GitHubTransport:
+    def __init__(self, pool_size=10):
+        self.session = requests.Session()
+        self.rate_limiter = RateLimiter()
+        self.stats = TransportStats()
+        self.configure_pool(pool_size)
+
+    def configure_pool(self, pool_size):
+        # 동시에 요청하는 작업 스레드 수만큼 연결을 열어 두고 재사용 (TLS 연결을 매번 새로 맺지 않음)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff(self, attempt):
+        time.sleep(random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** attempt)))
+
+    def request(self, method, url, endpoint, retryable, **kwargs):
+        if method == "GET":
+            return self._cached_get(url, endpoint, retryable, **kwargs)
+        return self._send(method, url, endpoint, retryable, **kwargs)
+
+    def _cached_get(self, url, endpoint, retryable, **kwargs):
+        cache = get_response_cache()
+        key = cache.make_key(url, kwargs.get("headers"), kwargs.get("params"))
+        validators = cache.validators(key)
+        kwargs["headers"] = {**kwargs.get("headers", {}), **validators}
+        response = self._send("GET", url, endpoint, retryable, **kwargs)
+        if response.status_code == 304 and validators:
+            cached = cache.load(key, url)
+            if cached is not None:
+                self.stats.record(endpoint, cache_hits=1)
+                return cached
+            # 그 사이 캐시에서 지워졌다면 조건 없이 다시 받는다
+            kwargs["headers"] = {name: value for name, value in kwargs["headers"].items() if name not in validators}
+            response = self._send("GET", url, endpoint, retryable, **kwargs)
+        self.stats.record(endpoint, cache_misses=1)
+        if response.status_code == 200:
+            cache.store(key, response)
+        return response
+
+    def _send(self, method, url, endpoint, retryable, **kwargs):
+        kwargs.setdefault("timeout", HTTP_TIMEOUT)
+        if "json" in kwargs: # 한 번만 직렬화해서 보낸 바이트 수도 함께 센다
+            kwargs["data"] = json.dumps(kwargs.pop("json")).encode("utf-8")
+            kwargs["headers"] = {**kwargs.get("headers", {}), "Content-Type": "application/json"}
+        elif isinstance(kwargs.get("data"), StreamedJsonBody):
+            kwargs["headers"] = {**kwargs.get("headers", {}), "Content-Type": "application/json"}
+        body = kwargs.get("data")
+        sent = len(body) if isinstance(body, (bytes, str, StreamedJsonBody)) else 0
+        attempts, rate_limited = 0, 0
+        while True:
+            self.rate_limiter.wait()
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self.stats.record(endpoint, requests=1, errors=1, bytes_sent=sent, seconds=time.perf_counter() - started)
+                if not retryable or attempts >= HTTP_RETRIES:
+                    raise
+                self.stats.record(endpoint, retries=1)
+                self._backoff(attempts)
+                attempts += 1
+                continue
+            self.rate_limiter.update(response)
+            elapsed = time.perf_counter() - started
+            self.stats.record(endpoint, requests=1, bytes_sent=sent, bytes_received=len(response.content),
+                              seconds=elapsed, errors=int(response.status_code >= 400))
+            metrics.observe("github_request_seconds", elapsed, endpoint=endpoint)
+            # 한도 초과로 거절된 요청은 처리되지 않았으므로 rate_limiter가 기다린 뒤 그대로 다시 보낸다
+            if is_rate_limited(response) and rate_limited < RATE_LIMIT_RETRIES:
+                rate_limited += 1
+                self.stats.record(endpoint, retries=1)
+                continue
+            if response.status_code in RETRY_STATUS_CODES and retryable and attempts < HTTP_RETRIES:
+                self.stats.record(endpoint, retries=1)
+                self._backoff(attempts)
+                attempts += 1
+                continue
+            return response
+
+transport = GitHubTransport()
+
+# 2-(0.3) 동기화 지표(metrics)
+# 엔드포인트별 요청 지연 시간, 단계별(트리 조회/스캔/업로드) 소요 시간, 업로드한 파일·바이트 수, 업로드 대기열 길이,
+# 남은 요청 한도, 진행률을 모아 두고 JSON(metrics.json)과 Prometheus 텍스트 파일(metrics.prom)로 주기적으로 내보낸다.
+# 요청 수/바이트/재시도 같은 엔드포인트별 카운터는 transport.stats를 그대로 쓴다.
+
+METRICS_JSON_FILE = os.path.join(application_path, "metrics.json")
+METRICS_PROM_FILE = os.path.join(application_path, "metrics.prom")
+METRICS_EXPORT_INTERVAL = 10.0 # 초
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets) # 각 구간 "이하"의 누적 개수 (Prometheus 방식)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def to_dict(self):
+        return {"count": self.count, "sum": round(self.sum, 6),
+                "buckets": {str(bound): count for bound, count in zip(self.buckets, self.counts)}}
+
+class SyncMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)  # {(이름, 레이블): 값}
+        self.gauges = {}                    # {(이름, 레이블): 값}
+        self.histograms = {}                # {(이름, 레이블): Histogram}
+        self.progress_total = 0
+        self.progress_done = 0
+        self.progress_started = None
+        self.exporter = None
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        with self.lock:
+            self.counters[self._key(name, labels)] += value
+
+    def set_gauge(self, name, value, **labels):
+        with self.lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    def begin_progress(self):
+        # 새 배치가 시작될 때 : 지난 작업이 모두 끝났으면 진행률을 0부터 다시 센다 (진행 중이면 이어서 더한다)
+        with self.lock:
+            if self.progress_started is None or self.progress_done >= self.progress_total:
+                self.progress_total, self.progress_done = 0, 0
+                self.progress_started = time.monotonic()
+
+    def add_progress_total(self, count):
+        with self.lock:
+            self.progress_total += count
+
+    def advance(self, count=1):
+        with self.lock:
+            self.progress_done = min(self.progress_done + count, self.progress_total)
+
+    def progress(self):
+        # (완료, 전체, 남은 예상 시간(초) 또는 None)
+        with self.lock:
+            done, total, started = self.progress_done, self.progress_total, self.progress_started
+        eta = None
+        if started is not None and 0 < done < total:
+            eta = (time.monotonic() - started) / done * (total - done)
+        return done, total, eta
+
+    def snapshot(self):
+        done, total, eta = self.progress()
+        with self.lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            histograms = {key: histogram.to_dict() for key, histogram in self.histograms.items()}
+        if transport.rate_limiter.remaining is not None:
+            gauges[("github_rate_limit_remaining", ())] = transport.rate_limiter.remaining
+        gauges[("sync_progress_done", ())] = done
+        gauges[("sync_progress_total", ())] = total
+        if _upload_scheduler is not None:
+            gauges[("upload_queue_depth", ())] = _upload_scheduler.queue_depth
+        dedup_hits = counters.get(("dedup_hits_total", ()), 0)
+        blob_count = dedup_hits + counters.get(("uploaded_files_total", ()), 0)
+        if blob_count:
+            gauges[("dedup_hit_ratio", ())] = dedup_hits / blob_count
+        for endpoint, values in transport.stats.snapshot().items():
+            for field, value in values.items():
+                name = "github_request_time_seconds_total" if field == "seconds" else f"github_{field}_total"
+                counters[(name, (("endpoint", endpoint),))] = value
+
+        def entries(items):
+            return [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in sorted(items.items())]
+        return {"time": time.time(), "counters": entries(counters), "gauges": entries(gauges),
+                "histograms": entries(histograms), "eta_seconds": eta}
+
+    def to_prometheus(self, snapshot=None):
+        snapshot = snapshot or self.snapshot()
+
+        def labels_text(labels, extra=None):
+            items = list(labels.items()) + ([extra] if extra else [])
+            if not items:
+                return ""
+            return "{" + ",".join(f'{key}="{str(value).replace(chr(34), chr(39))}"' for key, value in items) + "}"
+        lines, typed = [], set()
+        for kind, entries in (("counter", snapshot["counters"]), ("gauge", snapshot["gauges"])):
+            for entry in entries:
+                name = f"uploader_{entry['name']}"
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name}{labels_text(entry['labels'])} {entry['value']}")
+        for entry in snapshot["histograms"]:
+            name, labels, histogram = f"uploader_{entry['name']}", entry["labels"], entry["value"]
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            for bound, count in histogram["buckets"].items():
+                lines.append(f"{name}_bucket{labels_text(labels, ('le', bound))} {count}")
+            lines.append(f"{name}_bucket{labels_text(labels, ('le', '+Inf'))} {histogram['count']}")
+            lines.append(f"{name}_sum{labels_text(labels)} {histogram['sum']}")
+            lines.append(f"{name}_count{labels_text(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, json_path=None, prom_path=None):
+        # 임시 파일에 쓰고 바꿔치기 : 수집기가 반쯤 쓰인 파일을 읽지 않도록
+        snapshot = self.snapshot()
+        for path, text in ((json_path or METRICS_JSON_FILE, json.dumps(snapshot, ensure_ascii=False, indent=2)),
+                           (prom_path or METRICS_PROM_FILE, self.to_prometheus(snapshot))):
+            try:
+                with open(path + ".tmp", "w", encoding="utf-8") as f:
+                    f.write(text)
+                os.replace(path + ".tmp", path)
+            except OSError:
+                pass # 지표 파일을 못 써도 동기화는 계속한다
+
+    def start_exporter(self, interval=METRICS_EXPORT_INTERVAL):
+        # 주기적으로 파일을 내보내는 스레드 (한 번만 시작)
+        with self.lock:
+            if self.exporter is not None:
+                return
+            self.exporter = threading.Thread(target=self._export_loop, args=(interval,), daemon=True)
+        self.exporter.start()
+
+    def _export_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            self.export()
+
+metrics = SyncMetrics()
+
+def github_api_url(settings, path):
+    # 저장소 기준 API 주소 (예: git/blobs, contents/a.py)
+    # 설정의 "api_url"로 다른 서버(GitHub Enterprise, 벤치마크용 가짜 서버 등)를 쓸 수 있다
+    base_url = settings.get("api_url") or GITHUB_API_URL
+    return f"{base_url.rstrip('/')}/repos/{settings['username']}/{settings['repo']}/{path}"
+
+def github_headers(settings):
+    return {"Authorization": f"token {settings['token']}"}
+
+def is_retryable_request(method, path, body):
+    # 조회, 내용 주소 기반 POST, sha를 함께 보내는(다른 변경을 덮어쓰지 않는) 쓰기만 다시 보낸다
+    if method in ("GET", "HEAD"):
+        return True
+    if method == "POST":
+        return path.startswith(IDEMPOTENT_POST_PATHS)
+    if isinstance(body, StreamedJsonBody):
+        body = body.fields
+    return isinstance(body, dict) and bool(body.get("sha"))
+
+def github_request(method, settings, path, **kwargs):
+    # 모든 깃허브 API 호출은 같은 전송 계층(연결 풀, timeout, 재시도, 요청 한도 관리, 통계)을 거친다
+    retryable = is_retryable_request(method, path, kwargs.get("json", kwargs.get("data")))
+    return transport.request(method, github_api_url(settings, path), endpoint_name(method, path), retryable,
+                             headers=github_headers(settings), **kwargs)
+
+def get_github_repo_file_list(settings, log_queue, ref=None):
     # Git Trees API를 사용하여 저장소의 모든 파일 목록을 재귀적으로 가져온다
-    branch = settings.get("branch", "main")
-    api_url = f"https://api.github.com/repos/{settings['username']}/{settings['repo']}/git/trees/{branch}?recursive=1"
-    headers = {"Authorization": f"token {settings['token']}"}
+    # 반환값 : {파일 경로: blob sha} (sha로 내용이 바뀐 파일을 찾아낸다)
+    # ref에 커밋 sha를 주면 브랜치가 그 사이 움직여도 확인한 head와 같은 시점의 트리를 본다
+    ref = ref or settings.get("branch", "main")
     try:
-        response = api_session.get(api_url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        
-        # '_recycle_bin/'으로 시작하는 경로는 목록에서 제외(휴지통 폴더여서 지워지지않게)
-        return {item['path'] for item in data['tree'] 
-                if item['type'] == 'blob' and not item['path'].startswith('_recycle_bin/')}
+        files, modes = load_remote_tree(settings, log_queue, ref)
+        get_remote_state(settings).replace(files, modes)
+        return files
     
     except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 404:
+        if e.response.status_code in (404, 409): # 409 : Git Repository is empty
             log_queue.put("ℹ️ 깃허브 저장소 또는 브랜치를 찾을 수 없습니다. (빈 저장소일 수 있음)")
-            return set() # 빈 저장소 일 경우 동기화가 안되는 문제
+            get_remote_state(settings).replace({})
+            return {} # 빈 저장소 일 경우 동기화가 안되는 문제
         else:
-            log_queue.put(f"❌ 깃허브 파일 목록 조회 실패 (HTTP 오류): {e}")
+            log_queue.put(LogEvent(f"❌ 깃허브 파일 목록 조회 실패 (HTTP 오류): {e}", ERROR))
             return None
     except Exception as e:
-        log_queue.put(f"❌ 깃허브 파일 목록 조회 실패 (일반 오류): {e}")
+        log_queue.put(LogEvent(f"❌ 깃허브 파일 목록 조회 실패 (일반 오류): {e}", ERROR))
+        return None
+
+# 2-(0.4) 큰 저장소의 트리 읽기
+# 재귀 트리 응답은 항목이 너무 많으면(GitHub 기준 10만 개 / 7MB) 잘린 채 truncated: true로 온다.
+# 잘렸으면 루트를 한 단계만 받아 하위 폴더(트리)별로 나눠 병렬로 받고, 그 폴더도 잘리면 다시 한 단계씩 내려간다.
+# 응답은 response.json()으로 통째로 dict/list를 만들지 않고 조각 단위로 읽으며 항목마다 {경로: sha}에만 넣는다.
+TREE_FETCH_WORKERS = 4
+TREE_CHUNK_SIZE = 64 * 1024
+TREE_ARRAY_RE = re.compile(r'"tree"\s*:\s*\[')
+TREE_TRUNCATED_RE = re.compile(r'"truncated"\s*:\s*true')
+
+def parse_tree_entries(chunks, on_entry):
+    # 트리 JSON 문자열 조각을 차례로 읽으며 "tree" 배열의 항목마다 on_entry(path, type, sha, mode)를 부른다
+    # 반환값 : 응답이 잘렸는지(truncated) 여부
+    decoder = json.JSONDecoder()
+    chunks = iter(chunks)
+    buffer, pos = "", 0
+
+    def fill():
+        # 다 읽은 앞부분은 버리고 다음 조각을 붙인다. 더 읽을 조각이 없으면 False
+        nonlocal buffer, pos
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        buffer, pos = buffer[pos:] + chunk, 0
+        return True
+
+    while not (match := TREE_ARRAY_RE.search(buffer)):
+        if not fill():
+            raise ValueError("트리 응답에 tree 목록이 없습니다.")
+    header, pos = buffer[:match.start()], match.end()
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buffer):
+            if not fill():
+                raise ValueError("트리 응답이 중간에 끊겼습니다.")
+            continue
+        if buffer[pos] == "]":
+            break
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if not fill(): # 항목이 조각 경계에 걸쳐 있으면 다음 조각을 붙여 다시 읽는다
+                raise
+            continue
+        on_entry(item["path"], item["type"], item["sha"], item.get("mode", REGULAR_FILE_MODE))
+        pos = end
+    tail = buffer[pos:] + "".join(chunks)
+    return bool(TREE_TRUNCATED_RE.search(header + tail))
+
+def fetch_tree_entries(settings, tree_ref, prefix, recursive):
+    # 트리 하나를 받아 (파일 {경로: sha}, 일반 파일이 아닌 파일의 {경로: mode}, 더 내려가야 할 하위 트리 [(경로, sha)],
+    # 잘렸는지)를 돌려준다 (휴지통 폴더는 받지 않고, 재귀로 받을 때는 하위 트리 항목을 따로 모으지 않는다)
+    response = github_request("GET", settings, f"git/trees/{tree_ref}" + ("?recursive=1" if recursive else ""))
+    response.raise_for_status()
+    files, modes, subtrees = {}, {}, []
+
+    def on_entry(path, kind, sha, mode):
+        path = prefix + path
+        if path == RECYCLE_BIN_DIR or path.startswith(RECYCLE_BIN_DIR + "/"):
+            return
+        if kind == "blob":
+            files[path] = sha
+            if mode != REGULAR_FILE_MODE:
+                modes[path] = mode
+        elif kind == "tree" and not recursive:
+            subtrees.append((path, sha))
+
+    # 본문 바이트를 조각으로 나눠 문자열로 바꾸며 읽는다 (조각 경계에 걸친 UTF-8 글자는 다음 조각과 합쳐짐)
+    body, decoder = response.content, codecs.getincrementaldecoder("utf-8")()
+    chunks = (decoder.decode(body[start:start + TREE_CHUNK_SIZE]) for start in range(0, len(body), TREE_CHUNK_SIZE))
+    truncated = parse_tree_entries(chunks, on_entry)
+    return files, modes, subtrees, truncated
+
+def fetch_subtree(settings, path, tree_sha):
+    # 하위 폴더 하나 : 먼저 재귀로 받아 보고, 잘렸으면 한 단계만 받아 그 아래 폴더를 다시 나눈다
+    files, modes, _, truncated = fetch_tree_entries(settings, tree_sha, path + "/", recursive=True)
+    if not truncated:
+        return files, modes, []
+    files, modes, subtrees, _ = fetch_tree_entries(settings, tree_sha, path + "/", recursive=False)
+    return files, modes, subtrees
+
+def load_remote_tree(settings, log_queue, ref):
+    # 저장소 전체의 ({파일 경로: blob sha}, 일반 파일이 아닌 파일의 {경로: mode}) (휴지통 제외)
+    files, modes, _, truncated = fetch_tree_entries(settings, ref, "", recursive=True)
+    if not truncated:
+        return files, modes
+    log_queue.put("ℹ️ 저장소가 커서 파일 목록이 잘려 왔습니다. 폴더별로 나눠 다시 받습니다.")
+    files, modes, subtrees, _ = fetch_tree_entries(settings, ref, "", recursive=False)
+    requests_made = 2
+    with ThreadPoolExecutor(max_workers=TREE_FETCH_WORKERS, thread_name_prefix="tree") as executor:
+        pending = {executor.submit(fetch_subtree, settings, path, sha) for path, sha in subtrees}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                subtree_files, subtree_modes, more = future.result()
+                files.update(subtree_files)
+                modes.update(subtree_modes)
+                requests_made += 1 if not more else 2
+                pending |= {executor.submit(fetch_subtree, settings, path, sha) for path, sha in more}
+    log_queue.put(f"ℹ️ 파일 {len(files)}개 목록을 트리 요청 {requests_made}번으로 받았습니다.")
+    return files, modes
+
+# 2-(0.5) 커밋 비교(compare)로 원격 변경분만 반영
+# 마지막 동기화 때의 head 커밋(동기화 상태 인덱스)에서 브랜치가 앞으로만 움직였다면 전체 트리 대신
+# compare/{이전 head}...{지금 head}로 그 사이 바뀐 파일만 받아, 저장소 크기가 아닌 변경 수만큼만 내려받는다.
+COMPARE_MAX_FILES = 300 # compare 응답은 파일을 300개까지만 담으므로 이만큼 바뀌었으면 전체 트리를 다시 받는다
+
+def apply_remote_compare(settings, log_queue, base_files, base_commit, head_commit, base_modes=None):
+    # base_files(base_commit 시점의 {경로: sha})에 바뀐 파일만 반영해 head_commit 시점의 목록을 만든다
+    # (compare 응답에는 mode가 없어 base_modes의 mode를 그대로 잇는다 : 이름이 바뀐 파일은 새 경로로 옮김)
+    # 반환값 : {파일 경로: blob sha}. 히스토리가 다시 쓰였거나(force push 등) 변경이 너무 많으면 None (전체 트리를 받아야 함)
+    try:
+        response = github_request("GET", settings, f"compare/{base_commit}...{head_commit}")
+        if response.status_code == 404: # 이전 head 커밋이 더 이상 없음 (히스토리가 다시 쓰임)
+            data = {"status": "diverged"}
+        else:
+            response.raise_for_status()
+            data = response.json()
+    except Exception as e:
+        log_queue.put(LogEvent(f"⚠️ 커밋 비교 실패, 전체 파일 목록을 다시 받습니다: {e}", WARNING))
+        return None
+    changed = data.get("files") or []
+    if data.get("status") not in ("ahead", "identical"):
+        log_queue.put("ℹ️ 깃허브 브랜치의 히스토리가 바뀌어(force push 등) 전체 파일 목록을 다시 받습니다.")
+        return None
+    if len(changed) >= COMPARE_MAX_FILES:
+        log_queue.put(f"ℹ️ 깃허브에서 바뀐 파일이 {COMPARE_MAX_FILES}개 이상이라 전체 파일 목록을 다시 받습니다.")
         return None
+    files, modes = dict(base_files), dict(base_modes or {})
+    for item in changed:
+        path = item["filename"]
+        if item.get("previous_filename"): # 이름 변경
+            files.pop(item["previous_filename"], None)
+            mode = modes.pop(item["previous_filename"], None)
+            if mode:
+                modes[path] = mode
+        if item["status"] == "removed":
+            files.pop(path, None)
+            modes.pop(path, None)
+        elif not item.get("sha"):
+            return None
+        elif not path.startswith(RECYCLE_BIN_DIR + "/"):
+            files[path] = item["sha"]
+    get_remote_state(settings).replace(files, modes)
+    log_queue.put(f"ℹ️ 마지막 동기화 이후 깃허브에서 바뀐 파일 {len(changed)}개만 반영했습니다. (커밋 비교)")
+    return files
+
+# 2-(1) 로컬 파일의 git blob sha 계산
+HASH_CHUNK_SIZE = 1024 * 1024 # 큰 파일도 이 크기씩 나눠 읽어 메모리 사용량을 일정하게 유지
+DEFAULT_HASH_WORKERS = min(8, os.cpu_count() or 1)
+
+def compute_git_blob_sha(local_path):
+    # git과 같은 방식("blob <길이>\0" + 내용)으로 SHA-1을 계산하면
+    # 깃허브 트리의 sha와 바로 비교할 수 있어 내용을 내려받지 않고도 수정 여부를 알 수 있다
+    with open(local_path, "rb") as file:
+        digest = hashlib.sha1(b"blob %d\0" % os.fstat(file.fileno()).st_size)
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def git_blob_sha(data):
+    # 이미 읽어 둔 내용의 git blob sha
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+# 2-(1.1) 로컬 폴더 스캐너
+# os.scandir로 폴더를 훑으며 DirEntry에 이미 들어 있는 stat을 그대로 쓰고,
+# 해시가 필요한 파일은 작업 스레드 여러 개에 나눠 맡긴다 (hashlib은 해시 중에 GIL을 놓는다).
+# 결과는 생성기로 하나씩 내보내므로 스캔이 끝나기 전에 업로드를 시작할 수 있다.
+
+def entry_stat_key(entry):
+    st = entry.stat()
+    return st.st_size, st.st_mtime_ns, entry.inode() # Windows에서는 entry.stat()의 st_ino가 0이라 inode()를 쓴다
+
+class LocalScanner:
+    def __init__(self, folder, ignore_rules, indexed_files=None, workers=DEFAULT_HASH_WORKERS, rejected=None):
+        self.folder = folder
+        self.ignore_rules = ignore_rules
+        self.indexed_files = indexed_files or {} # 동기화 상태 인덱스 {repo_path: (stat 키, sha)}
+        self.rejected = rejected or {} # 크기 한도를 넘어 올리지 않은 파일 {repo_path: stat 키}
+        self.workers = max(workers, 1)
+        self.scanned = 0
+        self.rehashed = 0
+
+    def iter_files(self):
+        # (repo_path, local_path, stat 키) 생성기. 무시할 폴더는 내려가지 않고, stat을 못 읽은 파일은 키가 None
+        stack = [("", self.folder)]
+        while stack:
+            rel_dir, local_dir = stack.pop()
+            try:
+                with os.scandir(local_dir) as entries:
+                    for entry in entries:
+                        repo_path = rel_dir + entry.name
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if not self.ignore_rules.is_ignored(repo_path, is_dir=True):
+                                    stack.append((repo_path + "/", entry.path))
+                                continue
+                            if not entry.is_file() or self.ignore_rules.is_ignored(repo_path):
+                                continue
+                            key = entry_stat_key(entry)
+                        except OSError:
+                            key = None
+                        yield repo_path, entry.path, key
+            except OSError:
+                continue # 열 수 없는 폴더는 건너뛴다
+
+    def scan(self):
+        # (repo_path, local_path, stat 키, sha, 오류) 생성기
+        # stat이 인덱스와 같으면 바로 내보내고, 다르면 해시 작업에 맡겼다가 끝나는 대로 내보낸다
+        # 크기 한도로 거부된 뒤 stat이 그대로인 파일은 읽지 않고 sha를 None으로 내보낸다
+        max_pending = self.workers * 4 # 기다리는 해시 작업 수를 제한해 아주 큰 폴더에서도 메모리를 일정하게 유지
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hash") as executor:
+            pending = {}
+            for repo_path, local_path, key in self.iter_files():
+                self.scanned += 1
+                if key is None:
+                    yield repo_path, local_path, None, None, OSError(f"파일 정보를 읽을 수 없습니다: {local_path}")
+                    continue
+                indexed = self.indexed_files.get(repo_path)
+                if indexed and indexed[0] == key:
+                    yield repo_path, local_path, key, indexed[1], None # stat이 그대로면 해시를 다시 계산하지 않음
+                    continue
+                if self.rejected.get(repo_path) == key:
+                    yield repo_path, local_path, key, None, None
+                    continue
+                pending[executor.submit(self._hash, local_path)] = (repo_path, local_path, key)
+                if len(pending) >= max_pending:
+                    yield from self._collect(pending, wait_all=False)
+            yield from self._collect(pending, wait_all=True)
+
+    def _hash(self, local_path):
+        started = time.perf_counter()
+        sha = compute_git_blob_sha(local_path)
+        metrics.observe("hash_seconds", time.perf_counter() - started)
+        return sha
+
+    def _collect(self, pending, wait_all):
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                repo_path, local_path, key = pending.pop(future)
+                try:
+                    sha = future.result()
+                except OSError as e:
+                    yield repo_path, local_path, key, None, e
+                    continue
+                self.rehashed += 1
+                yield repo_path, local_path, key, sha, None
+            if not wait_all:
+                return
+
+# 2-(2) 원격 상태 캐시 (경로 → blob sha)
+# 트리 조회 결과로 채우고, 업로드/커밋 응답의 sha로 계속 갱신한다.
+# 업로드와 휴지통 이동이 이 캐시에서 sha를 꺼내 쓰므로 요청마다 GET으로 sha를 물어볼 필요가 없다.
+
+class RemoteState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.shas = {}
+        self.modes = {} # 일반 파일(100644)이 아닌 경로의 mode {경로: mode} (실행 파일 100755, 심볼릭 링크 120000)
+        self.blob_refs = defaultdict(int) # {blob sha: 그 내용을 가리키는 경로 수} (같은 내용이 이미 있는지 확인용)
+
+    def replace(self, files, modes=None):
+        with self.lock:
+            self.shas = dict(files)
+            self.modes = {path: mode for path, mode in (modes or {}).items() if path in self.shas}
+            self.blob_refs = defaultdict(int)
+            for sha in self.shas.values():
+                self.blob_refs[sha] += 1
+
+    def get(self, repo_path):
+        with self.lock:
+            return self.shas.get(repo_path)
+
+    def mode(self, repo_path):
+        # 원격 트리에 있는 파일의 mode (없는 경로면 None)
+        with self.lock:
+            if repo_path not in self.shas:
+                return None
+            return self.modes.get(repo_path, REGULAR_FILE_MODE)
+
+    def has_blob(self, sha):
+        with self.lock:
+            return self.blob_refs.get(sha, 0) > 0
+
+    def set(self, repo_path, sha, mode=None):
+        # mode를 주지 않으면 그 경로의 원래 mode를 유지한다
+        with self.lock:
+            self._unref(self.shas.get(repo_path))
+            self.shas[repo_path] = sha
+            self.blob_refs[sha] += 1
+            if mode == REGULAR_FILE_MODE:
+                self.modes.pop(repo_path, None)
+            elif mode:
+                self.modes[repo_path] = mode
+
+    def remove(self, repo_path):
+        with self.lock:
+            self._unref(self.shas.pop(repo_path, None))
+            self.modes.pop(repo_path, None)
+
+    def _unref(self, sha):
+        if sha is not None:
+            self.blob_refs[sha] -= 1
+            if self.blob_refs[sha] <= 0:
+                del self.blob_refs[sha]
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.shas)
+
+    def modes_snapshot(self):
+        with self.lock:
+            return dict(self.modes)
+
+    def paths_under(self, directory):
+        prefix = directory.rstrip("/") + "/"
+        with self.lock:
+            return [path for path in self.shas if path.startswith(prefix)]
+
+_remote_states = {}
+_remote_states_lock = threading.Lock()
+
+def repo_branch_key(settings):
+    return f"{settings['username']}/{settings['repo']}@{settings.get('branch', 'main')}"
+
+def get_remote_state(settings):
+    # 같은 저장소/브랜치를 쓰는 모든 스레드(프로필)가 캐시 하나를 공유
+    key = repo_branch_key(settings)
+    with _remote_states_lock:
+        if key not in _remote_states:
+            _remote_states[key] = RemoteState()
+        return _remote_states[key]
     
 # 3. Github 업로드 로직   
 
+# 3-(0) 큰 파일 업로드
+# 파일 전체를 읽어 base64 문자열로 바꾸고 JSON으로 직렬화하면 파일 크기의 4배 가까운 메모리를 한꺼번에 쓴다.
+# 읽기 전에 stat으로 크기를 먼저 보고, 깃허브 한도를 넘는 파일은 읽지도 보내지도 않는다.
+# STREAM_UPLOAD_MIN_BYTES 이상인 파일은 요청 본문(JSON)을 조각 단위로 읽고 인코딩하며 보내 메모리를 조각 크기만큼만 쓴다.
+GITHUB_MAX_FILE_BYTES = 100 * 1024 * 1024 # 깃허브가 받는 파일 하나의 최대 크기 (넘으면 push/API 모두 거절)
+STREAM_UPLOAD_MIN_BYTES = 1024 * 1024
+UPLOAD_CHUNK_SIZE = 3 * 256 * 1024 # 3의 배수로 읽어야 조각별 base64를 이어 붙여도 전체를 한 번에 인코딩한 것과 같다
+
+class StreamedJsonBody:
+    # {"필드": ..., "content": "<파일 내용 base64>"} 형태의 요청 본문을 조각 단위로 만들어 내보낸다.
+    # 길이를 미리 알려 Content-Length로 보내고, 재시도할 때마다 파일을 처음부터 다시 읽는다.
+    def __init__(self, local_path, fields, size):
+        self.local_path = local_path
+        self.fields = fields # 재시도 전에 sha 등을 바꾸면 다음 전송에 반영된다
+        self.size = size # 읽기 전에 stat으로 잰 크기
+
+    def _head(self):
+        head = json.dumps(self.fields)[:-1]
+        return (head + (', ' if self.fields else '') + '"content": "').encode("utf-8")
+
+    def __len__(self):
+        return len(self._head()) + (self.size + 2) // 3 * 4 + len(b'"}')
+
+    def __iter__(self):
+        yield self._head()
+        remaining = self.size
+        with open(self.local_path, "rb") as file:
+            while remaining:
+                chunk = file.read(min(UPLOAD_CHUNK_SIZE, remaining))
+                if not chunk:
+                    # 보내는 도중에 파일이 줄었다 : 알린 길이를 채울 수 없으므로 이번 업로드는 실패로 두고 다시 시도
+                    raise OSError(f"업로드 중에 파일이 바뀌었습니다: {self.local_path}")
+                remaining -= len(chunk)
+                yield base64.b64encode(chunk)
+        yield b'"}'
+
+def check_upload_size(size, repo_path, log_queue, settings=None, key=None):
+    # 깃허브 한도를 넘는 파일은 읽기 전에 건너뛴다 (다시 시도해도 성공할 수 없음)
+    # settings와 stat 키를 주면 인덱스에 기록해 stat이 바뀔 때까지 reconcile/재시작 때 다시 보내지 않는다
+    if size <= GITHUB_MAX_FILE_BYTES:
+        return True
+    if settings is not None and key is not None:
+        get_sync_index().record_rejected(sync_scope(settings), repo_path, key)
+    log_queue.put(LogEvent(f"   ❌ '{repo_path}' 파일이 {size / 1024 / 1024:.1f}MB로 깃허브 파일 크기 한도"
+                           f"({GITHUB_MAX_FILE_BYTES // 1024 // 1024}MB)를 넘어 업로드하지 않습니다.",
+                           ERROR, path=repo_path, phase="upload"))
+    metrics.inc("oversized_files_total")
+    return False
+
 # 3-(1) 파일 업로드 함수
-def upload_file_to_github(local_path, repo_path, settings, log_queue):
-    log_queue.put(f"- 처리 대상 (추가/수정): {os.path.basename(local_path)}")
-    url = f"https://api.github.com/repos/{settings['username']}/{settings['repo']}/contents/{repo_path}"
-    headers = {"Authorization": f"token {settings['token']}"}
+def upload_file_to_github(local_path, repo_path, settings, log_queue, allow_batch=True):
+    # 같은 경로에 대한 GET(sha 확인)→PUT이 겹치지 않도록 경로별로 순서대로 처리
+    # 반환값 : False면 네트워크 오류 등으로 올리지 못해 나중에 다시 시도해야 함
+    # allow_batch=False : 큰 파일이나 중복 내용도 contents API로 직접 올린다 (빈 저장소에 첫 파일을 올릴 때)
+    with get_upload_scheduler(settings).path_lock(settings, repo_path):
+        return _upload_file_to_github(local_path, repo_path, settings, log_queue, allow_batch)
+
+def fetch_tree_listing(settings, ref, directory):
+    # 폴더 하나의 트리({이름: (blob sha, mode)})를 비재귀로 조회 : 파일 내용은 내려받지 않는다
+    tree_ref = f"{ref}:{directory}" if directory else ref
+    response = github_request("GET", settings, f"git/trees/{tree_ref}")
+    if response.status_code == 404:
+        return {}
+    response.raise_for_status()
+    return {item['path']: (item['sha'], item.get('mode', REGULAR_FILE_MODE))
+            for item in response.json()['tree'] if item['type'] == 'blob'}
+
+def fetch_contents_sha(settings, repo_path):
+    # contents API로 현재 blob sha를 직접 조회 (없거나 폴더면 None)
+    response = github_request("GET", settings, f"contents/{repo_path}", params={"ref": settings.get("branch", "main")})
+    if response.status_code != 200:
+        return None
+    data = response.json()
+    return None if isinstance(data, list) else data.get('sha')
+
+def _upload_file_to_github(local_path, repo_path, settings, log_queue, allow_batch=True):
+    log_queue.put(LogEvent(f"- 처리 대상 (추가/수정): {os.path.basename(local_path)}", path=repo_path, phase="upload"))
+    started = time.perf_counter()
+    remote_state = get_remote_state(settings)
+    content = None
     try:
-        with open(local_path, "rb") as file:
-            content_encoded = base64.b64encode(file.read()).decode('utf-8')
+        file_stat = stat_key(os.stat(local_path))
+        if not check_upload_size(file_stat[0], repo_path, log_queue, settings, file_stat):
+            return True
+        if file_stat[0] >= STREAM_UPLOAD_MIN_BYTES:
+            if allow_batch:
+                # 큰 파일은 blob API로 나눠 보내고 (중복 내용이면 보내지 않음) 커밋 1개로 반영
+                batch = SyncBatch(settings, log_queue)
+                batch.add_upload(local_path, repo_path)
+                return batch.commit()
+        else:
+            with open(local_path, "rb") as file:
+                content = file.read()
     except (FileNotFoundError, PermissionError) as e:
-        log_queue.put(f"   ❌ 파일 읽기 오류: {e}")
-        return
-    sha = None # sha : 파일의 고유 식별자 (GitHub)
-    try:
-        response_get = requests.get(url, headers=headers)
-        if response_get.status_code == 200: sha = response_get.json().get('sha')
-    except: pass
-    data = {"message": f"Sync: Update {repo_path}", "content": content_encoded}
-    if sha: data["sha"] = sha
-    log_queue.put(f"   🚀 '{repo_path}' 경로로 업로드를 시도합니다...")
+        log_queue.put(LogEvent(f"   ❌ 파일 읽기 오류: {e}", ERROR, path=repo_path, phase="read"))
+        return True # 그 사이 사라진 파일은 다시 시도할 필요가 없다
+    if content is not None and allow_batch and len(content) >= SINGLE_FILE_DEDUP_MIN_BYTES:
+        blob_sha = git_blob_sha(content)
+        if remote_state.has_blob(blob_sha):
+            # 같은 내용이 저장소의 다른 경로에 이미 있으면 내용을 보내지 않고 트리에서 그 blob을 가리키게 커밋
+            batch = SyncBatch(settings, log_queue)
+            batch.add_upload(local_path, repo_path, sha=blob_sha, key=file_stat)
+            return batch.commit()
+    # sha : 파일의 고유 식별자 (GitHub). 원격 상태 캐시에서 꺼내 쓰므로 업로드 전에 GET을 보내지 않는다
+    sha = remote_state.get(repo_path)
+    data = {"message": f"Sync: Update {repo_path}", "branch": settings.get("branch", "main")}
+    if content is None:
+        body = {"data": StreamedJsonBody(local_path, data, file_stat[0])}
+    else:
+        data["content"] = base64.b64encode(content).decode('utf-8')
+        body = {"json": data}
+        del content
+    log_queue.put(LogEvent(f"   🚀 '{repo_path}' 경로로 업로드를 시도합니다...", path=repo_path, phase="upload"))
     try:
-        response_put = requests.put(url, headers=headers, data=json.dumps(data))
+        for attempt in range(2):
+            if sha: data["sha"] = sha
+            else: data.pop("sha", None)
+            response_put = github_request("PUT", settings, f"contents/{repo_path}", **body)
+            # 409/422 : 캐시의 sha가 낡았거나(다른 곳에서 수정됨) 없을 때만 실제 sha를 조회해 한 번 더 시도
+            if response_put.status_code not in (409, 422) or attempt:
+                break
+            sha = fetch_contents_sha(settings, repo_path)
         if response_put.status_code in [200, 201]:
-            log_queue.put(f"   ✅ '{os.path.basename(local_path)}' 업로드 성공!")
-        else:
-            log_queue.put(f"   ❌ 업로드 실패! (코드: {response_put.status_code})")
+            result = response_put.json()
+            new_sha = result["content"]["sha"]
+            remote_state.set(repo_path, new_sha)
+            metrics.inc("uploaded_files_total")
+            metrics.inc("uploaded_bytes_total", file_stat[0])
+            commit = result.get("commit") or {}
+            if commit.get("parents"):
+                get_sync_index().apply_commit(sync_scope(settings), {repo_path: (file_stat, new_sha)}, [],
+                                              commit["parents"][0]["sha"], commit["sha"])
+            log_queue.put(LogEvent(f"   ✅ '{os.path.basename(local_path)}' 업로드 성공!", path=repo_path, phase="upload",
+                                   duration=time.perf_counter() - started))
+            return True
+        log_queue.put(LogEvent(f"   ❌ 업로드 실패! (코드: {response_put.status_code})", ERROR,
+                               path=repo_path, phase="upload"))
     except Exception as e:
-        log_queue.put(f"   ❌ 네트워크 오류 (업로드 중): {e}")
+        log_queue.put(LogEvent(f"   ❌ 네트워크 오류 (업로드 중): {e}", ERROR, path=repo_path, phase="upload"))
+    return False
 
 # 3-(2) 파일 삭제 함수
 def move_file_to_recycle_bin(repo_path, settings, log_queue):
     # 지정된 경로의 파일을 깃허브의 _recycle_bin 폴더로 이동
-    log_queue.put(f"- 처리 대상 (휴지통 이동): {os.path.basename(repo_path)}")
-    
-    get_url = f"https://api.github.com/repos/{settings['username']}/{settings['repo']}/contents/{repo_path}"
-    headers = {"Authorization": f"token {settings['token']}"}
-    
-    original_content_encoded = None
-    original_sha = None
-    try:
-        response_get = requests.get(get_url, headers=headers)
-        if response_get.status_code == 200:
-            data = response_get.json()
+    # 휴지통 복사와 원본 삭제를 트리 수정 한 번(커밋 1개)으로 처리한다
+    batch = SyncBatch(settings, log_queue)
+    batch.add_recycle(repo_path)
+    batch.commit()
+
+# 3-(2.1). 휴지통에 저장할 새 경로와 파일명을 만들기
+def make_recycle_bin_path(repo_path, taken=()):
+    timestamp = time.strftime("%Y%m%d%H%M%S")
+    name, ext = os.path.splitext(os.path.basename(repo_path))
+    recycle_bin_path = f"{RECYCLE_BIN_DIR}/{name}_{timestamp}{ext}"
+    # 같은 이름의 파일이 같은 초에 여러 개 삭제되면 번호를 붙여 구분
+    suffix = 1
+    while recycle_bin_path in taken:
+        recycle_bin_path = f"{RECYCLE_BIN_DIR}/{name}_{timestamp}_{suffix}{ext}"
+        suffix += 1
+    return recycle_bin_path
+
+# 3-(3) 일괄 커밋 엔진 (Git Data API : blob → tree → commit → ref)
+# 파일마다 contents API로 GET+PUT 하고 커밋을 하나씩 만드는 대신,
+# 변경된 파일을 blob으로 올리고 브랜치 head 위에 트리 하나를 만들어 커밋 1개로 ref를 전진시킨다.
+
+REF_UPDATE_RETRIES = 3
+# 같은 내용(blob sha)은 한 번만 올린다 : 깃허브에 이미 있는 blob이거나 같은 배치의 다른 경로가 올리는 내용이면
+# 보내지 않고 트리에서 그 blob sha를 가리킨다. 파일 하나만 바뀐 경우에는 내용 전송(PUT 1번)이 커밋 요청 5개보다 싸서
+# 이 크기 이상일 때만 Git Data API로 돌려 중복 내용을 재사용한다.
+SINGLE_FILE_DEDUP_MIN_BYTES = 64 * 1024
+DEFAULT_UPLOAD_WORKERS = 4 # 동시에 올릴 blob 수 (config.json의 "upload_workers"로 변경)
+
+# 3-(3.1) 동시 업로드 스케줄러
+# blob 업로드는 서로 독립적이라 작업 스레드 여러 개로 동시에 보내고,
+# 순서가 중요한 쓰기(ref 갱신, 같은 경로의 contents API 수정)는 저장소/브랜치별 잠금으로 하나씩 처리한다.
+# 프로필이 여러 개면 작업 스레드를 모두가 나눠 쓰되, 프로필마다 따로 줄을 세워 돌아가며 하나씩 꺼낸다(라운드 로빈).
+# 그래서 큰 폴더를 처음 동기화하는 프로필이 있어도 다른 프로필의 변경이 그 뒤에 밀리지 않는다.
+# 감시 중의 커밋 작업(변경 묶음 처리, 파일 하나 업로드, 저널 재반영, 승인된 일괄 업로드)은 같은 방식의 두 번째 스케줄러
+# (serial=True)가 맡는다 : 프로필마다 한 번에 하나씩 기록된 순서대로 실행하고, 스레드는 모든 프로필이 함께 쓴다.
+# blob 업로드를 기다리는 커밋 작업이 blob 작업 스레드를 차지하지 않도록 두 스케줄러의 스레드는 나눠 둔다.
+DEFAULT_COMMIT_WORKERS = 2 # 동시에 커밋 작업을 하는 프로필 수 (config.json의 "commit_workers"로 변경)
+
+class UploadScheduler:
+    def __init__(self, max_workers, serial=False, name="upload"):
+        self.max_workers = max_workers
+        self.serial = serial # True면 같은 프로필의 작업은 앞 작업이 끝난 뒤에 꺼낸다
+        self.name = name
+        self._queues = OrderedDict() # {프로필: deque[(Future, fn, args)]} (맨 앞 프로필 차례)
+        self._running = set() # serial일 때 작업이 실행 중인 프로필
+        self._cond = threading.Condition()
+        self._workers = []
+        self._ref_locks = defaultdict(threading.Lock) # tree→commit→ref 갱신은 저장소/브랜치마다 한 번에 한 배치만
+        self._path_locks = defaultdict(threading.Lock)
+        self._locks_lock = threading.Lock()
+        self.queue_depth = 0 # 제출됐지만 아직 끝나지 않은 작업 수 (지표용)
+        self._depth_lock = threading.Lock()
+
+    def submit(self, fn, *args, profile=None):
+        future = Future()
+        future.add_done_callback(self._task_done)
+        with self._depth_lock:
+            self.queue_depth += 1
+        with self._cond:
+            self._queues.setdefault(profile, deque()).append((future, fn, args))
+            if len(self._workers) < self.max_workers:
+                # 작업 스레드는 처음 필요할 때 max_workers개까지만 만든다
+                worker = threading.Thread(target=self._work, name=f"{self.name}-{len(self._workers)}", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            self._cond.notify()
+        return future
+
+    def _next_task(self):
+        # 맨 앞 프로필의 작업 하나를 꺼내고, 남은 작업이 있으면 그 프로필을 맨 뒤로 보낸다
+        # (serial이면 작업이 실행 중인 프로필은 건너뛴다) 꺼낼 작업이 없으면 None
+        ready = [profile for profile in self._queues if profile not in self._running]
+        if not ready:
+            return None
+        profile = ready[0]
+        tasks = self._queues.pop(profile)
+        task = tasks.popleft()
+        if tasks:
+            self._queues[profile] = tasks
+        if self.serial:
+            self._running.add(profile)
+        return profile, task
+
+    def _work(self):
+        while True:
+            with self._cond:
+                item = self._next_task()
+                while item is None:
+                    self._cond.wait()
+                    item = self._next_task()
+            profile, (future, fn, args) = item
+            if future.set_running_or_notify_cancel(): # False : 기다리는 동안 취소됨
+                try:
+                    result = fn(*args)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            if self.serial:
+                with self._cond:
+                    self._running.discard(profile)
+                    self._cond.notify_all()
+
+    def _task_done(self, future):
+        with self._depth_lock:
+            self.queue_depth -= 1
+
+    def pending_by_profile(self):
+        # 프로필별로 아직 시작하지 않은 작업 수 (UI 상태 표시용)
+        with self._cond:
+            return {profile: len(tasks) for profile, tasks in self._queues.items()}
+
+    def ref_lock(self, settings):
+        with self._locks_lock:
+            return self._ref_locks[repo_branch_key(settings)]
+
+    def path_lock(self, settings, repo_path):
+        with self._locks_lock:
+            return self._path_locks[repo_branch_key(settings), repo_path]
+
+_upload_scheduler = None
+_upload_scheduler_lock = threading.Lock()
+
+def get_upload_scheduler(settings):
+    # 프로그램 전체가 작업 스레드 묶음 하나를 공유 (처음 사용할 때 설정값으로 생성)
+    global _upload_scheduler
+    with _upload_scheduler_lock:
+        if _upload_scheduler is None:
+            workers = max(int(settings.get("upload_workers", DEFAULT_UPLOAD_WORKERS)), 1)
+            _upload_scheduler = UploadScheduler(workers)
+            # 업로드 스레드 + 초기 동기화/커밋 작업 스레드가 함께 쓸 만큼 연결 풀 크기를 맞춘다
+            transport.configure_pool(workers + 4)
+        return _upload_scheduler
+
+_commit_scheduler = None
+_commit_scheduler_lock = threading.Lock()
+
+def get_commit_scheduler(settings):
+    # 감시 중의 커밋 작업을 모든 프로필이 함께 쓰는 스레드 몇 개에서 프로필별 순서대로 실행
+    global _commit_scheduler
+    with _commit_scheduler_lock:
+        if _commit_scheduler is None:
+            workers = max(int(settings.get("commit_workers", DEFAULT_COMMIT_WORKERS)), 1)
+            _commit_scheduler = UploadScheduler(workers, serial=True, name="commit")
+        return _commit_scheduler
+
+def submit_commit_work(settings, fn, *args):
+    return get_commit_scheduler(settings).submit(fn, *args, profile=settings.get("profile"))
+
+def get_branch_ref(settings):
+    # 브랜치가 가리키는 커밋 sha. 커밋이 없는 빈 저장소면 None
+    branch = settings.get("branch", "main")
+    response = github_request("GET", settings, f"git/ref/heads/{branch}")
+    if response.status_code in (404, 409): # 409 : Git Repository is empty
+        return None
+    response.raise_for_status()
+    return response.json()["object"]["sha"]
+
+def get_branch_head(settings):
+    # 브랜치가 가리키는 (커밋 sha, 트리 sha)를 반환. 커밋이 없는 빈 저장소면 None
+    commit_sha = get_branch_ref(settings)
+    if commit_sha is None:
+        return None
+    response = github_request("GET", settings, f"git/commits/{commit_sha}")
+    response.raise_for_status()
+    return commit_sha, response.json()["tree"]["sha"]
+
+class SyncBatch:
+    def __init__(self, settings, log_queue):
+        self.settings = settings
+        self.log_queue = log_queue
+        self.uploads = {}   # repo_path -> local_path (추가/수정)
+        self.recycles = []  # 휴지통으로 옮길 repo_path 목록
+        self.renames = {}   # 이름 변경 {새 repo_path: 원래 repo_path} (원래 경로는 휴지통을 거치지 않고 제거)
+        self.blob_shas = {} # 이미 올린 blob (ref 갱신을 재시도할 때 다시 올리지 않도록)
+        self.blob_modes = {} # 트리에 넣은 mode (원격에 있던 경로는 그 mode를 유지)
+        self.blob_stats = {} # 업로드 직전에 읽은 stat (동기화 상태 인덱스 기록용)
+        self.head_commit = None # 커밋에 성공하면 새 head 커밋 sha
+        self.bootstrapped_path = None # 빈 저장소에서 contents API로 먼저 올린 파일
+        self.dir_listings = {} # 휴지통 이동할 파일의 sha를 찾으려고 조회한 폴더 트리 {폴더: {이름: sha}}
+        self.futures = {} # 진행 중인 blob 업로드 {repo_path: Future}
+        self.known_shas = {} # 스캔할 때 계산해 둔 {repo_path: (stat, blob sha)} (stat이 그대로일 때만 다시 해시하지 않음)
+        self.blob_uploads = {} # 이 배치에서 올리는 내용 {blob sha: Future} (같은 내용은 한 번만 보냄)
+        self.dedup_lock = threading.Lock()
+        self.dedup_hits, self.dedup_bytes = 0, 0 # 보내지 않은 중복 파일 수 / 바이트
+        self.progress_left = 0 # 진행률(metrics)에 아직 완료로 반영하지 않은 작업 수
+        self.progress_lock = threading.Lock()
+        metrics.begin_progress()
+
+    def __len__(self):
+        return len(self.uploads) + len(self.recycles)
+
+    def add_upload(self, local_path, repo_path, start=False, sha=None, key=None):
+        # start=True면 커밋을 기다리지 않고 바로 blob 업로드를 시작 (스캔하는 동안 업로드가 함께 진행됨)
+        # sha, key : 이미 계산한 blob sha와 그때의 stat (주면 올리기 전에 중복 여부를 파일을 읽지 않고 확인)
+        # 반환값 : 깃허브 크기 한도를 넘어 배치에 넣지 않았으면 False
+        try:
+            file_stat = key or stat_key(os.stat(local_path))
+        except OSError:
+            file_stat = None # 사라진 파일은 blob을 올릴 때 읽기 오류로 처리된다
+        if file_stat and not check_upload_size(file_stat[0], repo_path, self.log_queue, self.settings, file_stat):
+            return False
+        if repo_path not in self.uploads:
+            self._add_progress()
+        self.uploads[repo_path] = local_path
+        if sha and key:
+            self.known_shas[repo_path] = (key, sha)
+        if start:
+            self._submit_blob(repo_path, local_path)
+        return True
+
+    def _submit_blob(self, repo_path, local_path):
+        self.log_queue.put(LogEvent(f"- 처리 대상 (추가/수정): {repo_path}", path=repo_path, phase="upload"))
+        self.futures[repo_path] = get_upload_scheduler(self.settings).submit(
+            self._create_blob, repo_path, local_path, profile=self.settings.get("profile"))
+        self.futures[repo_path].add_done_callback(lambda future: self._advance())
+
+    def add_recycle(self, repo_path):
+        if repo_path not in self.recycles:
+            self.recycles.append(repo_path)
+            self._add_progress()
+
+    def _add_progress(self):
+        with self.progress_lock:
+            self.progress_left += 1
+        metrics.add_progress_total(1)
+
+    def _advance(self, count=1):
+        with self.progress_lock:
+            count = min(count, self.progress_left)
+            self.progress_left -= count
+        metrics.advance(count)
+
+    def add_rename(self, old_repo_path, local_path, repo_path):
+        if self.add_upload(local_path, repo_path):
+            self.renames[repo_path] = old_repo_path
+
+    def _default_message(self):
+        if len(self.uploads) == 1 and not self.recycles:
+            return f"Sync: Update {next(iter(self.uploads))}"
+        if len(self.recycles) == 1 and not self.uploads:
+            return f"Recycle: Move {self.recycles[0]}"
+        return f"Sync: Update {len(self.uploads)} files, move {len(self.recycles)} files to recycle bin"
+
+    def _create_blob(self, repo_path, local_path):
+        # 읽기 전에 stat을 기록 : 그 뒤에 파일이 바뀌면 다음 실행 때 stat이 달라 다시 해시된다
+        file_stat = self.blob_stats[repo_path] = stat_key(os.stat(local_path))
+        content = None
+        known_stat, sha = self.known_shas.get(repo_path, (None, None))
+        if known_stat != file_stat:
+            if file_stat[0] >= STREAM_UPLOAD_MIN_BYTES:
+                sha = compute_git_blob_sha(local_path) # 큰 파일은 나눠 읽으며 해시만 계산
+            else:
+                with open(local_path, "rb") as file:
+                    content = file.read()
+                sha = git_blob_sha(content)
+        while True:
+            with self.dedup_lock:
+                owner = self.blob_uploads.get(sha)
+                uploading = owner is None and not get_remote_state(self.settings).has_blob(sha)
+                if uploading:
+                    self.blob_uploads[sha] = owner = Future() # 이 경로가 내용을 올린다
+            if uploading:
+                break
+            try:
+                if owner is not None:
+                    owner.result() # 같은 내용을 올리는 다른 경로를 기다린다
+                return self._dedup_hit(sha, file_stat[0])
+            except Exception:
+                continue # 그쪽이 실패했으면 직접 올린다
+        try:
+            if content is None and file_stat[0] >= STREAM_UPLOAD_MIN_BYTES:
+                body = {"data": StreamedJsonBody(local_path, {"encoding": "base64"}, file_stat[0])}
+            else:
+                if content is None:
+                    with open(local_path, "rb") as file:
+                        content = file.read()
+                body = {"json": {"content": base64.b64encode(content).decode('utf-8'), "encoding": "base64"}}
+                del content
+            response = github_request("POST", self.settings, "git/blobs", **body)
+            response.raise_for_status()
+        except BaseException as e:
+            with self.dedup_lock:
+                del self.blob_uploads[sha]
+            owner.set_exception(e)
+            raise
+        metrics.inc("uploaded_files_total")
+        metrics.inc("uploaded_bytes_total", file_stat[0])
+        owner.set_result(response.json()["sha"])
+        return owner.result()
+
+    def _dedup_hit(self, sha, size):
+        with self.dedup_lock:
+            self.dedup_hits += 1
+            self.dedup_bytes += size
+        metrics.inc("dedup_hits_total")
+        metrics.inc("dedup_bytes_saved_total", size)
+        return sha
+
+    def _lookup_remote_entry(self, repo_path, head_commit):
+        # 휴지통으로 옮길 원본 파일의 (blob sha, mode) : 원격 상태 캐시에 없을 때만
+        # 부모 폴더의 트리를 조회한다 (같은 폴더의 파일이 여러 개 지워져도 조회는 한 번, 내용 전송은 없음)
+        remote_state = get_remote_state(self.settings)
+        sha, mode = remote_state.get(repo_path), remote_state.mode(repo_path)
+        if sha is None:
+            directory, name = posixpath.split(repo_path)
+            if directory not in self.dir_listings:
+                self.dir_listings[directory] = fetch_tree_listing(self.settings, head_commit, directory)
+            sha, mode = self.dir_listings[directory].get(name, (None, None))
+        if sha is None:
+            self.log_queue.put(LogEvent(f"  ℹ️ '{repo_path}' 파일이 깃허브에 없거나 폴더여서 처리를 건너뜁니다.", WARNING,
+                                        path=repo_path, phase="recycle"))
+        return sha, mode
+
+    def _bootstrap_empty_repo(self):
+        # 커밋이 하나도 없는 저장소에는 Git Data API를 쓸 수 없어서
+        # 첫 파일만 contents API로 올려 브랜치를 만든 뒤 나머지를 일괄 커밋한다
+        if not self.uploads:
+            return None
+        self.log_queue.put("ℹ️ 빈 저장소입니다. 첫 파일을 업로드해 브랜치를 만듭니다.")
+        repo_path, local_path = next(iter(self.uploads.items()))
+        try:
+            self.blob_stats[repo_path] = stat_key(os.stat(local_path))
+            self.blob_shas[repo_path] = compute_git_blob_sha(local_path)
+        except OSError:
+            pass
+        upload_file_to_github(local_path, repo_path, self.settings, self.log_queue, allow_batch=False)
+        self.bootstrapped_path = repo_path
+        self._advance()
+        return get_branch_head(self.settings)
+
+    def _record_commit(self, base_commit):
+        # 커밋 결과를 원격 상태 캐시와 동기화 상태 인덱스에 반영
+        remote_state = get_remote_state(self.settings)
+        for repo_path, sha in self.blob_shas.items():
+            remote_state.set(repo_path, sha, self.blob_modes.get(repo_path))
+        removed = self.recycled_paths + self.renamed_from
+        for repo_path in removed:
+            remote_state.remove(repo_path)
+        updated = {path: (self.blob_stats[path], sha) for path, sha in self.blob_shas.items()
+                   if path in self.blob_stats}
+        modes = {path: remote_state.mode(path) for path in updated if remote_state.mode(path) != REGULAR_FILE_MODE}
+        get_sync_index().apply_commit(sync_scope(self.settings), updated, removed,
+                                      base_commit, self.head_commit, modes)
+
+    def _upload_blobs(self):
+        # 아직 올리지 않은 파일을 작업 스레드 여러 개로 동시에 blob으로 업로드하고, 모두 끝날 때까지 기다린다
+        remote_state = get_remote_state(self.settings)
+        for repo_path, local_path in self.uploads.items():
+            if repo_path == self.bootstrapped_path or repo_path in self.blob_shas or repo_path in self.futures:
+                continue
+            if repo_path in self.renames and self._reuse_renamed_blob(repo_path, local_path, remote_state):
+                continue
+            self._submit_blob(repo_path, local_path)
+        futures = {future: repo_path for repo_path, future in self.futures.items()}
+        try:
+            for future in as_completed(futures):
+                repo_path = futures[future]
+                try:
+                    self.blob_shas[repo_path] = future.result()
+                except (FileNotFoundError, PermissionError) as e:
+                    self.log_queue.put(LogEvent(f"   ❌ 파일 읽기 오류: {e}", ERROR, path=repo_path, phase="read"))
+        finally:
+            # 하나라도 네트워크 오류로 실패하면 남은 업로드는 취소 (다음 동기화 때 다시 시도)
+            for future in futures:
+                future.cancel()
+            self.futures.clear()
+
+    def _reuse_renamed_blob(self, repo_path, local_path, remote_state):
+        # 이름만 바뀌고 내용이 그대로면 원래 경로의 blob을 그대로 가리킨다 (업로드 없음)
+        old_sha = remote_state.get(self.renames[repo_path])
+        try:
+            file_stat = stat_key(os.stat(local_path))
+            if old_sha is None or compute_git_blob_sha(local_path) != old_sha:
+                return False
+        except OSError:
+            return False
+        self.blob_stats[repo_path] = file_stat
+        self.blob_shas[repo_path] = old_sha
+        self._advance()
+        self.log_queue.put(LogEvent(f"- 처리 대상 (이름 변경): {self.renames[repo_path]} → {repo_path}",
+                                    path=repo_path, phase="rename"))
+        return True
+
+    def _upload_mode(self, repo_path, remote_state):
+        # 올리는 파일의 mode : 원격에 있던 경로(이름 변경이면 원래 경로)의 mode를 유지하고, 새 경로만 일반 파일로
+        # (심볼릭 링크 자리에 다른 내용을 올리면 로컬 파일 내용 그대로인 일반 파일이 된다)
+        source = repo_path if remote_state.get(repo_path) is not None else self.renames.get(repo_path)
+        mode = remote_state.mode(source) if source else None
+        if mode is None or (mode == SYMLINK_MODE and remote_state.get(source) != self.blob_shas[repo_path]):
+            return REGULAR_FILE_MODE
+        return mode
+
+    def _build_tree_entries(self, head_commit):
+        entries = []
+        self.uploaded_count, self.recycled_count = 0, 0
+        remote_state = get_remote_state(self.settings)
+        for repo_path in self.uploads:
+            if repo_path == self.bootstrapped_path or repo_path not in self.blob_shas:
+                continue
+            mode = self.blob_modes[repo_path] = self._upload_mode(repo_path, remote_state)
+            entries.append({"path": repo_path, "mode": mode, "type": "blob", "sha": self.blob_shas[repo_path]})
+            self.uploaded_count += 1
 
-            if isinstance(data, list):
-                log_queue.put(f"  ℹ️ '{repo_path}'는 폴더이므로 건너뜁니다.")
+        taken = set()
+        self.recycled_paths = []
+        for repo_path in self.recycles:
+            self.log_queue.put(LogEvent(f"- 처리 대상 (휴지통 이동): {os.path.basename(repo_path)}",
+                                        path=repo_path, phase="recycle"))
+            original_sha, mode = self._lookup_remote_entry(repo_path, head_commit)
+            self._advance()
+            if original_sha is None:
+                continue
+            recycle_bin_path = make_recycle_bin_path(repo_path, taken)
+            taken.add(recycle_bin_path)
+            self.log_queue.put(LogEvent(f"  ➡️ '{recycle_bin_path}' 경로로 파일을 이동합니다...",
+                                        path=repo_path, phase="recycle"))
+            # 휴지통 경로는 원본과 같은 blob과 mode를 가리키고, 원본 경로는 sha=None으로 트리에서 제거
+            entries.append({"path": recycle_bin_path, "mode": mode, "type": "blob", "sha": original_sha})
+            entries.append({"path": repo_path, "mode": mode, "type": "blob", "sha": None})
+            self.recycled_count += 1
+            self.recycled_paths.append(repo_path)
+
+        # 이름 변경의 원래 경로는 휴지통을 거치지 않고 트리에서 뺀다 (새 경로가 올라간 경우에만)
+        self.renamed_from = []
+        for repo_path, old_repo_path in self.renames.items():
+            # 원래 경로에 다시 올리는 파일이 있으면 트리에서 빼지 않는다 (같은 경로에 blob과 sha=None이 함께 가면 파일이 사라진다)
+            if (old_repo_path != repo_path and old_repo_path not in self.uploads and repo_path in self.blob_shas
+                    and remote_state.get(old_repo_path)):
+                entries.append({"path": old_repo_path, "mode": remote_state.mode(old_repo_path), "type": "blob",
+                                "sha": None})
+                self.renamed_from.append(old_repo_path)
+        return entries
+
+    def commit(self, message=None):
+        # 모은 변경을 커밋 1개로 반영. 성공(또는 반영할 변경 없음)이면 True
+        if not self:
+            return True
+        settings, log_queue = self.settings, self.log_queue
+        branch = settings.get("branch", "main")
+        message = message or self._default_message()
+        started = time.perf_counter()
+        try:
+            head = get_branch_head(settings)
+            if head is None:
+                head = self._bootstrap_empty_repo()
+                if head is None:
+                    log_queue.put(LogEvent(f"❌ '{branch}' 브랜치를 찾을 수 없어 일괄 커밋을 할 수 없습니다.", ERROR))
+                    return False
+            self._upload_blobs()
+            if self.dedup_hits:
+                log_queue.put(f"♻️ 내용이 같은 파일 {self.dedup_hits}개는 이미 있는 blob을 재사용했습니다. "
+                              f"({self.dedup_bytes / 1024:.1f}KB 전송 절약)")
+            entries = self._build_tree_entries(head[0])
+            if not entries:
+                self.head_commit = head[0]
+                return True
+            with get_upload_scheduler(settings).ref_lock(settings):
+                committed = self._commit_tree(entries, head, message)
+            if committed:
+                elapsed = max(time.perf_counter() - started, 1e-6)
+                file_count = self.uploaded_count + self.recycled_count
+                metrics.observe("sync_batch_seconds", elapsed)
+                metrics.set_gauge("sync_files_per_second", file_count / elapsed)
+                log_queue.put(LogEvent(f"⏱️ {file_count}개 파일 {elapsed:.1f}초 ({file_count / elapsed:.1f} files/sec)",
+                                       phase="commit", duration=elapsed))
+            return committed
+        except requests.exceptions.HTTPError as e:
+            log_queue.put(LogEvent(f"❌ 일괄 커밋 실패! (코드: {e.response.status_code})", ERROR))
+            return False
+        except Exception as e:
+            log_queue.put(LogEvent(f"❌ 네트워크 오류 (일괄 커밋 중): {e}", ERROR))
+            return False
+        finally:
+            self._advance(self.progress_left) # 실패하거나 건너뛴 작업도 진행률에서는 끝난 것으로
+
+    def _commit_tree(self, entries, head, message):
+        # tree → commit → ref 갱신 (ref_lock 안에서 호출되어 배치끼리 순서대로 처리된다)
+        settings, log_queue = self.settings, self.log_queue
+        branch = settings.get("branch", "main")
+        for _ in range(REF_UPDATE_RETRIES):
+            head_commit, head_tree = head
+            response = github_request("POST", settings, "git/trees", json={"base_tree": head_tree, "tree": entries})
+            response.raise_for_status()
+            new_tree = response.json()["sha"]
+            response = github_request("POST", settings, "git/commits",
+                                      json={"message": message, "tree": new_tree, "parents": [head_commit]})
+            response.raise_for_status()
+            new_commit = response.json()["sha"]
+            # force=False : fast-forward일 때만 ref를 갱신 (다른 곳에서 push된 커밋을 덮어쓰지 않음)
+            response = github_request("PATCH", settings, f"git/refs/heads/{branch}",
+                                      json={"sha": new_commit, "force": False})
+            if response.status_code == 200:
+                self.head_commit = new_commit
+                self._record_commit(head_commit)
+                renamed = f", 이름 변경 {len(self.renamed_from)}개" if self.renamed_from else ""
+                log_queue.put(f"✅ 커밋 1개로 업로드 {self.uploaded_count - len(self.renamed_from)}개{renamed}, "
+                              f"휴지통 이동 {self.recycled_count}개 반영 완료! ({new_commit[:7]})")
+                return True
+            if response.status_code != 422:
+                response.raise_for_status()
+            log_queue.put("  ℹ️ 그 사이 브랜치가 갱신되어 최신 커밋 위에서 다시 시도합니다...")
+            head = get_branch_head(settings)
+        log_queue.put(LogEvent("❌ 브랜치 갱신 충돌이 계속되어 일괄 커밋에 실패했습니다.", ERROR))
+        return False
+
+# 3-(4) 오프라인 작업 저널 (config.json 옆의 추가 전용(append-only) 파일)
+# 감시 중에 생긴 변경(업로드/삭제/이동)을 처리하기 전에 먼저 저널에 기록하고, 깃허브에 반영된 뒤에 확인(ack)한다.
+# 네트워크가 끊기거나 프로그램이 꺼져도 확인받지 못한 작업은 남아 있다가,
+# 연결이 돌아오거나 다음에 시작할 때 기록된 순서대로 합쳐 커밋 1개로 한꺼번에 반영된다.
+
+JOURNAL_FILE = os.path.join(application_path, "pending_ops.journal")
+JOURNAL_COMPACT_LINES = 500 # 확인된 기록이 이만큼 쌓이면 남은 작업만으로 파일을 새로 쓴다
+JOURNAL_RETRY_MIN = 5.0     # 반영에 실패했을 때 다시 시도하기까지 기다리는 시간(초), 실패할수록 2배씩
+JOURNAL_RETRY_MAX = 300.0
+
+class OperationJournal:
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.condition = threading.Condition()
+        self.pending = {}    # {seq: 작업} (dict는 넣은 순서를 유지 → 기록된 순서대로 다시 실행)
+        self.claimed = set() # 지금 처리 중인 seq (같은 작업을 두 곳에서 동시에 반영하지 않도록)
+        self.listeners = []  # 작업이 돌아오면 부를 함수 (JournalDrainer.wake)
+        self.acked_lines = 0 # 파일에 남아 있는 이미 확인된 기록 수
+        self.next_seq = 1
+        if os.path.exists(path):
+            self._load()
+            self._compact()
+        self.file = open(path, "a", encoding="utf-8")
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break # 쓰는 도중에 꺼져서 잘린 마지막 줄
+                if "ack" in record:
+                    for seq in record["ack"]:
+                        self.pending.pop(seq, None)
+                    self.acked_lines += 1
+                else:
+                    self.pending[record["seq"]] = record
+                    self.next_seq = max(self.next_seq, record["seq"] + 1)
+
+    def _write(self, records):
+        # 여러 기록을 한 번에 쓰고 fsync도 한 번만 한다
+        self.file.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def _compact(self):
+        # 남은 작업만 임시 파일에 쓰고 원래 파일과 바꾼다 (도중에 꺼져도 둘 중 하나는 온전하다)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in self.pending.values()))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self.acked_lines = 0
+
+    def record(self, scope, ops):
+        # ops : [("upload", 경로), ("delete", 경로), ("move", 원래 경로, 새 경로)] → 새로 받은 seq 목록 (처리 중으로 표시됨)
+        with self.condition:
+            records = []
+            for op in ops:
+                record = {"seq": self.next_seq, "scope": scope, "op": op[0], "path": op[-1]}
+                if op[0] == "move":
+                    record["from"] = op[1]
+                records.append(record)
+                self.next_seq += 1
+            if records:
+                self._write(records)
+            for record in records:
+                self.pending[record["seq"]] = record
+                self.claimed.add(record["seq"])
+            return [record["seq"] for record in records]
+
+    def claim(self, scope):
+        # 아직 아무도 처리하지 않는 scope의 작업을 기록된 순서대로 가져가며 처리 중으로 표시
+        with self.condition:
+            records = [record for seq, record in self.pending.items()
+                       if record["scope"] == scope and seq not in self.claimed]
+            self.claimed.update(record["seq"] for record in records)
+            return records
+
+    def has_unclaimed(self, scope):
+        with self.condition:
+            return any(record["scope"] == scope and seq not in self.claimed for seq, record in self.pending.items())
+
+    def pending_paths(self, scope):
+        # 아직 반영되지 않은 작업이 걸려 있는 경로 (이동은 원래 경로 포함)
+        with self.condition:
+            records = [record for record in self.pending.values() if record["scope"] == scope]
+        return {record["path"] for record in records} | {record["from"] for record in records if "from" in record}
+
+    def still_pending(self, seqs):
+        # seqs 중 아직 확인되지 않은 것만 (그 사이 다른 곳에서 반영했으면 빠진다)
+        with self.condition:
+            return [seq for seq in seqs if seq in self.pending]
+
+    def release(self, seqs):
+        # 반영하지 못한 작업을 돌려놓는다 (저널에는 그대로 남아 있음)
+        with self.condition:
+            self.claimed.difference_update(seqs)
+            listeners = list(self.listeners)
+        for listener in listeners:
+            listener()
+
+    def add_listener(self, fn):
+        # 작업이 돌아올 때(release) 불릴 함수 (재시도 담당이 바로 알 수 있도록)
+        with self.condition:
+            self.listeners.append(fn)
+
+    def remove_listener(self, fn):
+        with self.condition:
+            if fn in self.listeners:
+                self.listeners.remove(fn)
+
+    def ack(self, seqs):
+        # 깃허브에 반영된 작업을 확인 처리하고, 확인된 기록이 쌓였으면 파일을 줄인다
+        with self.condition:
+            seqs = [seq for seq in seqs if seq in self.pending]
+            self.claimed.difference_update(seqs)
+            if not seqs:
                 return
+            for seq in seqs:
+                del self.pending[seq]
+            if not self.pending or self.acked_lines + 1 >= JOURNAL_COMPACT_LINES:
+                self.file.close()
+                self._compact()
+                self.file = open(self.path, "a", encoding="utf-8")
+            else:
+                self._write([{"ack": seqs}])
+                self.acked_lines += 1
 
-            original_sha = data.get('sha')
-            original_content_encoded = data.get('content')
-        else:
-            log_queue.put(f"  ℹ️ '{repo_path}' 파일이 깃허브에 없어 처리를 건너뜁니다.")
-            return
-    except Exception as e:
-        log_queue.put(f"  ❌ 원본 파일 정보 조회 중 오류: {e}")
-        return
+_journal = None
+_journal_lock = threading.Lock()
 
-    # 3-(2.1). 휴지통에 저장할 새 경로와 파일명을 만들기
-    timestamp = time.strftime("%Y%m%d%H%M%S")
-    original_filename = os.path.basename(repo_path)
-    name, ext = os.path.splitext(original_filename)
-    new_filename = f"{name}_{timestamp}{ext}"
-    recycle_bin_path = f"_recycle_bin/{new_filename}"
-    
-    # 3-(2.2). 휴지통 경로에 새 파일을 생성
-    put_url = f"https://api.github.com/repos/{settings['username']}/{settings['repo']}/contents/{recycle_bin_path}"
-    put_data = {
-        "message": f"Recycle: Move {repo_path}",
-        "content": original_content_encoded
-    }
-    log_queue.put(f"  ➡️ '{recycle_bin_path}' 경로로 파일을 이동합니다...")
-    try:
-        response_put = requests.put(put_url, headers=headers, data=json.dumps(put_data))
-        if response_put.status_code not in [200, 201]:
-             log_queue.put(f"  ❌ 휴지통에 파일 생성 실패! (코드: {response_put.status_code})")
-             return
-    except Exception as e:
-        log_queue.put(f"  ❌ 네트워크 오류 (휴지통 생성 중): {e}")
-        return
+def get_journal():
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = OperationJournal()
+        return _journal
 
-    # 3-(2.3). 휴지통으로 복사가 성공했을 때만 원본 파일을 삭제
-    del_url = get_url
-    del_data = {"message": f"Sync: Delete {repo_path} (moved to recycle bin)", "sha": original_sha}
-    try:
-        response_del = requests.delete(del_url, headers=headers, data=json.dumps(del_data))
-        if response_del.status_code == 200:
-            log_queue.put(f"  ✅ '{os.path.basename(repo_path)}' 휴지통으로 이동 완료!")
+def changeset_to_ops(changeset):
+    ops = [("delete", path) for path in sorted(changeset.deletes)]
+    ops += [("move", old_path, path) for path, old_path in sorted(changeset.renames.items())]
+    ops += [("upload", path) for path in sorted(changeset.uploads - changeset.renames.keys())]
+    return ops
+
+def fold_journal_records(records):
+    # 기록된 순서대로 작업을 겹쳐 최종 결과(ChangeSet)만 남긴다
+    changeset = ChangeSet()
+    for record in records:
+        path = record["path"]
+        if record["op"] == "upload":
+            changeset.deletes.discard(path)
+            changeset.uploads.add(path)
+            # 옮겨 간 원래 경로에 새 파일이 생겼다면(a→b 후 새 a) 원래 경로를 지우면 안 되므로 b는 일반 업로드가 된다
+            for new_path, origin in list(changeset.renames.items()):
+                if origin == path:
+                    del changeset.renames[new_path]
+        elif record["op"] == "delete":
+            changeset.uploads.discard(path)
+            origin = changeset.renames.pop(path, None)
+            changeset.deletes.add(origin or path) # 옮긴 뒤 지웠다면 원래 경로를 지운다
         else:
-            log_queue.put(f"  ❌ 원본 파일 삭제 실패! (코드: {response_del.status_code})")
-    except Exception as e:
-        log_queue.put(f"  ❌ 네트워크 오류 (원본 삭제 중): {e}")
+            old_path = record["from"]
+            origin = changeset.renames.pop(old_path, old_path) # 연쇄 이동(a→b→c)이면 처음 경로 a를 유지
+            changeset.uploads.discard(old_path)
+            changeset.deletes.discard(path)
+            changeset.uploads.add(path)
+            if origin != path: # 옮겼다가 제자리로 돌아왔으면(a→b→a) 내용만 다시 올린다
+                changeset.renames[path] = origin
+    return changeset
+
+def replay_journal(settings, log_queue, journal=None):
+    # 저널에 남은 작업을 모두 합쳐 커밋 1개로 반영. 성공(또는 남은 작업 없음)이면 True
+    journal = journal or get_journal()
+    records = journal.claim(sync_scope(settings))
+    if not records:
+        return True
+    changeset = fold_journal_records(records)
+    folder = settings['folder']
+    remote_state = get_remote_state(settings)
+    log_queue.put(f"📮 반영하지 못했던 작업 {len(records)}개를 한꺼번에 반영합니다...")
+    batch = SyncBatch(settings, log_queue)
+    for repo_path in sorted(changeset.deletes):
+        # 그 사이 같은 경로에 다시 생긴 파일은 지우지 않는다
+        if not os.path.exists(os.path.join(folder, repo_path.replace("/", os.sep))):
+            batch.add_recycle(repo_path)
+    for repo_path in sorted(changeset.uploads):
+        local_path = os.path.join(folder, repo_path.replace("/", os.sep))
+        try:
+            if remote_state.get(repo_path) == compute_git_blob_sha(local_path):
+                continue # 이미 반영됨
+        except OSError:
+            continue # 그 사이 사라진 파일
+        if repo_path in changeset.renames:
+            batch.add_rename(changeset.renames[repo_path], local_path, repo_path)
+        else:
+            batch.add_upload(local_path, repo_path)
+    seqs = [record["seq"] for record in records]
+    if batch.commit():
+        journal.ack(seqs)
+        return True
+    journal.release(seqs)
+    return False
+
+# 3-(4.1) 감시 타이머 : 모든 프로필의 변경 합치기(4-(2))와 저널 재시도가 스레드 하나를 함께 쓴다
+# 정해진 시각에 짧은 확인만 하고, 네트워크를 쓰는 실제 작업은 커밋 스케줄러(get_commit_scheduler)로 넘긴다.
+
+class WatchTimer:
+    def __init__(self):
+        self._heap = []       # [(시각, 순번, 주인)]
+        self._deadlines = {}  # {주인: (시각, 함수)} 주인마다 예약은 하나 (더 이른 예약만 남긴다)
+        self._counter = 0
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="watch-timer", daemon=True)
+        self._thread.start()
+
+    def schedule(self, owner, delay, fn):
+        # delay초 뒤에 fn()을 부른다. 이미 더 이른 예약이 있으면 그대로 둔다
+        deadline = time.monotonic() + max(delay, 0)
+        with self._cond:
+            current = self._deadlines.get(owner)
+            if current is not None and current[0] <= deadline:
+                return
+            self._deadlines[owner] = (deadline, fn)
+            self._counter += 1
+            heapq.heappush(self._heap, (deadline, self._counter, owner))
+            self._cond.notify()
+
+    def cancel(self, owner):
+        with self._cond:
+            self._deadlines.pop(owner, None)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    # 취소됐거나 더 이른 예약으로 바뀐 항목은 버린다
+                    while self._heap and self._deadlines.get(self._heap[0][2], (None,))[0] != self._heap[0][0]:
+                        heapq.heappop(self._heap)
+                    if self._heap and self._heap[0][0] <= time.monotonic():
+                        break
+                    self._cond.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                _, _, owner = heapq.heappop(self._heap)
+                _, fn = self._deadlines.pop(owner)
+            try:
+                fn()
+            except Exception as e:
+                print(f"감시 타이머 작업 오류: {e}", file=sys.stderr)
+
+_watch_timer = None
+_watch_timer_lock = threading.Lock()
+
+def get_watch_timer():
+    global _watch_timer
+    with _watch_timer_lock:
+        if _watch_timer is None:
+            _watch_timer = WatchTimer()
+        return _watch_timer
+
+class JournalDrainer:
+    # 반영하지 못한 작업이 생기면 점점 간격을 늘려 가며 다시 시도하고,
+    # 연결이 돌아오면 그동안 쌓인 작업을 한꺼번에 반영한다
+    # (전용 스레드 없이 감시 타이머에서 확인하고, 다시 반영하는 작업은 커밋 스케줄러에서 실행)
+    def __init__(self, settings, log_queue, journal=None):
+        self.settings = settings
+        self.log_queue = log_queue
+        self.journal = journal or get_journal()
+        self.scope = sync_scope(settings)
+        self.offline = False # True인 동안 새 변경은 바로 보내지 않고 저널에 쌓아 둔다
+        self.stopped = False
+        self.replaying = None # 실행 중인 재반영 작업 (Future)
+        self.delay, self.retry_at = JOURNAL_RETRY_MIN, None
+        self.lock = threading.Lock()
+        self.timer = get_watch_timer()
+        self.journal.add_listener(self.wake)
+        self.wake()
+
+    def wake(self):
+        # 반영하지 못한 작업이 저널에 돌아오면 불린다
+        self.timer.schedule(self, 0, self._check)
+
+    def _check(self):
+        with self.lock:
+            if self.stopped or self.replaying is not None:
+                return # 재반영이 끝나면 다시 확인한다
+            now = time.monotonic()
+            if not self.journal.has_unclaimed(self.scope):
+                if self.retry_at is not None:
+                    if now >= self.retry_at:
+                        self.offline, self.delay, self.retry_at = False, JOURNAL_RETRY_MIN, None # 다른 곳에서 모두 반영됨
+                    else:
+                        self.timer.schedule(self, self.retry_at - now, self._check)
+                return
+            if self.retry_at is None:
+                # 방금 실패한 작업 : 바로 다시 보내지 않고 조금 기다린다 (그동안 새 변경은 저널에 쌓임)
+                self.offline, self.retry_at = True, now + self.delay
+                self.log_queue.put(f"📴 반영하지 못한 작업을 저장해 두었습니다. {self.delay:.0f}초 뒤 다시 시도합니다.")
+                self.timer.schedule(self, self.delay, self._check)
+                return
+            if now < self.retry_at:
+                self.timer.schedule(self, self.retry_at - now, self._check)
+                return
+            self.replaying = submit_commit_work(self.settings, self._replay)
+
+    def _replay(self):
+        replayed = replay_journal(self.settings, self.log_queue, self.journal)
+        with self.lock:
+            self.replaying = None
+            if replayed:
+                self.offline, self.delay, self.retry_at = False, JOURNAL_RETRY_MIN, None
+            else:
+                self.delay = min(self.delay * 2, JOURNAL_RETRY_MAX)
+                self.retry_at = time.monotonic() + self.delay
+                self.log_queue.put(f"📴 아직 반영할 수 없습니다. {self.delay:.0f}초 뒤 다시 시도합니다.")
+        self.timer.schedule(self, 0 if replayed else self.delay, self._check)
+
+    def stop(self):
+        with self.lock:
+            self.stopped = True
+            replaying = self.replaying
+        self.journal.remove_listener(self.wake)
+        self.timer.cancel(self)
+        if replaying is not None:
+            replaying.result() # 진행 중인 재반영이 끝날 때까지
+
 
 # 4. 컴퓨터 폴더 실시간 감시 로직
 
+# 4-(1) 무시 규칙 (.gitignore 호환)
+# 감시 폴더의 .gitignore + 설정의 "ignore" 목록 + 기본 규칙을 정규식으로 한 번 컴파일해 두고,
+# 초기 동기화 스캔(무시할 폴더는 아예 내려가지 않음)과 감시 이벤트에 똑같이 적용한다.
+
+DEFAULT_IGNORE_PATTERNS = [".git/", "__pycache__/", "node_modules/", "*.swp", "*.swx", "*~",
+                           ".DS_Store", "Thumbs.db", "desktop.ini"]
+
+def _glob_to_regex(pattern):
+    # gitignore 와일드카드 → 정규식 ('*'와 '?'는 '/'를 넘지 않고, '**'는 여러 폴더에 걸친다)
+    regex, i = [], 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?"); i += 3; continue
+        if pattern.startswith("**", i):
+            regex.append(".*"); i += 2; continue
+        if char == "*":
+            regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[" and "]" in pattern[i + 2:]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            regex.append("[" + body.replace("\\", "\\\\") + "]"); i = end + 1; continue
+        elif char == "\\" and i + 1 < len(pattern):
+            regex.append(re.escape(pattern[i + 1])); i += 2; continue
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return "".join(regex)
+
+def _compile_ignore_rule(line):
+    # 반환값 : (제외 해제 여부 '!', 폴더 전용 여부 '/', 정규식) / 빈 줄과 주석은 None
+    line = line.rstrip("\r\n")
+    if not line.strip() or line.startswith("#"):
+        return None
+    line = line.rstrip(" ")
+    negate = line.startswith("!")
+    if negate or line.startswith(("\\!", "\\#")):
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    # 중간에 '/'가 있으면 감시 폴더 기준 경로로, 없으면 어느 깊이의 이름이든 맞춘다
+    anchored = "/" in line
+    regex = _glob_to_regex(line.lstrip("/"))
+    return negate, dir_only, ("^" if anchored else "(?:^|.*/)") + regex + "$"
+
+class IgnoreRules:
+    def __init__(self, patterns):
+        # 연속된 같은 종류의 규칙은 정규식 하나로 묶어 경로마다 검사 횟수를 줄인다
+        groups = []
+        for rule in filter(None, map(_compile_ignore_rule, patterns)):
+            negate, dir_only, regex = rule
+            if groups and groups[-1][:2] == (negate, dir_only):
+                groups[-1][2].append(regex)
+            else:
+                groups.append((negate, dir_only, [regex]))
+        self.groups = [(negate, dir_only, re.compile("|".join(f"(?:{r})" for r in regexes)))
+                       for negate, dir_only, regexes in groups]
+        self._dir_cache = {}
+
+    @classmethod
+    def from_settings(cls, settings):
+        patterns = list(DEFAULT_IGNORE_PATTERNS)
+        try:
+            with open(os.path.join(settings['folder'], ".gitignore"), encoding="utf-8") as f:
+                patterns += f.read().splitlines()
+        except OSError:
+            pass
+        patterns += settings.get("ignore", [])
+        return cls(patterns)
+
+    def _match(self, repo_path, is_dir):
+        # gitignore처럼 나중에 나온 규칙이 우선
+        for negate, dir_only, regex in reversed(self.groups):
+            if (is_dir or not dir_only) and regex.match(repo_path):
+                return not negate
+        return False
+
+    def _is_dir_ignored(self, repo_dir):
+        # 상위 폴더가 무시되면 그 안은 모두 무시 (폴더별 결과는 캐시)
+        if repo_dir not in self._dir_cache:
+            parent = posixpath.dirname(repo_dir)
+            self._dir_cache[repo_dir] = bool(parent and self._is_dir_ignored(parent)) or self._match(repo_dir, True)
+        return self._dir_cache[repo_dir]
+
+    def is_ignored(self, repo_path, is_dir=False):
+        if is_dir:
+            return self._is_dir_ignored(repo_path)
+        parent = posixpath.dirname(repo_path)
+        return bool(parent and self._is_dir_ignored(parent)) or self._match(repo_path, False)
+
+# 4-(2) 경로별 변경 합치기 (coalescing)
+# 짧은 시간 안에 같은 경로에서 일어난 이벤트를 순서대로 합쳐 최종 결과만 남긴다.
+#   생성 → 삭제 : 아무것도 하지 않음 / 삭제 → 생성 : 수정 / 이동 : 이름 변경
+# 편집기가 임시 파일에 쓰고 이름을 바꿔 저장하는 경우에도 최종 파일의 수정 1건만 남는다.
+
+CREATED, MODIFIED, DELETED, MOVED_AWAY = "created", "modified", "deleted", "moved_away"
+COALESCE_WINDOW = 1.5 # 마지막 이벤트 후 이 시간(초) 동안 조용하면 모인 변경을 내보낸다
+
+class ChangeSet:
+    def __init__(self):
+        self.uploads = set() # 추가/수정할 repo 경로
+        self.deletes = set() # 휴지통으로 옮길 repo 경로
+        self.renames = {}    # {새 repo 경로: 원래 repo 경로}
+
+    def __len__(self):
+        return len(self.uploads) + len(self.deletes)
+
+class ChangeCoalescer:
+    def __init__(self, on_flush, window=COALESCE_WINDOW):
+        # on_flush : 합쳐진 ChangeSet을 받는 함수 (감시 타이머 스레드에서 불리므로 작업을 넘기고 바로 돌아가야 한다)
+        self.on_flush = on_flush
+        self.window = window
+        self.states = {}  # {repo 경로: 상태}
+        self.origins = {} # {이동으로 생긴 repo 경로: 이동 전 원래 경로}
+        self.last_event = 0.0
+        self.stopped = False
+        self.condition = threading.Condition()
+        self.timer = get_watch_timer()
+
+    def _touch(self):
+        # 첫 이벤트에만 예약하고, 예약 시각에 마지막 이벤트 후 window가 안 지났으면 남은 만큼 다시 예약한다
+        self.last_event = time.monotonic()
+        self.timer.schedule(self, self.window, self._on_timer)
+
+    def created(self, path):
+        with self.condition:
+            # 지워졌던(또는 옮겨졌던) 경로에 다시 생기면 수정으로 본다
+            previous = self.states.get(path)
+            self.states[path] = CREATED if previous in (None, CREATED) else MODIFIED
+            self._touch()
+
+    def modified(self, path):
+        with self.condition:
+            if self.states.get(path) != CREATED:
+                self.states[path] = MODIFIED
+            self._touch()
+
+    def deleted(self, path):
+        with self.condition:
+            self.origins.pop(path, None)
+            if self.states.get(path) == CREATED:
+                del self.states[path] # 이번 구간에 생겼다가 사라진 파일 → 아무것도 하지 않음
+            else:
+                self.states[path] = DELETED
+            self._touch()
+
+    def moved(self, src, dest):
+        with self.condition:
+            origin = self.origins.pop(src, None)
+            if self.states.get(src) == CREATED:
+                del self.states[src] # 새로 생긴 파일(임시 파일 등)이 옮겨짐 → dest에 새로 생긴 것과 같다
+            else:
+                self.states[src] = MOVED_AWAY
+                origin = origin or src
+            if origin:
+                self.origins[dest] = origin # 연쇄 이동(a→b→c)이면 처음 경로 a를 유지
+            previous = self.states.get(dest)
+            self.states[dest] = CREATED if previous in (None, CREATED) else MODIFIED
+            self._touch()
+
+    def _drain(self):
+        changeset = ChangeSet()
+        for path, state in self.states.items():
+            if state in (CREATED, MODIFIED):
+                changeset.uploads.add(path)
+                origin = self.origins.get(path)
+                if origin and origin != path and self.states.get(origin) == MOVED_AWAY:
+                    changeset.renames[path] = origin
+        renamed_from = set(changeset.renames.values())
+        for path, state in self.states.items():
+            # 옮겨 간 파일이 결국 사라졌다면(옮긴 뒤 삭제) 일반 삭제로 처리
+            if state == DELETED or (state == MOVED_AWAY and path not in renamed_from):
+                changeset.deletes.add(path)
+        self.states.clear()
+        self.origins.clear()
+        return changeset
+
+    def _on_timer(self):
+        # 마지막 이벤트 후 window 동안 새 이벤트가 없었으면 모인 변경을 내보낸다
+        with self.condition:
+            if self.stopped or not self.states:
+                return
+            remaining = self.last_event + self.window - time.monotonic()
+            if remaining > 0:
+                self.timer.schedule(self, remaining, self._on_timer)
+                return
+            changeset = self._drain()
+        if changeset:
+            self.on_flush(changeset)
+
+    def stop(self):
+        # 남은 변경을 바로 내보내고 더는 받지 않는다
+        with self.condition:
+            self.stopped = True
+            self.timer.cancel(self)
+            changeset = self._drain()
+        if changeset:
+            self.on_flush(changeset)
+
+# 4-(3) watchdog 이벤트 처리
+# 일괄 업로드 승인 정책 : 파일 수와 전체 크기가 모두 이 이하면 확인 없이 바로 올리고, 넘으면 승인을 기다린다.
+# (config.json의 "auto_approve_max_files", "auto_approve_max_bytes"로 변경. 0이면 여러 파일은 항상 승인을 기다림)
+# 승인을 기다리는 동안에도 감시와 다른 변경의 업로드는 계속되고, 작업은 저널에 남아 있어 프로그램을 꺼도 사라지지 않는다.
+AUTO_APPROVE_MAX_FILES = 20
+AUTO_APPROVE_MAX_BYTES = 20 * 1024 * 1024
+
+def batch_needs_approval(settings, files):
+    # 반환값 : (승인이 필요한지, 전체 바이트)
+    total_bytes = 0
+    for local_path in files:
+        try:
+            total_bytes += os.stat(local_path).st_size
+        except OSError:
+            continue # 그 사이 사라진 파일
+    max_files = int(settings.get("auto_approve_max_files", AUTO_APPROVE_MAX_FILES))
+    max_bytes = int(settings.get("auto_approve_max_bytes", AUTO_APPROVE_MAX_BYTES))
+    return len(files) > max_files or total_bytes > max_bytes, total_bytes
+
 class MyEventHandler(FileSystemEventHandler):
-    def __init__(self, settings, log_queue):
+    def __init__(self, settings, log_queue, ignore_rules=None, stop_event=None):
         super().__init__()
         self.settings = settings
         self.log_queue = log_queue
-        # 모든 변경 이벤트를 담을 '장바구니'와 타이머
-        self.pending_changes = set()
-        self.batch_timer = None
+        self.stop_event = stop_event or threading.Event()
+        # 무시 규칙에 걸리는 이벤트는 합치기 단계에 넣기 전에 버린다
+        self.ignore_rules = ignore_rules or IgnoreRules.from_settings(settings)
+        # 이벤트는 경로별로 합쳐 두었다가 커밋 스케줄러에서 한꺼번에 처리 (감시 스레드는 바로 돌아간다)
+        self.coalescer = ChangeCoalescer(self._submit_changes)
+        self.last_flush = None # 마지막으로 넘긴 변경 묶음 처리 (Future, 프로필 안에서는 순서대로 실행됨)
+        # 반영하지 못한 변경은 저널에 남겨 두고 연결이 돌아오면 한꺼번에 다시 반영
+        self.journal = get_journal()
+        self.drainer = JournalDrainer(settings, log_queue, self.journal)
+
+    def _submit_changes(self, changeset):
+        self.last_flush = submit_commit_work(self.settings, self.process_changes_batch, changeset)
+        self.last_flush.add_done_callback(self._report_flush_error)
+
+    def _report_flush_error(self, future):
+        if not future.cancelled() and future.exception() is not None:
+            self.log_queue.put(LogEvent(f"❌ 변경 처리 중 오류 발생: {future.exception()}", ERROR))
+
+    def _repo_path(self, path, is_dir=False):
+        # 감시 폴더 밖이거나 무시 규칙에 걸리는 경로면 None
+        repo_path = os.path.relpath(path, self.settings['folder']).replace("\\", "/")
+        if repo_path == "." or repo_path.startswith("../") or self.ignore_rules.is_ignored(repo_path, is_dir):
+            return None
+        return repo_path
+
+    def _reload_ignore_rules(self, repo_path):
+        if repo_path == ".gitignore":
+            self.ignore_rules = IgnoreRules.from_settings(self.settings)
+            self.log_queue.put("ℹ️ .gitignore가 바뀌어 무시 규칙을 다시 읽었습니다.")
+
+    def _local_path(self, repo_path):
+        return os.path.join(self.settings['folder'], repo_path.replace("/", os.sep))
 
     def on_created(self, event):
-        if not event.is_directory:
-            self._add_to_batch(event.src_path)
+        repo_path = self._repo_path(event.src_path)
+        if not event.is_directory and repo_path:
+            self._reload_ignore_rules(repo_path)
+            self.coalescer.created(repo_path)
 
     def on_modified(self, event):
+        repo_path = self._repo_path(event.src_path)
+        if not event.is_directory and repo_path:
+            self._reload_ignore_rules(repo_path)
+            self.coalescer.modified(repo_path)
+
+    def on_deleted(self, event):
+        repo_path = self._repo_path(event.src_path, event.is_directory)
+        if not repo_path:
+            return
+        if event.is_directory:
+            # 폴더째 지워지면 깃허브에 있던 그 폴더 아래 파일을 모두 삭제로 기록
+            for path in get_remote_state(self.settings).paths_under(repo_path):
+                if not self.ignore_rules.is_ignored(path):
+                    self.coalescer.deleted(path)
+        else:
+            self.coalescer.deleted(repo_path)
+
+    def on_moved(self, event):
+        # 무시되는 경로로(에서) 옮겨지면 삭제(생성)와 같다
+        src = self._repo_path(event.src_path, event.is_directory)
+        dest = self._repo_path(event.dest_path, event.is_directory)
         if not event.is_directory:
-            self._add_to_batch(event.src_path)
-    
-    def _add_to_batch(self, path):
-        # 파일 경로를 일괄 처리 목록에 추가하고 타이머를 (재)시작
-        self.pending_changes.add(path)
-        
-        if self.batch_timer:
-            self.batch_timer.cancel()
-            
-        # 1.5초 후에 일괄 처리 함수를 실행합니다.
-        self.batch_timer = threading.Timer(1.5, self.process_changes_batch)
-        self.batch_timer.start()
-
-    def process_changes_batch(self):
-        # 잠시 동안 모인 모든 변경 이벤트를 한꺼번에 처리
-        if not self.pending_changes:
+            if src and dest:
+                self.coalescer.moved(src, dest)
+            elif src:
+                self.coalescer.deleted(src) # 감시 폴더 밖으로 옮겨짐
+            elif dest:
+                self.coalescer.created(dest) # 감시 폴더 안으로 옮겨 옴
             return
-            
-        files_to_process = list(self.pending_changes)
-        self.pending_changes.clear()
-        
+        # 폴더 이동 : 옮겨진 폴더 안의 파일마다 이름 변경으로 기록
+        if src:
+            for path in get_remote_state(self.settings).paths_under(src):
+                if self.ignore_rules.is_ignored(path):
+                    continue
+                if dest:
+                    self.coalescer.moved(path, dest + path[len(src):])
+                else:
+                    self.coalescer.deleted(path)
+        if dest:
+            for root, dirs, files in os.walk(event.dest_path):
+                dirs[:] = [d for d in dirs if self._repo_path(os.path.join(root, d), True)]
+                for filename in files:
+                    path = self._repo_path(os.path.join(root, filename))
+                    if src and path:
+                        self.coalescer.moved(src + path[len(dest):], path)
+                    elif path:
+                        self.coalescer.created(path)
+
+    def stop(self):
+        # 남은 변경을 넘기고, 넘긴 처리가 끝날 때까지 기다린다
+        self.coalescer.stop()
+        if self.last_flush is not None:
+            wait([self.last_flush])
+        self.drainer.stop()
+
+    def process_changes_batch(self, changeset):
+        # 잠시 동안 모인 변경의 최종 결과를 한꺼번에 처리
+        remote_state = get_remote_state(self.settings)
+
+        # 처리하기 전에 먼저 저널에 기록 (경로마다 작업 하나 : 반영되면 그 경로의 seq를 확인 처리)
+        ops = changeset_to_ops(changeset)
+        seqs = dict(zip((op[-1] for op in ops), self.journal.record(sync_scope(self.settings), ops)))
+        if self.drainer.offline:
+            # 연결이 끊긴 동안에는 하나씩 보내지 않고 저널에 쌓아 두었다가 연결이 돌아오면 한꺼번에 반영
+            self.journal.release(seqs.values())
+            return
+
+        # 삭제(휴지통 이동)와 이름 변경은 커밋 1개로 바로 반영
+        if changeset.deletes or changeset.renames:
+            batch = SyncBatch(self.settings, self.log_queue)
+            for repo_file_path in sorted(changeset.deletes):
+                batch.add_recycle(repo_file_path)
+            for repo_file_path, old_repo_path in changeset.renames.items():
+                batch.add_rename(old_repo_path, self._local_path(repo_file_path), repo_file_path)
+            committed_seqs = [seqs[path] for path in changeset.deletes | changeset.renames.keys()]
+            if batch.commit():
+                self.journal.ack(committed_seqs)
+            else:
+                self.journal.release(committed_seqs)
+            get_sync_index().forget_rejected(sync_scope(self.settings), changeset.deletes | set(changeset.renames.values()))
+
+        # 내용이 깃허브와 같은 파일(다시 저장만 한 경우 등)은 올리지 않는다
+        # 대신 새 stat을 인덱스에 적어 두어야 폴링/reconcile이 같은 파일을 계속 바뀐 것으로 보지 않는다
+        files_to_process = []
+        unchanged = {} # {repo_path: (stat 키, sha)}
+        rejected = get_sync_index().load_rejected(sync_scope(self.settings)) if changeset.uploads else {}
+        for repo_file_path in sorted(changeset.uploads - changeset.renames.keys()):
+            local_path = self._local_path(repo_file_path)
+            try:
+                key = stat_key(os.stat(local_path)) # 해시보다 먼저 : 그 사이 바뀌면 다음 비교에서 다시 잡힌다
+                if rejected.get(repo_file_path) == key:
+                    self.journal.ack([seqs[repo_file_path]]) # 크기 한도로 거부된 뒤 그대로인 파일
+                    continue
+                sha = compute_git_blob_sha(local_path)
+                if remote_state.get(repo_file_path) == sha:
+                    unchanged[repo_file_path] = (key, sha)
+                    self.journal.ack([seqs[repo_file_path]])
+                    continue
+            except OSError:
+                self.journal.ack([seqs[repo_file_path]])
+                continue # 그 사이 사라진 파일
+            files_to_process.append(local_path)
+        if unchanged:
+            get_sync_index().update_stats(sync_scope(self.settings), unchanged)
+
         file_count = len(files_to_process)
         
         # 파일 개수에 따라 다르게 처리
@@ -235,75 +2451,566 @@ class MyEventHandler(FileSystemEventHandler):
             file_path = files_to_process[0]
             self.log_queue.put(("notification", os.path.basename(file_path)))
             repo_file_path = os.path.relpath(file_path, self.settings['folder']).replace("\\", "/")
-            upload_file_to_github(file_path, repo_file_path, self.settings, self.log_queue)
-        else:
-            # 파일이 여러 개일 경우: 일괄 작업으로 처리
-            self.log_queue.put(("folder_detected", f"{file_count}개 파일의 일괄 작업", files_to_process))
+            if upload_file_to_github(file_path, repo_file_path, self.settings, self.log_queue):
+                self.journal.ack([seqs[repo_file_path]])
+            else:
+                self.journal.release([seqs[repo_file_path]])
+        elif file_count > 1:
+            # 파일이 여러 개일 경우: 일괄 작업으로 처리 (업로드가 끝나면 저널의 seq를 확인 처리)
+            upload_seqs = [seqs[os.path.relpath(path, self.settings['folder']).replace("\\", "/")]
+                           for path in files_to_process]
+            description = f"{file_count}개 파일의 일괄 작업"
+            needs_approval, total_bytes = batch_needs_approval(self.settings, files_to_process)
+            if needs_approval:
+                # 화면의 승인 대기 목록에 올리고 바로 돌아간다 (그동안 들어온 변경은 다음 묶음으로 처리)
+                self.log_queue.put(("folder_detected", description, files_to_process, upload_seqs, self.settings,
+                                    total_bytes))
+            else:
+                self.log_queue.put(("batch_started", description, file_count, total_bytes))
+                upload_files_batch(self.settings, files_to_process, self.log_queue, self.stop_event, upload_seqs)
 
-    def on_deleted(self, event):
-        # 삭제는 즉시 처리
-        if not event.is_directory:
-            repo_file_path = os.path.relpath(event.src_path, self.settings['folder']).replace("\\", "/")
-            move_file_to_recycle_bin(repo_file_path, self.settings, self.log_queue)
 
+# 4-(4) 감시 방식 : 파일 시스템 이벤트(watchdog) 또는 폴링
+# 네트워크 드라이브(SMB/NFS 등)는 다른 컴퓨터에서 바꾼 내용의 이벤트가 오지 않고, 폴더가 아주 많으면 리눅스의 inotify 감시 한도를
+# 넘어 이벤트 감시를 시작하지 못한다. 이럴 때는 폴더를 주기적으로 훑어 stat을 비교하는 폴링으로 감시한다.
+# 이벤트로 감시할 때도 가끔 같은 비교(reconcile)를 돌려, 놓친 이벤트(감시 한도 초과, 이벤트 큐 넘침 등)를 찾아 반영한다.
+NETWORK_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "afpfs", "9p", "drvfs", "sshfs", "fuse.sshfs", "davfs",
+                       "fuse.davfs", "fuse.rclone", "ceph", "glusterfs", "fuse.glusterfs", "afs", "lustre", "vboxsf"}
+WATCH_LIMIT_ERRNOS = (errno.ENOSPC, errno.EMFILE) # inotify 감시 개수 / 인스턴스 개수 한도 초과
+INOTIFY_WATCHES_FILE = "/proc/sys/fs/inotify/max_user_watches"
+INOTIFY_WATCH_HEADROOM = 0.8 # 폴더 수가 한도의 이 비율을 넘으면 처음부터 폴링 (다른 프로그램도 감시를 쓰므로)
+POLL_MIN_INTERVAL = 2.0 # 초, config.json의 "poll_interval"로 변경
+POLL_MAX_INTERVAL = 60.0 # 바뀐 게 없으면 간격을 이만큼까지 늘린다
+POLL_COST_RATIO = 10 # 한 번 훑는 데 걸린 시간의 이 배수보다 자주 훑지 않는다 (느린 드라이브에서 계속 훑기만 하지 않도록)
+RECONCILE_INTERVAL = 600.0 # 이벤트로 감시할 때 놓친 변경을 찾는 간격(초), config.json의 "reconcile_interval"로 변경
+WATCH_HEALTH_INTERVAL = 5.0 # 이벤트 감시 스레드가 살아 있는지 확인하는 간격(초)
+
+def network_filesystem(folder):
+    # 폴더가 네트워크 드라이브면 파일 시스템 종류를, 아니면(또는 알 수 없으면) None을 반환
+    path = os.path.realpath(folder)
+    if os.name == "nt":
+        drive = os.path.splitdrive(path)[0]
+        if drive.startswith("\\\\"):
+            return "unc"
+        import ctypes
+        if ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == 4: # DRIVE_REMOTE (네트워크 드라이브로 연결)
+            return "remote"
+        return None
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return None # 리눅스가 아니면 이벤트 감시를 그대로 쓰고, 놓친 변경은 reconcile로 찾는다
+    best, best_type = "", None
+    for mount_point, fstype in mounts:
+        mount_point = re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), mount_point) # 공백 등은 \040처럼 적혀 있다
+        if (path == mount_point or path.startswith(mount_point.rstrip("/") + "/")) and len(mount_point) >= len(best):
+            best, best_type = mount_point, fstype
+    return best_type if best_type in NETWORK_FILESYSTEMS else None
+
+def inotify_watch_limit():
+    try:
+        with open(INOTIFY_WATCHES_FILE, "r") as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None # 리눅스가 아님
+
+def choose_watch_mode(settings, log_queue, dir_count):
+    # "events"(watchdog) 또는 "poll". config.json의 "watch_mode"가 "auto"(기본값)일 때만 자동으로 고른다
+    mode = settings.get("watch_mode", "auto")
+    if mode in ("events", "poll"):
+        return mode
+    fstype = network_filesystem(settings['folder'])
+    if fstype:
+        log_queue.put(f"ℹ️ 감시 폴더가 네트워크 드라이브({fstype})라 변경 이벤트를 받을 수 없어 주기적으로 확인합니다.")
+        return "poll"
+    limit = inotify_watch_limit()
+    if limit and dir_count > limit * INOTIFY_WATCH_HEADROOM:
+        log_queue.put(LogEvent(f"⚠️ 폴더가 {dir_count}개로 inotify 감시 한도({limit})에 가까워 주기적으로 확인합니다. "
+                               f"(한도를 늘리려면 {INOTIFY_WATCHES_FILE} 값을 올리세요)", WARNING))
+        return "poll"
+    return "events"
+
+class SnapshotDiffer:
+    # 폴더를 훑어 파일별 stat 키를 이전 상태와 비교하고, 바뀐 점을 watchdog 이벤트로 만들어 event_handler에 넘긴다.
+    # 폴더의 mtime은 바로 아래 항목이 추가/삭제/이름 변경될 때만 바뀌므로, mtime이 그대로인 폴더는 목록을 다시 읽지 않고
+    # 이전 목록의 파일 stat만 확인한다 (하위 폴더는 각자의 mtime으로 따로 판단).
+    def __init__(self, settings, event_handler):
+        self.folder = settings['folder']
+        self.scope = sync_scope(settings)
+        self.event_handler = event_handler
+        self.ignore_rules = event_handler.ignore_rules
+        self.files = self.indexed_files() # {repo_path: stat 키} 마지막으로 확인한 상태 (처음엔 동기화 상태 인덱스)
+        self.dirs = {} # {폴더 repo_path("" 또는 "a/b/"): (mtime_ns, 파일 이름 목록, 하위 폴더 이름 목록)}
+        self.listed = 0 # 마지막으로 훑을 때 목록을 다시 읽은 폴더 수
+
+    def indexed_files(self):
+        # 크기 한도로 거부된 파일도 거부될 때의 stat을 기준으로 삼아, stat이 바뀌기 전에는 변경으로 보지 않는다
+        index = get_sync_index()
+        return {**index.load_rejected(self.scope),
+                **{repo_path: key for repo_path, (key, _) in index.load(self.scope).items()}}
+
+    def dir_count(self):
+        # 훑기 전에는 인덱스의 파일 경로로 폴더 수를 어림한다
+        if self.dirs:
+            return len(self.dirs)
+        dirs = {""}
+        for repo_path in self.files:
+            directory = posixpath.dirname(repo_path)
+            while directory not in dirs:
+                dirs.add(directory)
+                directory = posixpath.dirname(directory)
+        return len(dirs)
+
+    def _list_dir(self, rel_dir, local_dir, files):
+        file_names, dir_names = [], []
+        with os.scandir(local_dir) as entries:
+            for entry in entries:
+                repo_path = rel_dir + entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not self.ignore_rules.is_ignored(repo_path, is_dir=True):
+                            dir_names.append(entry.name)
+                        continue
+                    if not entry.is_file() or self.ignore_rules.is_ignored(repo_path):
+                        continue
+                    files[repo_path] = entry_stat_key(entry)
+                except OSError:
+                    continue # 그 사이 사라진 파일
+                file_names.append(entry.name)
+        return file_names, dir_names
+
+    def scan(self):
+        # 현재 상태 {repo_path: stat 키}
+        if self.event_handler.ignore_rules is not self.ignore_rules:
+            # 무시 규칙(.gitignore)이 바뀌었으면 저장해 둔 목록을 버리고 모두 다시 읽는다
+            self.ignore_rules = self.event_handler.ignore_rules
+            self.dirs = {}
+        files, dirs, self.listed = {}, {}, 0
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            local_dir = os.path.join(self.folder, rel_dir.replace("/", os.sep))
+            try:
+                mtime = os.stat(local_dir).st_mtime_ns
+                cached = self.dirs.get(rel_dir)
+                if cached and cached[0] == mtime:
+                    file_names, dir_names = cached[1], cached[2]
+                    for name in file_names:
+                        try:
+                            files[rel_dir + name] = stat_key(os.stat(os.path.join(local_dir, name)))
+                        except OSError:
+                            continue
+                else:
+                    file_names, dir_names = self._list_dir(rel_dir, local_dir, files)
+                    self.listed += 1
+            except OSError:
+                continue # 열 수 없거나 그 사이 사라진 폴더 (안의 파일은 삭제로 처리된다)
+            dirs[rel_dir] = (mtime, file_names, dir_names)
+            stack.extend(rel_dir + name + "/" for name in dir_names)
+        self.dirs = dirs
+        return files
+
+    def poll(self, baseline=None, skip=frozenset()):
+        # 훑어서 바뀐 점을 이벤트로 넘기고 바뀐 파일 수를 반환. baseline을 주면 그 상태와 비교한다
+        # skip : 이미 처리 중이거나 승인을 기다리는 경로 (다시 넘기지 않음)
+        previous = self.files if baseline is None else baseline
+        current = self.scan()
+        created = current.keys() - previous.keys() - skip
+        deleted = previous.keys() - current.keys() - skip
+        modified = [path for path in current.keys() & previous.keys() - skip if current[path] != previous[path]]
+        # 같은 inode와 크기가 사라지고 새로 생겼으면 이름 변경 (휴지통을 거치지 않고 blob을 재사용)
+        deleted_by_inode = {(previous[path][2], previous[path][0]): path for path in deleted if previous[path][2]}
+        local_path = lambda path: os.path.join(self.folder, path.replace("/", os.sep))
+        for path in sorted(created):
+            old_path = deleted_by_inode.pop((current[path][2], current[path][0]), None)
+            if old_path is not None:
+                deleted.discard(old_path)
+                self.event_handler.dispatch(FileMovedEvent(local_path(old_path), local_path(path)))
+            else:
+                self.event_handler.dispatch(FileCreatedEvent(local_path(path)))
+        for path in sorted(modified):
+            self.event_handler.dispatch(FileModifiedEvent(local_path(path)))
+        for path in sorted(deleted):
+            self.event_handler.dispatch(FileDeletedEvent(local_path(path)))
+        self.files = current
+        return len(created) + len(modified) + len(deleted)
 
 # 5. 초기 동기화 및 감시 시작 로직
 
-def initial_sync_and_start_monitoring(settings, log_queue, stop_event):
+def initial_sync(settings, log_queue, stop_event):
+    # 로컬 폴더를 기준으로 깃허브 저장소를 맞춘다. 성공하면 감시에 쓸 무시 규칙을, 실패하거나 중단되면 None을 돌려준다
     log_queue.put("🔄 초기 동기화를 시작합니다...")
+    transport_before = transport.stats.snapshot()
+    metrics.start_exporter()
+    phase_started = time.perf_counter()
+    phase_seconds = {} # 단계별 소요 시간 (로그와 지표에 남김)
 
-    remote_files = get_github_repo_file_list(settings, log_queue) # 깃허브 저장소의 파일 목록 확인
+    # 지난 동기화 상태 불러오기 : 브랜치 head가 그대로면 원격 트리를 다시 받지 않는다
+    index = get_sync_index()
+    scope = sync_scope(settings)
+    indexed_files = index.load(scope)
+    indexed_head = index.get_head(scope)
+    indexed_remote = index.load_remote(scope) # 로컬 행과 따로 저장한 원격 트리 (없으면 트리를 다시 받는다)
+    try:
+        head_commit = get_branch_ref(settings)
+        empty_repo = head_commit is None
+    except Exception:
+        head_commit, empty_repo = None, False # 아래 파일 목록 조회에서 오류를 알려준다
+    if empty_repo:
+        # 커밋이 없는 빈 저장소는 트리를 조회할 수 없다 (깃허브는 409 "Git Repository is empty"로 응답)
+        log_queue.put("ℹ️ 깃허브 저장소가 비어 있습니다. 첫 커밋으로 전체 파일을 올립니다.")
+        remote_files = {}
+        get_remote_state(settings).replace(remote_files)
+    elif head_commit and head_commit == indexed_head and indexed_remote is not None:
+        log_queue.put("ℹ️ 마지막 동기화 이후 깃허브 브랜치가 그대로여서 파일 목록 조회를 건너뜁니다.")
+        remote_files = indexed_remote
+        get_remote_state(settings).replace(remote_files, index.load_remote_modes(scope))
+    else:
+        remote_files = None
+        if head_commit and indexed_head and indexed_remote is not None:
+            # 다른 컴퓨터 등에서 커밋이 추가됐다면 그 사이 바뀐 파일만 받는다
+            remote_files = apply_remote_compare(settings, log_queue, indexed_remote, indexed_head, head_commit,
+                                                index.load_remote_modes(scope))
+        if remote_files is None:
+            remote_files = get_github_repo_file_list(settings, log_queue, ref=head_commit) # 깃허브 저장소의 파일 목록 확인
     if remote_files is None:
         log_queue.put("초기 동기화 실패. 감시를 시작하지 않습니다.")
         log_queue.put("STOP_MONITORING_UI")
-        return
+        return None
+    phase_seconds["tree_fetch"] = time.perf_counter() - phase_started
     watch_folder = settings['folder']
     if not os.path.isdir(watch_folder):
         log_queue.put(f"오류: '{watch_folder}'는 유효한 폴더가 아닙니다.")
         log_queue.put("STOP_MONITORING_UI")
-        return
-    local_files = set()
-    for root, _, files in os.walk(watch_folder): # os.walk : 내 컴퓨터 폴더의 목록 확인
-        for filename in files:
-            local_path = os.path.join(root, filename)
-            repo_path = os.path.relpath(local_path, watch_folder).replace("\\", "/")
-            local_files.add(repo_path)
-    files_to_delete = remote_files - local_files
-    files_to_upload = local_files - remote_files
+        return None
+    # 지난번에 반영하지 못한 감시 작업을 먼저 기록된 순서대로 반영 (이름 변경이 삭제+추가로 바뀌지 않도록)
+    if get_journal().has_unclaimed(scope) and replay_journal(settings, log_queue):
+        head_commit = get_branch_ref(settings)
+        remote_files = get_remote_state(settings).snapshot()
+        indexed_files = index.load(scope)
+    local_files = {} # {repo_path: 로컬 blob sha}
+    local_stats = {} # {repo_path: (size, mtime_ns, inode)}
+    unreadable = set() # 읽지 못한 파일은 깃허브에서 지우지 않는다
+    rejected = index.load_rejected(scope)
+    oversized = set() # 지난번에 크기 한도로 거부된 뒤 그대로인 파일 (다시 올리지도, 깃허브에서 지우지도 않음)
+    ignore_rules = IgnoreRules.from_settings(settings)
+
+    # 동기화 계획 : 추가(로컬에만 있음) / 수정(sha가 다름) / 삭제(깃허브에만 있음)
+    # sha가 같은 파일은 네트워크 요청 없이 건너뛰고, 바뀐 파일은 스캔 도중에 바로 업로드를 시작한다
+    # (빈 저장소는 첫 커밋이 생긴 뒤에야 blob을 올릴 수 있어 커밋할 때 한꺼번에 올린다)
+    phase_started = time.perf_counter()
+    batch = SyncBatch(settings, log_queue)
+    stream_uploads = head_commit is not None
+    files_to_add, files_to_modify = set(), set()
+    scanner = LocalScanner(watch_folder, ignore_rules, indexed_files,
+                           int(settings.get("hash_workers", DEFAULT_HASH_WORKERS)), rejected)
+    for repo_path, local_path, key, sha, error in scanner.scan():
+        if stop_event.is_set():
+            break
+        if error:
+            unreadable.add(repo_path)
+            log_queue.put(LogEvent(f"   ❌ 파일 읽기 오류: {error}", ERROR, path=repo_path, phase="read"))
+            continue
+        if sha is None:
+            oversized.add(repo_path)
+            continue
+        local_files[repo_path] = sha
+        local_stats[repo_path] = key
+        remote_sha = remote_files.get(repo_path)
+        if remote_sha != sha:
+            (files_to_modify if remote_sha else files_to_add).add(repo_path)
+            batch.add_upload(local_path, repo_path, start=stream_uploads, sha=sha, key=key)
+    phase_seconds["scan"] = time.perf_counter() - phase_started
+    log_queue.put(f"🔎 로컬 파일 {scanner.scanned}개 확인 (다시 해시 {scanner.rehashed}개)")
+    if oversized:
+        log_queue.put(LogEvent(f"ℹ️ 크기 한도를 넘어 올리지 않았던 파일 {len(oversized)}개는 바뀌지 않아 건너뜁니다.",
+                               phase="upload"))
+    stale_rejected = rejected.keys() - local_files.keys() - unreadable - oversized # 그 사이 사라진 파일의 기록
 
+    # 무시 규칙에 걸리는 파일은 깃허브에 이미 올라가 있더라도 지우지 않는다
+    files_to_delete = {path for path in remote_files.keys() - local_files.keys() - unreadable - oversized
+                       if not ignore_rules.is_ignored(path)}
+    files_to_upload = files_to_add | files_to_modify
+
+    synced_head = head_commit
     if not files_to_delete and not files_to_upload:
         log_queue.put("✅ 로컬과 깃허브 저장소가 이미 동기화 상태입니다.")
     else:
-        total_tasks = len(files_to_delete) + len(files_to_upload)
-        current_task = 0
-        
+        log_queue.put(f"📋 추가 {len(files_to_add)}개, 수정 {len(files_to_modify)}개, 삭제 {len(files_to_delete)}개")
+
+        # 삭제(휴지통 이동)와 업로드를 모두 모아 커밋 1개로 반영 (진행률은 batch가 metrics에 기록)
         for repo_path in files_to_delete:
-            move_file_to_recycle_bin(repo_path, settings, log_queue)
-        for repo_path in files_to_upload:
-            local_path = os.path.join(settings['folder'], repo_path.replace("/", os.sep))
-            upload_file_to_github(local_path, repo_path, settings, log_queue)
+            batch.add_recycle(repo_path)
+        synced_head = None
+        phase_started = time.perf_counter()
+        committed = not stop_event.is_set() and batch.commit()
+        phase_seconds["upload"] = time.perf_counter() - phase_started
+        if committed:
+            synced_head = batch.head_commit
+            # 업로드하지 못한 파일은 인덱스에 남기지 않아 다음 실행 때 다시 시도한다
+            for repo_path in files_to_upload - batch.blob_shas.keys():
+                local_files.pop(repo_path, None)
+
+    # 동기화에 성공했을 때만 현재 상태를 인덱스에 저장 (도중에 중단했다면 스캔 결과가 불완전하므로 저장하지 않음)
+    if synced_head and not stop_event.is_set():
+        index.replace_snapshot(scope, {path: (local_stats[path], sha) for path, sha in local_files.items()},
+                               synced_head, get_remote_state(settings).snapshot(),
+                               get_remote_state(settings).modes_snapshot())
+        index.forget_rejected(scope, stale_rejected)
     if stop_event.is_set():
         log_queue.put("⏹️ 동기화 중단됨. 감시를 시작하지 않습니다.")
-        return
+        return None
     log_queue.put("✅ 초기 동기화 완료.")
-    log_queue.put(f"📂 폴더 실시간 감시를 시작합니다: {watch_folder}")
+    for phase, seconds in phase_seconds.items():
+        metrics.observe("sync_phase_seconds", seconds, phase=phase)
+    phase_labels = {"tree_fetch": "원격 목록 조회", "scan": "스캔/해시", "upload": "업로드/커밋"}
+    log_queue.put(LogEvent("⏱️ 단계별 시간: " + ", ".join(f"{phase_labels[phase]} {seconds:.2f}초"
+                                                       for phase, seconds in phase_seconds.items()),
+                           phase="sync", duration=sum(phase_seconds.values())))
+    metrics.export()
+    transport_lines = transport.stats.summary_lines(since=transport_before)
+    if transport_lines:
+        log_queue.put("📊 초기 동기화 동안의 API 요청 통계 (함께 실행 중인 프로필 포함):\n" + "\n".join(transport_lines))
+    return ignore_rules
+
+def start_observer(settings, log_queue, event_handler):
+    # watchdog 이벤트 감시를 시작. 감시 한도를 넘어 시작하지 못하면 None (폴링으로 감시)
     observer = Observer()
-    observer.schedule(MyEventHandler(settings, log_queue), watch_folder, recursive=True)
-    observer.start()
-    stop_event.wait()
-    observer.stop()
-    observer.join()
+    observer.schedule(event_handler, settings['folder'], recursive=True)
+    try:
+        observer.start()
+    except OSError as e:
+        if e.errno not in WATCH_LIMIT_ERRNOS:
+            raise
+        log_queue.put(LogEvent(f"⚠️ 파일 감시 한도를 넘어 이벤트로 감시할 수 없어 주기적으로 확인합니다: {e}", WARNING))
+        return None
+    return observer
+
+def start_monitoring(settings, log_queue, stop_event, ignore_rules=None):
+    # stop_event가 설정될 때까지 폴더를 감시하며 변경을 깃허브에 반영
+    watch_folder = settings['folder']
+    event_handler = MyEventHandler(settings, log_queue, ignore_rules, stop_event)
+    differ = SnapshotDiffer(settings, event_handler)
+    observer = None
+    if choose_watch_mode(settings, log_queue, differ.dir_count()) == "events":
+        observer = start_observer(settings, log_queue, event_handler)
+    log_queue.put(f"📂 폴더 실시간 감시를 시작합니다: {watch_folder}" + ("" if observer else " (주기적 확인)"))
+    min_interval = float(settings.get("poll_interval", POLL_MIN_INTERVAL))
+    reconcile_interval = float(settings.get("reconcile_interval", RECONCILE_INTERVAL))
+    interval = min_interval
+    next_reconcile = time.monotonic() + reconcile_interval
+    while True:
+        if observer is not None:
+            timeout = min(WATCH_HEALTH_INTERVAL, max(next_reconcile - time.monotonic(), 0))
+        else:
+            timeout = interval
+        if stop_event.wait(timeout):
+            break
+        if observer is not None and not all(emitter.is_alive() for emitter in observer.emitters):
+            # 감시 도중 새 폴더를 감시에 넣지 못하는 등으로 이벤트 스레드가 멈췄다
+            log_queue.put(LogEvent("⚠️ 파일 변경 이벤트 감시가 멈춰 주기적 확인으로 바꿉니다.", WARNING))
+            observer.stop()
+            observer.join()
+            observer = None
+        if observer is None:
+            # 폴링 : 바뀐 게 있으면 가장 짧은 간격으로, 없으면 점점 늘린다 (한 번 훑는 시간의 POLL_COST_RATIO배 이상)
+            started = time.perf_counter()
+            changed = differ.poll()
+            elapsed = time.perf_counter() - started
+            metrics.observe("watch_poll_seconds", elapsed)
+            interval = min_interval if changed else min(interval * 1.5, POLL_MAX_INTERVAL)
+            interval = max(interval, elapsed * POLL_COST_RATIO)
+        elif time.monotonic() >= next_reconcile:
+            # 이벤트 감시 중의 점검 : 반영된 상태(인덱스)와 비교해 놓친 변경만 다시 처리
+            changed = differ.poll(baseline=differ.indexed_files(), skip=get_journal().pending_paths(sync_scope(settings)))
+            if changed:
+                log_queue.put(LogEvent(f"🔁 이벤트로 받지 못한 변경 {changed}개를 찾아 반영합니다.", WARNING))
+            next_reconcile = time.monotonic() + reconcile_interval
+    if observer is not None:
+        observer.stop()
+        observer.join()
+    event_handler.stop()
     log_queue.put("⏹️ 감시가 중단되었습니다.")
 
+def initial_sync_and_start_monitoring(settings, log_queue, stop_event):
+    # 프로필 하나를 초기 동기화한 뒤 stop_event가 설정될 때까지 감시 (예전 진입점 : 여러 프로필은 run_profiles)
+    ignore_rules = initial_sync(settings, log_queue, stop_event)
+    if ignore_rules is not None:
+        start_monitoring(settings, log_queue, stop_event, ignore_rules)
+
+def upload_files_batch(settings, files_to_upload, log_queue, stop_event, journal_seqs=()):
+    # 감시 중 여러 파일이 한꺼번에 바뀌었을 때 : 모든 파일을 커밋 1개로 업로드하고 저널의 seq를 확인 처리
+    batch = SyncBatch(settings, log_queue)
+    for file_path in files_to_upload:
+        repo_path = os.path.relpath(file_path, settings['folder']).replace("\\", "/")
+        batch.add_upload(file_path, repo_path)
+    # 만약 감시가 중단되었다면 업로드하지 않습니다. (저널에 남아 다음 시작 때 반영)
+    if stop_event.is_set():
+        log_queue.put("폴더 업로드 중단됨.")
+        get_journal().release(journal_seqs)
+        return
+    if batch.commit():
+        get_journal().ack(journal_seqs)
+    else:
+        get_journal().release(journal_seqs)
+
+
+# 5-(1) 여러 프로필 함께 실행
+# 프로필마다 스레드 하나가 초기 동기화 후 감시(Observer 하나)를 하고, 변경 합치기/저널 재시도 타이머(감시 타이머),
+# blob 업로드와 커밋 작업 스케줄러, HTTP 연결 풀은 모든 프로필이 공유한다.
+# 전체 스캔/해시를 하는 초기 동기화는 동시에 sync_concurrency개까지만 돌려 프로필이 많아도 스레드와 연결이 몰리지 않는다.
+DEFAULT_SYNC_CONCURRENCY = 2
+PROFILE_DONE_STATES = ("done", "failed")
+
+class ProfileLogQueue:
+    # 프로필 여러 개가 로그 큐 하나를 같이 쓸 때 : 로그 앞에 [프로필 이름]을 붙인다
+    # (한 프로필의 실패가 다른 프로필의 UI까지 멈추지 않도록 STOP_MONITORING_UI는 프로필 상태 메시지로 대신한다)
+    def __init__(self, log_queue, prefix=None):
+        self.log_queue = log_queue
+        self.prefix = prefix
+
+    def put(self, message):
+        if message == "STOP_MONITORING_UI":
+            return
+        if self.prefix and isinstance(message, LogEvent):
+            message = LogEvent(f"[{self.prefix}] {message.message}", message.level, message.path, message.phase,
+                               message.duration)
+        elif self.prefix and isinstance(message, str):
+            message = f"[{self.prefix}] {message}"
+        self.log_queue.put(message)
+
+def run_profile(settings, log_queue, stop_event, sync_slots, watch=True):
+    # 프로필 하나 : 초기 동기화(동시 실행 수 제한) 후 감시. 상태는 ("profile_status", 이름, 상태)로 알린다
+    # 반환값 : 초기 동기화에 성공했으면 True
+    name = settings["profile"]
+    ignore_rules = None
+    try:
+        log_queue.put(("profile_status", name, "waiting"))
+        with sync_slots:
+            if not stop_event.is_set():
+                log_queue.put(("profile_status", name, "syncing"))
+                ignore_rules = initial_sync(settings, log_queue, stop_event)
+        if ignore_rules is not None and watch:
+            log_queue.put(("profile_status", name, "watching"))
+            start_monitoring(settings, log_queue, stop_event, ignore_rules)
+    finally:
+        failed = ignore_rules is None and not stop_event.is_set()
+        log_queue.put(("profile_status", name, "failed" if failed else "done"))
+    return ignore_rules is not None
+
+def run_profiles(profiles, log_queue, stop_event, watch=True):
+    # 모든 프로필을 함께 실행하고 끝날 때까지 기다린다. 반환값 : {프로필 이름: 초기 동기화 성공 여부}
+    concurrency = max(int(profiles[0].get("sync_concurrency", DEFAULT_SYNC_CONCURRENCY)), 1)
+    sync_slots = threading.BoundedSemaphore(concurrency)
+    results = {}
+
+    def run(settings):
+        prefix = settings["profile"] if len(profiles) > 1 else None
+        profile_log_queue = ProfileLogQueue(log_queue, prefix)
+        try:
+            results[settings["profile"]] = run_profile(settings, profile_log_queue, stop_event, sync_slots, watch)
+        except Exception as e:
+            results[settings["profile"]] = False
+            profile_log_queue.put(LogEvent(f"❌ 동기화 중 오류 발생: {e}", ERROR))
+
+    threads = [threading.Thread(target=run, args=(settings,), name=f"profile-{settings['profile']}", daemon=True)
+               for settings in profiles]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
 # 6. 기본 UI 로직
 
+# 6-(0) 로그 화면/파일 처리
+# 화면에는 100ms마다 모인 로그를 한 번에 넣고, 한꺼번에 쏟아지는 파일별 진행 줄은 단계별 요약 한 줄로 합친다.
+# 위젯은 최근 줄만 유지하고, 모든 로그는 크기가 넘으면 돌려 쓰는 로그 파일(uploader.log)에 그대로 남긴다.
+
+LOG_FILE = os.path.join(application_path, "uploader.log")
+LOG_FILE_MAX_BYTES = 2 * 1024 * 1024 # 넘으면 uploader.log.1, .2 … 로 밀어내고 새로 쓴다
+LOG_FILE_BACKUPS = 3
+LOG_WIDGET_MAX_LINES = 2000   # 화면에 남겨 둘 최대 줄 수
+LOG_MAX_PER_TICK = 5000       # 한 번(100ms)에 처리할 최대 로그 수
+LOG_COALESCE_THRESHOLD = 10   # 한 번에 같은 단계의 파일별 진행 줄이 이보다 많으면 요약 한 줄로 합친다
+PHASE_LABELS = {"upload": "추가/수정", "recycle": "휴지통 이동", "rename": "이름 변경"}
+PROFILE_STATE_LABELS = {"idle": "-", "waiting": "⏳ 대기 중", "syncing": "🔄 동기화 중", "watching": "👀 감시 중",
+                        "done": "⏹️ 중지됨", "failed": "❌ 실패"}
+# 알림은 창을 막지 않는 토스트로 띄우고, 짧은 시간에 여러 건이 오면 한 번에 묶어 보여준다
+TOAST_DURATION_MS = 4000
+TOAST_MIN_GAP = 3.0 # 초
+TOAST_MAX_LINES = 3
+
+_file_logger = None
+_file_logger_lock = threading.Lock()
+
+def get_file_logger():
+    global _file_logger
+    with _file_logger_lock:
+        if _file_logger is None:
+            import logging.handlers
+            handler = logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=LOG_FILE_MAX_BYTES,
+                                                           backupCount=LOG_FILE_BACKUPS, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+            logger = logging.getLogger("github_auto_uploader")
+            logger.setLevel(logging.INFO)
+            logger.addHandler(handler)
+            logger.propagate = False
+            _file_logger = logger
+        return _file_logger
+
+def write_log_file(message):
+    import logging
+    if not isinstance(message, LogEvent):
+        message = LogEvent(str(message))
+    fields = [f"{name}={value}" for name, value in (("phase", message.phase), ("path", message.path)) if value]
+    if message.duration is not None:
+        fields.append(f"duration={message.duration:.3f}s")
+    level = {INFO: logging.INFO, WARNING: logging.WARNING, ERROR: logging.ERROR}[message.level]
+    get_file_logger().log(level, message.message.strip() + (f" [{' '.join(fields)}]" if fields else ""))
+
+def summarize_log_events(events):
+    # 화면에 넣을 줄 목록 : 파일별 진행 줄(info)이 단계별로 많으면 처음 나온 자리에 요약 한 줄만 넣는다
+    progress = defaultdict(list) # {단계: [경로, …]}
+    for event in events:
+        if isinstance(event, LogEvent) and event.level == INFO and event.path and event.phase in PHASE_LABELS:
+            progress[event.phase].append(event.path)
+    coalesced = {phase for phase, paths in progress.items() if len(paths) > LOG_COALESCE_THRESHOLD}
+    lines, shown = [], set()
+    for event in events:
+        phase = getattr(event, "phase", None)
+        if phase in coalesced and event.level == INFO and event.path:
+            if phase not in shown:
+                shown.add(phase)
+                paths = progress[phase]
+                lines.append(f"- 처리 대상 ({PHASE_LABELS[phase]}) 파일 {len(set(paths))}개 진행 중... (마지막: {paths[-1]})")
+            continue
+        lines.append(str(event))
+    return lines
+
+def load_gui_modules():
+    # GUI로 실행할 때만 tkinter/ttkbootstrap/keyring/problem_finder를 불러온다 (없으면 이때 설치)
+    global ttk, dialogs, ToastNotification, tk, filedialog, scrolledtext, keyring, problem_finder
+    install_if_missing("ttkbootstrap")
+    install_if_missing("keyring")
+    import ttkbootstrap as ttk
+    from ttkbootstrap.dialogs import dialogs
+    from ttkbootstrap.toast import ToastNotification
+    import tkinter as tk
+    from tkinter import filedialog, scrolledtext
+    import keyring # keyring을 사용해 OS 보안 저장소에 토큰을 저장
+    import problem_finder # 백준 문제 불러오기(problem_finder) 모듈 import
+
 class App:
     def __init__(self, root):
         self.root = root
         self.root.title("Github 업로드 딸깍!.made by 딸깍눌러조")
-        self.root.geometry("600x480")
-
         self.settings = load_settings()
+        profiles = load_profiles(self.settings)
+        # 프로필이 여러 개면 프로필별 상태 표를 보여줄 만큼 창을 늘린다
+        self.root.geometry(f"600x{510 + (60 + 20 * min(len(profiles), 5) if len(profiles) > 1 else 0)}")
 
         # 6-(1). 사용할 기본 폰트와 버튼 폰트를 미리 정의
         # (폰트 이름, 크기, 스타일) 순서
@@ -322,8 +3029,7 @@ class App:
         header_frame.pack(fill="x")
 
         # 6-(3) 현재 설정 정보 표시 라벨 
-        info_text = f"사용자: {self.settings.get('username')} | 저장소: {self.settings.get('repo')}" if self.settings.get('username') else "⚙️ '설정'에서 사용자 정보를 먼저 입력해주세요."
-        self.info_label = ttk.Label(header_frame, text=info_text, bootstyle="secondary")
+        self.info_label = ttk.Label(header_frame, text=self._info_text(), bootstyle="secondary")
         self.info_label.grid(row=1, column=0, columnspan=3, sticky='w', pady=(5,0))
 
         # 6-(4) 프로그램 제목과 버튼들
@@ -351,10 +3057,49 @@ class App:
         self.btn_problem = ttk.Button(control_frame, text="✏️ 백준 문제 찾기", command=self.open_problem_finder_window, bootstyle="info")
         self.btn_problem.grid(row=0, column=2, sticky="ew", padx=(5, 0), ipady=10)
 
+        # 6-(4.1) 진행률 막대와 남은 시간 (metrics의 진행률을 로그 확인 주기마다 반영)
+        progress_frame = ttk.Frame(root, padding=(10, 0, 10, 5))
+        progress_frame.pack(fill="x")
+        self.progress_bar = ttk.Progressbar(progress_frame, mode="determinate", bootstyle="success-striped")
+        self.progress_bar.pack(side="left", expand=True, fill="x")
+        self.progress_label = ttk.Label(progress_frame, text="대기 중", width=24, anchor="e", bootstyle="secondary")
+        self.progress_label.pack(side="right", padx=(10, 0))
+
+        # 6-(4.2) 프로필별 상태 표 (config.json에 프로필이 여러 개일 때만 표시)
+        self.profile_states = {} # {프로필 이름: 상태}
+        self.profile_tree = None
+        if len(profiles) > 1:
+            status_frame = ttk.Labelframe(root, text="프로필별 상태", padding=(10, 5))
+            status_frame.pack(fill="x", padx=10, pady=(0, 5))
+            self.profile_tree = ttk.Treeview(status_frame, columns=("target", "state", "pending"),
+                                             height=min(len(profiles), 5))
+            for column, heading, width in (("#0", "프로필", 110), ("target", "저장소@브랜치", 220),
+                                           ("state", "상태", 110), ("pending", "대기 업로드", 80)):
+                self.profile_tree.heading(column, text=heading)
+                self.profile_tree.column(column, width=width, stretch=column == "target")
+            self.profile_tree.pack(fill="x")
+            self._reset_profile_rows(profiles)
+
+        # 6-(4.3) 승인 대기 중인 일괄 업로드 (대기 중인 작업이 있을 때만 표시, 승인하지 않아도 다른 작업은 계속된다)
+        self.pending_batches = {} # {목록 행 iid: (settings, 파일 목록, 저널 seq 목록)}
+        self.approval_frame = ttk.Labelframe(root, text="승인 대기 중인 일괄 업로드", padding=(10, 5))
+        self.approval_tree = ttk.Treeview(self.approval_frame, columns=("files", "size", "time"), height=3)
+        for column, heading, width in (("#0", "작업", 220), ("files", "파일 수", 70), ("size", "크기", 80),
+                                       ("time", "감지 시각", 80)):
+            self.approval_tree.heading(column, text=heading)
+            self.approval_tree.column(column, width=width, stretch=column == "#0")
+        self.approval_tree.pack(side="left", expand=True, fill="x")
+        approval_buttons = ttk.Frame(self.approval_frame)
+        approval_buttons.pack(side="right", padx=(10, 0))
+        ttk.Button(approval_buttons, text="✅ 승인", command=self.approve_selected, bootstyle="success-outline").pack(fill="x")
+        ttk.Button(approval_buttons, text="모두 승인", command=self.approve_all, bootstyle="success").pack(fill="x", pady=(5, 0))
+        self.toast_lines = [] # 아직 띄우지 않은 알림
+        self.last_toast = 0.0
+
         # 6-(5) 실시간 로그 출력 영역
-        log_frame = ttk.Labelframe(root, text="실시간 진행상황", padding=(10, 5))
-        log_frame.pack(expand=True, fill="both", padx=10, pady=(0, 10))
-        self.log_text = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD, state="disabled", font=("Malgun Gothic", 9))
+        self.log_frame = ttk.Labelframe(root, text="실시간 진행상황", padding=(10, 5))
+        self.log_frame.pack(expand=True, fill="both", padx=10, pady=(0, 10))
+        self.log_text = scrolledtext.ScrolledText(self.log_frame, wrap=tk.WORD, state="disabled", font=("Malgun Gothic", 9))
         self.log_text.pack(expand=True, fill="both")
         
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -362,8 +3107,22 @@ class App:
 
     # 6-(6) 메인 화면의 설정 정보 라벨을 업데이트하는 함수
     def update_info_label(self):
-        info_text = f"사용자: {self.settings.get('username')} | 저장소: {self.settings.get('repo')}" if self.settings.get('username') else "⚙️ '설정'에서 사용자 정보를 먼저 입력해주세요."
-        self.info_label.config(text=info_text)
+        self.info_label.config(text=self._info_text())
+
+    def _info_text(self):
+        profiles = load_profiles(self.settings)
+        if len(profiles) > 1:
+            return f"프로필 {len(profiles)}개: " + ", ".join(profile["profile"] for profile in profiles)
+        return f"사용자: {self.settings.get('username')} | 저장소: {self.settings.get('repo')}" if self.settings.get('username') else "⚙️ '설정'에서 사용자 정보를 먼저 입력해주세요."
+
+    def _reset_profile_rows(self, profiles):
+        if self.profile_tree is None:
+            return
+        self.profile_tree.delete(*self.profile_tree.get_children())
+        for profile in profiles:
+            target = f"{profile.get('username')}/{profile.get('repo')}@{profile.get('branch', 'main')}"
+            self.profile_tree.insert("", "end", iid=profile["profile"], text=profile["profile"],
+                                     values=(target, PROFILE_STATE_LABELS["idle"], 0))
 
 # 7. 설정 창 UI  
     def open_settings_window(self):
@@ -401,12 +3160,14 @@ class App:
 
         # 7-(1) 저장 버튼 / Keyring을 사용해 토큰을 OS 보안 저장소에 저장✨
         def save_and_close():
-            new_settings = {key: entries[key].get() for key in keys}
+            # 화면에 없는 값(profiles, upload_workers 등)은 그대로 두고 입력한 값만 바꾼다
+            new_settings = dict(self.settings)
+            new_settings.update({key: entries[key].get() for key in keys})
             new_settings["theme"] = theme_combo.get()
             try:
                 # 1. Keyring을 사용해 토큰을 OS 보안 저장소에 저장
                 # "서비스 이름", "계정(사용자 이름)", "비밀번호(토큰)" 형태로 저장됩니다.
-                keyring.set_password("github_auto_uploader", new_settings["username"], new_settings["token"])
+                keyring.set_password(KEYRING_SERVICE, new_settings["username"], new_settings["token"])
                 
                 # 2. config.json 파일에 저장할 설정에서는 토큰을 제거
                 settings_for_file = new_settings.copy()
@@ -428,92 +3189,287 @@ class App:
     
 # 8. 시작 버튼 클릭 시 실행되는 함수
     def start_action(self):
-        if not all(self.settings.get(key) for key in ["username", "repo", "folder"]):
-            dialogs.Messagebox.show_error("'⚙️ 설정'에서 사용자 이름, 저장소, 폴더를 먼저 입력해주세요.", "오류")
+        profiles = load_profiles(self.settings)
+        if not all(profile.get(key) for profile in profiles for key in ["username", "repo", "folder"]):
+            dialogs.Messagebox.show_error("'⚙️ 설정'(프로필을 쓰면 config.json의 profiles)에서 사용자 이름, 저장소, 폴더를 먼저 입력해주세요.", "오류")
             return
-        # 1. Keyring에서 사용자 이름을 기준으로 토큰을 불러오기
+        # 1. 환경 변수 또는 Keyring에서 사용자 이름을 기준으로 토큰을 불러오기
+        # 2. 현재 작업에 사용할 설정 객체 만들기 (프로필마다 불러온 토큰 포함)
         try:
-            token = keyring.get_password("github_auto_uploader", self.settings["username"])
-            if not token:
-                dialogs.Messagebox.show_error("토큰을 찾을 수 없습니다.\n'⚙️ 설정'에서 토큰을 다시 입력하고 저장해주세요.", "토큰 오류")
-                return
+            for profile in profiles:
+                token = load_token(profile)
+                if not token:
+                    dialogs.Messagebox.show_error(f"'{profile['profile']}'의 토큰을 찾을 수 없습니다.\n'⚙️ 설정'에서 토큰을 다시 입력하고 저장해주세요.", "토큰 오류")
+                    return
+                profile["token"] = token
         except Exception as e:
             dialogs.Messagebox.show_error(f"토큰을 불러오는 중 오류 발생:\n{e}", "오류")
             return
-            
-        # 2. 현재 작업에 사용할 설정 객체 만들기 (불러온 토큰 포함)
-        active_settings = self.settings.copy()
-        active_settings["token"] = token
+        self.profile_states = {profile["profile"]: "waiting" for profile in profiles}
+        self._reset_profile_rows(profiles)
 
         # 3. UI 상태를 업데이트
         self.log_text.config(state="normal"); self.log_text.delete(1.0, tk.END); self.log_text.config(state="disabled")
         self.btn_start.config(state="disabled"); self.btn_stop.config(state="normal")
         self.stop_event.clear()
 
-        # 4. 백그라운드 작업에 토큰이 포함된 'active_settings'를 전달
-        threading.Thread(target=initial_sync_and_start_monitoring, args=(active_settings, self.log_queue, self.stop_event), daemon=True).start()
+        # 4. 백그라운드 작업에 토큰이 포함된 프로필 설정을 전달 (프로필마다 동기화 후 감시)
+        threading.Thread(target=run_profiles, args=(profiles, self.log_queue, self.stop_event), daemon=True).start()
 
     def stop_action(self):
         self.stop_event.set()
+        self._release_pending_batches()
         self.reset_ui_to_idle()
     
     def reset_ui_to_idle(self):
         self.btn_start.config(state="normal"); self.btn_stop.config(state="disabled")
 
-    def _upload_files_in_thread(self, files_to_upload):
-        for file_path in files_to_upload:
-            # 만약 감시가 중단되면 루프를 멈춥니다.
-            if self.stop_event.is_set():
-                self.log_queue.put("폴더 업로드 중단됨.")
-                break
-            repo_path = os.path.relpath(file_path, self.settings['folder']).replace("\\", "/")
-            upload_file_to_github(file_path, repo_path, self.settings, self.log_queue)
+    def _submit_batch_upload(self, settings, files_to_upload, journal_seqs=()):
+        # 변경이 감지된 프로필의 설정(토큰 포함)으로 모든 파일을 커밋 1개로 업로드 (그 프로필의 다른 커밋 작업 뒤에 실행)
+        submit_commit_work(settings, upload_files_batch, settings, files_to_upload, self.log_queue, self.stop_event,
+                           journal_seqs)
 
-# 9. 실시간 로그 처리 함수
-    def check_log_queue(self):
-        while not self.log_queue.empty():
-            message = self.log_queue.get_nowait()
+    # 8-(1) 일괄 업로드 승인 : 정책(batch_needs_approval)을 넘는 묶음만 목록에 올라오고, 승인하면 백그라운드에서 업로드
+    def _add_pending_batch(self, description, files_to_upload, journal_seqs, settings, total_bytes):
+        profile_text = f"[{settings['profile']}] " if len(self.profile_states) > 1 else ""
+        iid = self.approval_tree.insert("", "end", text=profile_text + description,
+                                        values=(len(files_to_upload), f"{total_bytes / 1024 / 1024:.1f}MB",
+                                                time.strftime("%H:%M:%S")))
+        self.pending_batches[iid] = (settings, files_to_upload, journal_seqs)
+        if len(self.pending_batches) == 1:
+            self.approval_frame.pack(fill="x", padx=10, pady=(0, 5), before=self.log_frame)
+        self._notify(f"{profile_text}{len(files_to_upload)}개 파일이 업로드 승인을 기다립니다.")
 
-            if isinstance(message, tuple) and message[0] == "folder_detected":
-                folder_path, files_to_upload = message[1], message[2]
-                folder_name = os.path.basename(folder_path)
-                file_count = len(files_to_upload)
-                
-                # 사용자에게 확인 팝업을 띄웁니다.
-                dialogs.Messagebox.show_info(
-                    f"'{folder_name}' 폴더({file_count}개 파일)가 감지되었습니다.\n'확인'을 누르면 전체 업로드를 시작합니다.",
-                    title="폴더 감지"
-                )
-                
-                # 확인 후, 별도 스레드에서 업로드를 시작합니다.
-                threading.Thread(target=self._upload_files_in_thread, args=(files_to_upload,), daemon=True).start()
-                continue # 다음 메시지 처리
+    def approve_selected(self):
+        self._approve(self.approval_tree.selection())
+
+    def approve_all(self):
+        self._approve(self.approval_tree.get_children())
 
-            if isinstance(message, tuple) and message[0] == "notification":
-                dialogs.Messagebox.show_info(f"새로운 파일이 생성되었습니다: {message[1]}", "파일 생성 감지")
+    def _approve(self, iids):
+        for iid in iids:
+            settings, files_to_upload, journal_seqs = self.pending_batches.pop(iid)
+            self.approval_tree.delete(iid)
+            # 그 사이 저널 재실행 등으로 이미 반영된 파일은 다시 올리지 않는다 (빈 커밋 방지)
+            pending = set(get_journal().still_pending(journal_seqs))
+            remaining = [(path, seq) for path, seq in zip(files_to_upload, journal_seqs) if seq in pending]
+            if not remaining:
                 continue
-            if message == "STOP_MONITORING_UI":
-                self.reset_ui_to_idle()
+            files_to_upload, journal_seqs = map(list, zip(*remaining))
+            self._submit_batch_upload(settings, files_to_upload, journal_seqs)
+        if not self.pending_batches:
+            self.approval_frame.pack_forget()
+
+    def _release_pending_batches(self):
+        # 감시를 멈추면 승인 대기 중인 묶음을 저널에 돌려놓고 목록을 비운다
+        # (처리 중 표시가 남으면 다시 시작했을 때 재실행과 승인이 같은 작업을 두 번 반영한다)
+        for settings, files_to_upload, journal_seqs in self.pending_batches.values():
+            get_journal().release(journal_seqs)
+        self.pending_batches.clear()
+        self.approval_tree.delete(*self.approval_tree.get_children())
+        self.approval_frame.pack_forget()
+
+    def _notify(self, line):
+        self.toast_lines.append(line)
+
+    def _flush_toasts(self):
+        # 마지막 토스트 후 TOAST_MIN_GAP이 지났을 때만, 모인 알림을 토스트 하나로 띄운다
+        if not self.toast_lines or time.monotonic() - self.last_toast < TOAST_MIN_GAP:
+            return
+        lines, extra = self.toast_lines[:TOAST_MAX_LINES], len(self.toast_lines) - TOAST_MAX_LINES
+        self.toast_lines = []
+        self.last_toast = time.monotonic()
+        message = "\n".join(lines) + (f"\n외 {extra}건" if extra > 0 else "")
+        ToastNotification(title="Github 업로드 딸깍!", message=message, duration=TOAST_DURATION_MS).show_toast()
+
+# 9. 실시간 로그 처리 함수
+    def check_log_queue(self):
+        # 100ms마다 쌓인 로그를 한 번에 꺼내 위젯에 한 번만 넣는다 (한 번에 너무 많으면 나머지는 다음 차례에)
+        events = []
+        for _ in range(LOG_MAX_PER_TICK):
+            try:
+                message = self.log_queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(message, tuple) or message == "STOP_MONITORING_UI":
+                # 화면 상태를 바꾸기 전에 그때까지 모인 로그를 먼저 보여준다
+                self._append_log(events)
+                events = []
+                self._handle_ui_message(message)
                 continue
-            self.log_text.config(state="normal")
-            self.log_text.insert(tk.END, str(message) + "\n")
-            self.log_text.see(tk.END)
-            self.log_text.config(state="disabled")
+            write_log_file(message)
+            events.append(message)
+        self._append_log(events)
+        self._update_progress()
+        self._update_profile_pending()
+        self._flush_toasts()
         self.root.after(100, self.check_log_queue)
 
+    def _update_profile_pending(self):
+        if self.profile_tree is None:
+            return
+        pending = defaultdict(int) # blob 업로드 + 커밋 작업
+        for scheduler in (_upload_scheduler, _commit_scheduler):
+            for name, count in (scheduler.pending_by_profile() if scheduler else {}).items():
+                pending[name] += count
+        for name in self.profile_states:
+            self.profile_tree.set(name, "pending", pending[name])
+
+    def _update_progress(self):
+        done, total, eta = metrics.progress()
+        if not total:
+            return
+        self.progress_bar.config(maximum=total, value=done)
+        if done >= total:
+            self.progress_label.config(text=f"완료 {done}/{total}")
+        else:
+            remaining = "" if eta is None else f" · 남은 시간 약 {eta / 60:.0f}분" if eta >= 90 else f" · 남은 시간 약 {eta:.0f}초"
+            self.progress_label.config(text=f"{done}/{total} ({done * 100 // total}%){remaining}")
+
+    def _append_log(self, events):
+        lines = summarize_log_events(events)
+        if not lines:
+            return
+        self.log_text.config(state="normal")
+        self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+        # 최근 LOG_WIDGET_MAX_LINES줄만 남긴다 (전체 로그는 로그 파일에 있음)
+        line_count = int(self.log_text.index("end-1c").split(".")[0]) - 1
+        if line_count > LOG_WIDGET_MAX_LINES:
+            self.log_text.delete("1.0", f"{line_count - LOG_WIDGET_MAX_LINES + 1}.0")
+        self.log_text.see(tk.END)
+        self.log_text.config(state="disabled")
+
+    def _handle_ui_message(self, message):
+        if isinstance(message, tuple) and message[0] == "folder_detected":
+            # 확인 창 대신 승인 대기 목록에 올린다 (로그 처리와 다른 업로드는 멈추지 않음)
+            total_bytes = message[5] if len(message) > 5 else 0
+            if self.stop_event.is_set(): # 멈춘 뒤에 도착한 묶음은 목록에 올리지 않고 저널에 돌려놓는다
+                get_journal().release(message[3])
+                return
+            self._add_pending_batch(message[1], message[2], message[3], message[4], total_bytes)
+        elif isinstance(message, tuple) and message[0] == "notification":
+            self._notify(f"새 파일을 업로드합니다: {message[1]}")
+        elif isinstance(message, tuple) and message[0] == "batch_started":
+            self._notify(f"{message[2]}개 파일({message[3] / 1024 / 1024:.1f}MB)을 바로 업로드합니다.")
+        elif isinstance(message, tuple) and message[0] == "profile_status":
+            # 프로필별 상태 표 갱신. 모든 프로필이 끝나면(실패 포함) 시작 버튼을 다시 켠다
+            name, state = message[1], message[2]
+            self.profile_states[name] = state
+            if self.profile_tree is not None and self.profile_tree.exists(name):
+                self.profile_tree.set(name, "state", PROFILE_STATE_LABELS[state])
+            if all(state in PROFILE_DONE_STATES for state in self.profile_states.values()):
+                self.reset_ui_to_idle()
+        elif message == "STOP_MONITORING_UI":
+            self.reset_ui_to_idle()
+
 # 10. 백준 문제 찾기 버튼 클릭 시 실행되는 함수
     def open_problem_finder_window(self):
         problem_finder.launch(self.root)
 
 # 11. 프로그램 종료 확인 박스
     def on_closing(self):
-        if dialogs.Messagebox.show_question("프로그램을 종료하시겠습니까?", "종료 확인") == "Yes":
+        pending_text = (f"\n(승인 대기 중인 일괄 업로드 {len(self.pending_batches)}개는 다음 실행 때 반영됩니다)"
+                        if self.pending_batches else "")
+        if dialogs.Messagebox.show_question("프로그램을 종료하시겠습니까?" + pending_text, "종료 확인") == "Yes":
             self.stop_event.set()
             self.root.after(200, self.root.destroy)
 
 
-# 12. 애플리케이션 실행
+# 12. 명령줄(CLI) 실행 : 디스플레이 없는 서버에서 GUI 없이 동기화
+#   python github_auto_uploader.py sync --once   초기 동기화만 하고 종료 (성공하면 종료 코드 0)
+#   python github_auto_uploader.py watch         초기 동기화 후 Ctrl+C를 누를 때까지 감시
+#   python github_auto_uploader.py --profile boj watch   config.json의 profiles 중 일부만 실행
+# 설정은 config.json을 쓰고 옵션으로 덮어쓸 수 있으며, 토큰은 환경 변수(GITHUB_TOKEN) 또는 keyring에서 찾는다.
+
+def print_log_messages(log_queue, stop_event):
+    # GUI 대신 로그를 표준 출력으로 보낸다. 여러 파일 일괄 작업은 확인 창 없이 그 프로필 설정으로 바로 업로드 (None을 받으면 끝)
+    while True:
+        message = log_queue.get()
+        if message is None:
+            return
+        if isinstance(message, tuple):
+            if message[0] == "folder_detected":
+                submit_commit_work(message[4], upload_files_batch, message[4], message[2], log_queue, stop_event,
+                                   message[3])
+            continue
+        if message != "STOP_MONITORING_UI":
+            print(message, flush=True)
+
+def run_cli(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog="github_auto_uploader", description="로컬 폴더를 깃허브 저장소와 동기화합니다.")
+    for key in ("username", "repo", "branch", "folder"):
+        parser.add_argument(f"--{key}", help=f"config.json의 {key} 대신 사용할 값 (지정하면 profiles는 쓰지 않음)")
+    parser.add_argument("--profile", action="append", help="config.json의 profiles 중 실행할 프로필 이름 (여러 번 지정 가능)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sync_parser = commands.add_parser("sync", help="초기 동기화 후 감시 (--once : 동기화만 하고 종료)")
+    sync_parser.add_argument("--once", action="store_true", help="초기 동기화만 하고 종료")
+    commands.add_parser("watch", help="초기 동기화 후 Ctrl+C를 누를 때까지 폴더 감시")
+    args = parser.parse_args(argv)
+
+    settings = load_settings()
+    overrides = {key: getattr(args, key) for key in ("username", "repo", "branch", "folder") if getattr(args, key)}
+    if overrides:
+        settings.pop("profiles", None) # 옵션으로 폴더/저장소를 지정하면 그 하나만 동기화
+        settings.update(overrides)
+    profiles = load_profiles(settings)
+    if args.profile:
+        profiles = [profile for profile in profiles if profile["profile"] in args.profile]
+        if not profiles:
+            print(f"오류: config.json에 '{', '.join(args.profile)}' 프로필이 없습니다.", file=sys.stderr)
+            return 2
+    if not all(profile.get(key) for profile in profiles for key in ["username", "repo", "folder"]):
+        print("오류: 사용자 이름, 저장소, 폴더를 config.json 또는 옵션(--username, --repo, --folder)으로 지정해주세요.",
+              file=sys.stderr)
+        return 2
+    for profile in profiles:
+        try:
+            token = load_token(profile)
+        except Exception as e:
+            print(f"오류: 토큰을 불러오는 중 오류 발생: {e}", file=sys.stderr)
+            return 2
+        if not token:
+            print("오류: 토큰을 찾을 수 없습니다. GITHUB_TOKEN 환경 변수를 설정하거나 GUI의 '⚙️ 설정'에서 저장해주세요.",
+                  file=sys.stderr)
+            return 2
+        profile["token"] = token
+
+    log_queue, stop_event = queue.Queue(), threading.Event()
+    printer = threading.Thread(target=print_log_messages, args=(log_queue, stop_event))
+    printer.start()
+    log_queue.put(f"⏱️ 시작 준비 {(time.perf_counter() - _process_started) * 1000:.0f}ms")
+    watch = not (args.command == "sync" and args.once)
+    result = {}
+
+    done = threading.Event()
+
+    def run():
+        try:
+            result.update(run_profiles(profiles, log_queue, stop_event, watch))
+        finally:
+            done.set()
+
+    # 동기화는 작업 스레드에서 돌리고, 메인 스레드는 Ctrl+C를 받으면 stop_event로 멈추게 한다
+    # (Thread.join 도중에 Ctrl+C가 들어오면 join이 끝난 것처럼 돌아올 수 있어 Event로 기다린다)
+    threading.Thread(target=run, daemon=True).start()
+    try:
+        while not done.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        log_queue.put("⏹️ 중단 요청을 받았습니다. 진행 중인 작업을 정리합니다...")
+        stop_event.set()
+        done.wait()
+    log_queue.put(None)
+    printer.join()
+    # 모든 프로필의 초기 동기화가 성공했을 때만 0
+    return 0 if result and all(result.values()) else 1
+
+
+# 13. 애플리케이션 실행 (인자가 있으면 CLI, 없으면 GUI)
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
+    load_gui_modules()
     settings = load_settings()
     root = ttk.Window(themename=settings.get("theme", "litera"))
     app = App(root)
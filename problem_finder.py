@@ -7,13 +7,24 @@ import requests
 from bs4 import BeautifulSoup
 import webbrowser
 import threading
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import font as tkfont
+
+CLASS_NUMBERS = [str(i) for i in range(1, 11)]
+REQUEST_TIMEOUT = 10
+
+_session = requests.Session() # 클래스 10개를 받을 때 연결을 재사용
 
 # 1. solved.ac 클래스 문제 목록을 크롤링하는 함수
 def fetch_class_problems(class_num: str) -> list[tuple[str, str]]:
     
     url = f"https://solved.ac/class/{class_num}"
     headers = {"User-Agent": "Mozilla/5.0"}
-    res = requests.get(url, headers=headers)
+    res = _session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
     res.raise_for_status()
     
     # 'lxml' 파서를 사용
@@ -32,15 +43,252 @@ def fetch_class_problems(class_num: str) -> list[tuple[str, str]]:
             problems.append((problem_id, title))
     return problems
 
+# 1-(1) 클래스별 문제 목록 디스크 캐시 (problem_cache.json)
+# 창을 닫아도 목록이 남아 다시 열면 바로 보여준다. CACHE_TTL이 지난 목록도 먼저 보여주고
+# 뒤에서 새로 받아 바뀌었으면 화면을 갱신한다 (stale-while-revalidate).
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "problem_cache.json")
+CACHE_TTL = 24 * 60 * 60 # 초
+PREFETCH_WORKERS = 3 # 클래스 목록을 미리 받을 때 동시에 보낼 요청 수 (solved.ac에 부담을 주지 않을 만큼)
+
+class ProblemCache:
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = self._load() # {클래스: {"fetched_at": 받은 시각, "problems": [[번호, 제목], ...]}}
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("classes", {})
+        except (OSError, ValueError, AttributeError):
+            return {} # 없거나 깨진 캐시는 새로 받는다
+
+    def get(self, class_num):
+        # 반환값 : (문제 목록 또는 None, 새로 받아야 하는지)
+        with self.lock:
+            entry = self.entries.get(class_num)
+        if entry is None:
+            return None, True
+        problems = [tuple(problem) for problem in entry["problems"]]
+        return problems, time.time() - entry["fetched_at"] > CACHE_TTL
+
+    def snapshot(self):
+        # 검색 색인용 : {클래스: [(번호, 제목), ...]} (낡은 목록도 포함)
+        with self.lock:
+            entries = dict(self.entries)
+        return {class_num: [tuple(problem) for problem in entry["problems"]] for class_num, entry in entries.items()}
+
+    def put(self, class_num, problems):
+        with self.lock:
+            self.entries[class_num] = {"fetched_at": time.time(), "problems": [list(problem) for problem in problems]}
+            # 임시 파일에 쓴 뒤 바꿔치기 : 쓰는 도중에 꺼져도 캐시 파일이 깨지지 않는다
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"classes": self.entries}, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+
+_cache = None
+_executor = None
+_in_flight = {} # {클래스: Future} 같은 클래스를 동시에 두 번 받지 않도록
+_lock = threading.RLock()
+
+def get_cache():
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = ProblemCache()
+        return _cache
+
+def refresh_class(class_num):
+    # 클래스 목록을 백그라운드에서 새로 받아 캐시에 저장. 이미 받는 중이면 그 Future를 돌려준다
+    global _executor
+    with _lock:
+        future = _in_flight.get(class_num)
+        if future is None:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="problem-fetch")
+            future = _in_flight[class_num] = _executor.submit(_fetch_and_store, class_num)
+            future.add_done_callback(lambda _: _forget(class_num))
+        return future
+
+def _forget(class_num):
+    with _lock:
+        _in_flight.pop(class_num, None)
+
+def _fetch_and_store(class_num):
+    problems = fetch_class_problems(class_num)
+    if problems: # 빈 목록(페이지 구조가 바뀌었거나 일시 오류)은 캐시하지 않는다
+        get_cache().put(class_num, problems)
+    return problems
+
+def prefetch_classes():
+    # 캐시에 없거나 낡은 클래스를 모두 미리 받는다 (콤보박스에서 클래스를 바꾸면 바로 보이도록)
+    return {class_num: refresh_class(class_num) for class_num in CLASS_NUMBERS if get_cache().get(class_num)[1]}
+
+# 1-(2) 모든 클래스의 문제를 한꺼번에 찾는 검색 색인
+# "번호 제목"을 소문자로 바꾼 문자열의 1~3글자 조각마다 문제 순번 집합을 만들어 둔다.
+# 3글자 이하 검색어는 조각 하나를 바로 찾고, 더 긴 검색어는 3글자 조각들의 교집합만 확인하므로
+# 문제가 수천 개여도 글자를 칠 때마다 목록 전체를 훑지 않는다.
+GRAM_SIZE = 3
+
+def normalize_text(text):
+    return " ".join(text.lower().split())
+
+class ProblemIndex:
+    def __init__(self, problems_by_class):
+        self.problems = [] # [(번호, 제목, 클래스)] 클래스 순서대로
+        self.texts = [] # 검색용 문자열
+        self.grams = defaultdict(set) # {조각: 문제 순번 집합}
+        seen = set()
+        for class_num in sorted(problems_by_class, key=int):
+            for pid, title in problems_by_class[class_num]:
+                if pid in seen: # 여러 클래스에 같은 문제가 있으면 처음 나온 클래스로 한 번만
+                    continue
+                seen.add(pid)
+                doc_id = len(self.problems)
+                text = normalize_text(f"{pid} {title}")
+                self.problems.append((pid, title, class_num))
+                self.texts.append(text)
+                for size in range(1, GRAM_SIZE + 1):
+                    for start in range(len(text) - size + 1):
+                        self.grams[text[start:start + size]].add(doc_id)
+
+    def __len__(self):
+        return len(self.problems)
+
+    def search(self, query):
+        # 반환값 : 검색어가 번호나 제목에 들어 있는 [(번호, 제목, 클래스)] (클래스 순서 유지)
+        query = normalize_text(query)
+        if not query:
+            return list(self.problems)
+        if len(query) <= GRAM_SIZE:
+            matches = self.grams.get(query, ())
+        else:
+            postings = sorted((self.grams.get(query[start:start + GRAM_SIZE], set())
+                               for start in range(len(query) - GRAM_SIZE + 1)), key=len)
+            candidates = postings[0].intersection(*postings[1:])
+            # 조각이 모두 있어도 순서가 다를 수 있으므로 남은 후보만 실제 문자열로 확인
+            matches = [doc_id for doc_id in candidates if query in self.texts[doc_id]]
+        return [self.problems[doc_id] for doc_id in sorted(matches)]
+
+# 2-(0) 보이는 줄만 그리는 목록
+# tk.Listbox는 항목마다 insert로 모두 만들어야 해서 수천 줄이면 채우는 동안 창이 멈춘다.
+# 항목 목록만 들고 있다가 캔버스에 지금 보이는 줄(수십 줄)만 그리고, 스크롤할 때 다시 그린다.
+class VirtualList(ttk.Frame):
+    def __init__(self, parent, font=("Malgun Gothic", 10), on_activate=None):
+        super().__init__(parent)
+        self.font = tkfont.Font(self, font=font)
+        self.row_height = self.font.metrics("linespace") + 4
+        self.on_activate = on_activate
+        self.rows = []
+        self.format_row = str # 줄 문자열은 그릴 때만 만든다
+        self.offset = 0 # 맨 위에서 스크롤된 픽셀 수
+        self.selected = None
+
+        colors = ttk.Style().colors
+        self.colors = (colors.inputbg, colors.inputfg, colors.selectbg, colors.selectfg)
+        self.canvas = tk.Canvas(self, highlightthickness=0, background=self.colors[0], takefocus=True)
+        self.canvas.pack(side="left", expand=True, fill="both")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview, bootstyle="round")
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", lambda event: self.redraw())
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<Double-1>", self.on_double_click)
+        self.canvas.bind("<Return>", lambda event: self.activate())
+        self.canvas.bind("<Up>", lambda event: self.move_selection(-1))
+        self.canvas.bind("<Down>", lambda event: self.move_selection(1))
+        self.canvas.bind("<Prior>", lambda event: self.yview("scroll", -1, "pages"))
+        self.canvas.bind("<Next>", lambda event: self.yview("scroll", 1, "pages"))
+        self.canvas.bind("<MouseWheel>", lambda event: self.yview("scroll", -3 if event.delta > 0 else 3, "units"))
+        self.canvas.bind("<Button-4>", lambda event: self.yview("scroll", -3, "units")) # 리눅스 휠
+        self.canvas.bind("<Button-5>", lambda event: self.yview("scroll", 3, "units"))
+
+    def set_items(self, rows, format_row=str):
+        self.rows = rows
+        self.format_row = format_row
+        self.offset = 0
+        self.selected = None
+        self.redraw()
+
+    def curselection(self):
+        return () if self.selected is None else (self.selected,)
+
+    def yview(self, *args):
+        # 스크롤바와 휠에서 불린다 ("moveto", 비율) / ("scroll", 칸 수, "units" 또는 "pages")
+        view_height = self.canvas.winfo_height()
+        if args[0] == "moveto":
+            self.offset = float(args[1]) * len(self.rows) * self.row_height
+        elif args[0] == "scroll":
+            step = self.row_height if args[2] == "units" else max(view_height - self.row_height, self.row_height)
+            self.offset += int(args[1]) * step
+        self.offset = max(0, min(self.offset, len(self.rows) * self.row_height - view_height))
+        self.redraw()
+
+    def redraw(self):
+        self.canvas.delete("all")
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        background, foreground, select_background, select_foreground = self.colors
+        first = int(self.offset // self.row_height)
+        last = min(len(self.rows), int((self.offset + height) // self.row_height) + 1)
+        for row in range(first, last):
+            top = row * self.row_height - self.offset
+            color = foreground
+            if row == self.selected:
+                self.canvas.create_rectangle(0, top, width, top + self.row_height, fill=select_background, width=0)
+                color = select_foreground
+            self.canvas.create_text(6, top + self.row_height / 2, anchor="w", text=self.format_row(self.rows[row]),
+                                    font=self.font, fill=color)
+        total = len(self.rows) * self.row_height
+        if total <= height:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + height) / total)
+
+    def row_at(self, y):
+        row = int((self.offset + y) // self.row_height)
+        return row if 0 <= row < len(self.rows) else None
+
+    def on_click(self, event):
+        self.canvas.focus_set()
+        self.selected = self.row_at(event.y)
+        self.redraw()
+
+    def on_double_click(self, event):
+        if self.row_at(event.y) is not None:
+            self.activate()
+
+    def activate(self):
+        if self.selected is not None and self.on_activate:
+            self.on_activate()
+
+    def move_selection(self, step):
+        if not self.rows:
+            return
+        self.selected = 0 if self.selected is None else max(0, min(self.selected + step, len(self.rows) - 1))
+        # 선택한 줄이 화면 밖이면 보이도록 스크롤
+        top = self.selected * self.row_height
+        view_height = self.canvas.winfo_height()
+        if top < self.offset:
+            self.offset = top
+        elif top + self.row_height > self.offset + view_height:
+            self.offset = top + self.row_height - view_height
+        self.redraw()
+
 # 2. UI 구성
+SEARCH_DELAY_MS = 80 # 마지막 글자를 치고 이만큼 멈췄을 때 검색
+
 class ProblemFinderWindow(ttk.Toplevel):
     def __init__(self, parent_window):
         super().__init__(parent_window)
         self.title("백준 문제 크롤러")
         self.geometry("450x500")
 
-        # 한 번 불러온 결과를 저장할 캐시(cache)를 만듭니다.
-        self.problems_cache = {}
+        # 한 번 불러온 결과는 디스크 캐시(ProblemCache)에 남아 창을 다시 열어도 바로 보여줍니다.
+        self.problems_data = []
+        self.closed = False
+        self.index = ProblemIndex(get_cache().snapshot()) # 받아 둔 모든 클래스의 문제 검색 색인
+        self.search_job = None
         
         # --- UI 위젯 생성 ---
         top_frame = ttk.Frame(self, padding=(10, 10))
@@ -48,22 +296,28 @@ class ProblemFinderWindow(ttk.Toplevel):
         ttk.Label(top_frame, text="클래스 선택:").pack(side="left", padx=(0, 5))
         self.class_var = tk.StringVar(value='1')
         self.class_menu = ttk.Combobox(top_frame, textvariable=self.class_var, 
-                                       values=[str(i) for i in range(1, 11)], 
+                                       values=CLASS_NUMBERS, 
                                        state="readonly", width=10)
         self.class_menu.pack(side="left", padx=5)
+        self.class_menu.bind("<<ComboboxSelected>>", lambda event: self.show_class(self.class_var.get()))
         self.fetch_button = ttk.Button(top_frame, text="문제 불러오기", 
                                        command=self.start_fetching, bootstyle="primary")
         self.fetch_button.pack(side="left", padx=5)
+
+        # 검색어를 넣으면 클래스와 상관없이 받아 둔 모든 문제에서 번호/제목으로 찾는다
+        search_frame = ttk.Frame(self, padding=(10, 0, 10, 10))
+        search_frame.pack(fill="x")
+        ttk.Label(search_frame, text="문제 검색:").pack(side="left", padx=(0, 5))
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", self.on_search_changed)
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        self.search_entry.pack(side="left", expand=True, fill="x", padx=5)
+        self.search_entry.bind("<Escape>", lambda event: self.search_var.set(""))
         
         list_frame = ttk.Frame(self, padding=(10, 0, 10, 10))
         list_frame.pack(expand=True, fill="both")
-        self.problem_listbox = tk.Listbox(list_frame, font=("Malgun Gothic", 10))
-        self.problem_listbox.pack(side="left", expand=True, fill="both")
-        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", 
-                                  command=self.problem_listbox.yview, bootstyle="round")
-        scrollbar.pack(side="right", fill="y")
-        self.problem_listbox.config(yscrollcommand=scrollbar.set)
-        self.problem_listbox.bind("<Double-1>", self.open_selected_problem)
+        self.problem_list = VirtualList(list_frame, on_activate=self.open_selected_problem)
+        self.problem_list.pack(expand=True, fill="both")
         
         bottom_frame = ttk.Frame(self, padding=(10,0,10,10))
         bottom_frame.pack(fill='x')
@@ -72,45 +326,93 @@ class ProblemFinderWindow(ttk.Toplevel):
         self.open_button.pack(fill='x')
         self.status_label = ttk.Label(self, text="클래스를 선택하고 '문제 불러오기'를 누르세요.", padding=(10,5))
         self.status_label.pack(side="bottom", fill="x")
+        self.bind("<Destroy>", self.on_destroy)
+
+        # 캐시된 목록을 바로 보여주고, 나머지 클래스는 뒤에서 미리 받아 둔다
+        self.show_class(self.class_var.get())
+        for future in prefetch_classes().values():
+            future.add_done_callback(self.on_prefetched)
 
         self.transient(parent_window)
         self.grab_set()
         parent_window.wait_window(self)
 
-    # 3. UI가 멈추지 않도록 별도의 스레드에서 크롤링 함수를 실행
+    # 3. '문제 불러오기' 버튼 : 캐시된 목록을 바로 보여주면서 네트워크에서 새로 받는다
     def start_fetching(self):
-        
-        threading.Thread(target=self.fetch_and_display, daemon=True).start()
+        self.show_class(self.class_var.get(), force=True)
+
+    # 4. 캐시에 있으면 바로 보여주고, 없거나 낡았으면(force면 항상) 백그라운드 스레드에서 받아 화면을 갱신
+    def show_class(self, class_num, force=False):
+        problems, stale = get_cache().get(class_num)
+        self.fetch_button.config(text="문제 불러오기", state="normal")
+        if problems is not None:
+            self.ui_update_success(class_num, problems)
+        else:
+            self.ui_before_fetch(class_num)
+        if stale or force:
+            if problems is not None:
+                self.fetch_button.config(text="새로 받는 중...", state="disabled")
+            refresh_class(class_num).add_done_callback(lambda future: self.on_fetched(class_num, future))
 
-    # 4. 백그라운드에서 실행될 크롤링 및 UI 업데이트 로직
+    def on_fetched(self, class_num, future):
+        # 작업 스레드에서 불린다 : 화면 갱신은 Tk 스레드로 넘긴다 (창이 닫혔으면 캐시에만 남김)
+        if self.closed:
+            return
+        try:
+            problems = future.result()
+        except Exception as e:
+            self.call_in_ui(self.ui_update_error, class_num, e)
+            return
+        self.on_prefetched(future)
+        self.call_in_ui(self.ui_update_success, class_num, problems)
 
-    def fetch_and_display(self):
-        class_num = self.class_var.get()
+    def on_prefetched(self, future):
+        # 새 목록이 캐시에 들어오면 검색 색인을 작업 스레드에서 다시 만들어 Tk 스레드로 넘긴다
+        if self.closed or future.exception() is not None:
+            return
+        self.call_in_ui(self.set_index, ProblemIndex(get_cache().snapshot()))
 
-        self.after(0, self.ui_before_fetch, class_num)
-        
+    def call_in_ui(self, function, *args):
         try:
-            # (1) 캐시에 결과가 있는지 먼저 확인
-            if class_num in self.problems_cache:
-                problems = self.problems_cache[class_num]
-                self.after(0, lambda: self.ui_update_success(class_num, problems))
-                return # 캐시된 결과를 사용했으므로 여기서 함수 종료
-
-            # (2) 캐시에 없다면 네트워크에서 데이터를 가져온다.
-            problems = fetch_class_problems(class_num)
-            
-            # 가져온 결과를 캐시에 저장
-            self.problems_cache[class_num] = problems
-            
-            # 가져온 결과로 UI를 업데이트
-            self.after(0, lambda: self.ui_update_success(class_num, problems))
+            self.after(0, function, *args)
+        except (RuntimeError, tk.TclError):
+            pass # 그 사이 창이 닫힘
 
-        except Exception as e:
-            self.after(0, self.ui_update_error, e)
+    def on_destroy(self, event):
+        if event.widget is self:
+            self.closed = True
+
+    # 4-(1) 검색 : 글자를 칠 때마다가 아니라 잠깐 멈췄을 때 한 번만 찾는다
+    def on_search_changed(self, *args):
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DELAY_MS, self.apply_search)
+
+    def searching(self):
+        return bool(self.search_var.get().strip())
+
+    def apply_search(self):
+        self.search_job = None
+        if not self.searching(): # 검색어를 지우면 고른 클래스 목록으로 돌아간다
+            self.show_class(self.class_var.get())
+            return
+        started = time.perf_counter()
+        matches = self.index.search(self.search_var.get())
+        self.problems_data = [(pid, title) for pid, title, _ in matches]
+        self.problem_list.set_items(matches, lambda match: f"[Class {match[2]}] {match[0]}. {match[1]}")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.status_label.config(text=f"🔎 받아 둔 문제 {len(self.index)}개 중 {len(matches)}개 찾음 ({elapsed_ms:.1f}ms)")
+
+    def set_index(self, index):
+        if self.closed:
+            return
+        self.index = index
+        if self.searching() and self.search_job is None:
+            self.apply_search() # 새로 받은 클래스도 검색 결과에 반영
 
-    # 5. 리스트박스에서 선택된 문제를 웹 브라우저에서 연다
+    # 5. 목록에서 선택된 문제를 웹 브라우저에서 연다
     def open_selected_problem(self, event=None):
-        selected_indices = self.problem_listbox.curselection()
+        selected_indices = self.problem_list.curselection()
         if not selected_indices:
             messagebox.showwarning("경고", "먼저 목록에서 문제를 선택하세요.", parent=self)
             return
@@ -128,26 +430,36 @@ class ProblemFinderWindow(ttk.Toplevel):
     def ui_before_fetch(self, class_num):
         # 데이터를 불러오기 전의 UI 상태 설정
         self.fetch_button.config(text="불러오는 중...", state="disabled")
-        self.problem_listbox.delete(0, tk.END)
-        self.problem_listbox.insert(tk.END, f"Class {class_num} 문제를 로딩합니다...")
+        if self.searching(): # 검색 결과를 보고 있으면 목록은 그대로 둔다
+            return
+        self.problems_data = []
+        self.problem_list.set_items([f"Class {class_num} 문제를 로딩합니다..."])
 
     def ui_update_success(self, class_num, problems):
-        # 데이터 로딩 성공 시 UI 업데이트
+        # 데이터 로딩 성공 시 UI 업데이트 (그 사이 다른 클래스를 골랐다면 무시)
+        if self.closed or class_num != self.class_var.get():
+            return
+        self.fetch_button.config(text="문제 불러오기", state="normal")
+        if self.searching():
+            return
         self.problems_data = problems
-        self.problem_listbox.delete(0, tk.END)
+        # 줄 문자열은 VirtualList가 화면에 보이는 줄만 그때그때 만든다
+        self.problem_list.set_items(list(enumerate(self.problems_data, start=1)), lambda row: f"{row[0]}. {row[1][1]}")
         if not self.problems_data:
             self.status_label.config(text="⚠️ 문제 목록을 가져오지 못했습니다.")
         else:
-            for idx, (_, title) in enumerate(self.problems_data, start=1):
-                self.problem_listbox.insert(tk.END, f"{idx}. {title}")
             self.status_label.config(text=f"✅ Class {class_num} 문제 {len(self.problems_data)}개 로드 완료.")
-        self.fetch_button.config(text="문제 불러오기", state="normal")
         
-    def ui_update_error(self, error):
-        # 데이터 로딩 실패 시 UI 업데이트
+    def ui_update_error(self, class_num, error):
+        # 데이터 로딩 실패 시 UI 업데이트 (캐시된 목록을 보여주고 있었다면 그대로 두고 상태만 알림)
+        if self.closed or class_num != self.class_var.get():
+            return
+        self.fetch_button.config(text="문제 불러오기", state="normal")
+        if get_cache().get(class_num)[0] is not None:
+            self.status_label.config(text=f"⚠️ 새로 받지 못해 저장된 Class {class_num} 목록을 보여줍니다.")
+            return
         self.status_label.config(text=f"❌ 오류가 발생했습니다. 다시 시도해주세요.")
         messagebox.showerror("크롤링 오류", f"문제를 불러오는 중 오류가 발생했습니다:\n{error}", parent=self)
-        self.fetch_button.config(text="문제 불러오기", state="normal")
         
 # 6. 메인 앱에서 이 함수를 호출하여 크롤러 창을 실행
 def launch(parent_window):